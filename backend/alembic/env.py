@@ -39,6 +39,21 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 # Add your model's MetaData object here for 'autogenerate' support
 target_metadata = Base.metadata
 
+# PostgreSQL only objects created by migrations but not mapped on the models
+# (see api/src/products/models.py), which autogenerate must not drop
+UNMAPPED_OBJECTS = {
+    ("column", "products.search_vector"),
+    ("index", "ix_products_search_vector"),
+    ("index", "ix_products_name_trgm"),
+}
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Leave the unmapped objects out of autogenerate comparisons."""
+    if type_ == "column":
+        name = f"{object.table.name}.{name}"
+    return (type_, name) not in UNMAPPED_OBJECTS
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -48,6 +63,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -55,7 +71,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
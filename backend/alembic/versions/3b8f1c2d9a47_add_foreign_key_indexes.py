@@ -0,0 +1,35 @@
+"""add foreign key indexes
+
+Revision ID: 3b8f1c2d9a47
+Revises: e566ee2660cd
+Create Date: 2026-10-18 09:12:31.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b8f1c2d9a47"
+down_revision: Union[str, None] = "e566ee2660cd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite indexes serve both the foreign key filter (lookups, report
+    # joins and cascade deletes) and the keyset ordering by id
+    op.create_index(
+        "ix_products_company_nit_id", "products", ["company_nit", "id"], unique=False
+    )
+    op.create_index(
+        "ix_inventory_product_id_id", "inventory", ["product_id", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_product_id_id", table_name="inventory")
+    op.drop_index("ix_products_company_nit_id", table_name="products")
@@ -0,0 +1,49 @@
+"""add product prices
+
+Revision ID: 5e0b9c3d7f12
+Revises: d4f7a2c81e90
+Create Date: 2026-10-18 20:41:57.130482
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0b9c3d7f12"
+down_revision: Union[str, None] = "d4f7a2c81e90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_prices",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("amount", sa.Numeric(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("product_id", "currency"),
+    )
+    op.create_index(
+        "ix_product_prices_currency_amount",
+        "product_prices",
+        ["currency", "amount", "product_id"],
+        unique=False,
+    )
+    # Mirror the prices of the existing products
+    op.execute(
+        """
+        INSERT INTO product_prices (product_id, currency, amount)
+        SELECT products.id, price.key, price.value::numeric
+        FROM products, json_each_text(products.prices) AS price
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_prices_currency_amount", table_name="product_prices")
+    op.drop_table("product_prices")
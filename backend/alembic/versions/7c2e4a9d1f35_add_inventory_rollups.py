@@ -0,0 +1,52 @@
+"""add inventory rollups
+
+Revision ID: 7c2e4a9d1f35
+Revises: 3b8f1c2d9a47
+Create Date: 2026-10-18 15:40:12.804213
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e4a9d1f35"
+down_revision: Union[str, None] = "3b8f1c2d9a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_rollups",
+        sa.Column("company_nit", sa.String(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("items", sa.Integer(), nullable=False),
+        sa.Column("total_quantity", sa.BigInteger(), nullable=False),
+        sa.Column("total_value", sa.Numeric(), nullable=False),
+        sa.ForeignKeyConstraint(["company_nit"], ["companies.nit"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("company_nit", "currency"),
+    )
+    # Backfill from the existing inventory; '' holds the all-currency totals
+    op.execute(
+        """
+        INSERT INTO inventory_rollups
+            (company_nit, currency, items, total_quantity, total_value)
+        SELECT p.company_nit, price.currency, count(*), sum(i.quantity),
+               sum(price.price * i.quantity)
+        FROM inventory i
+        JOIN products p ON p.id = i.product_id
+        CROSS JOIN LATERAL (
+            SELECT key, value::numeric FROM json_each_text(p.prices)
+            UNION ALL SELECT '', 0
+        ) AS price (currency, price)
+        GROUP BY p.company_nit, price.currency
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_rollups")
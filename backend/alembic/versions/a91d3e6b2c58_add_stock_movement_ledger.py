@@ -0,0 +1,76 @@
+"""add stock movement ledger
+
+Revision ID: a91d3e6b2c58
+Revises: 7c2e4a9d1f35
+Create Date: 2026-10-18 17:05:44.319027
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a91d3e6b2c58"
+down_revision: Union[str, None] = "7c2e4a9d1f35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_movements",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("inventory_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column(
+            "reason",
+            sa.Enum(
+                "CREATE", "UPDATE", "ADJUST", "IMPORT", "DELETE", name="movementreason"
+            ),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_stock_movements_inventory_id_created_at",
+        "stock_movements",
+        ["inventory_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_stock_movements_created_at"),
+        "stock_movements",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_table(
+        "stock_snapshots",
+        sa.Column("inventory_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("inventory_id", "day"),
+    )
+    # Opening balance: current stock as the snapshot of the previous day
+    op.execute(
+        """
+        INSERT INTO stock_snapshots (inventory_id, day, quantity)
+        SELECT id, (now() AT TIME ZONE 'UTC')::date - 1, quantity FROM inventory
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_snapshots")
+    op.drop_index(op.f("ix_stock_movements_created_at"), table_name="stock_movements")
+    op.drop_index(
+        "ix_stock_movements_inventory_id_created_at", table_name="stock_movements"
+    )
+    op.drop_table("stock_movements")
+    sa.Enum(name="movementreason").drop(op.get_bind())
@@ -0,0 +1,38 @@
+"""add exchange rates
+
+Revision ID: b6d2e8f4a153
+Revises: 5e0b9c3d7f12
+Create Date: 2026-10-18 21:37:12.845906
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d2e8f4a153"
+down_revision: Union[str, None] = "5e0b9c3d7f12"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "exchange_rates",
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("rate", sa.Numeric(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("currency"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("exchange_rates")
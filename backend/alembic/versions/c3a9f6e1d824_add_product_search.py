@@ -0,0 +1,65 @@
+"""add product search
+
+Revision ID: c3a9f6e1d824
+Revises: b6d2e8f4a153
+Create Date: 2026-10-18 22:48:30.271554
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a9f6e1d824"
+down_revision: Union[str, None] = "b6d2e8f4a153"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "products",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', name), 'A') || setweight(to_tsvector('simple', characteristics), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_products_search_vector",
+        "products",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    # Typo tolerant matching needs pg_trgm, which not every server ships;
+    # search falls back to full-text prefix matching without it
+    available = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        )
+        .scalar()
+    )
+    if available:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX ix_products_name_trgm ON products USING gin (name gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_products_name_trgm")
+    op.drop_index(
+        "ix_products_search_vector", table_name="products", postgresql_using="gin"
+    )
+    op.drop_column("products", "search_vector")
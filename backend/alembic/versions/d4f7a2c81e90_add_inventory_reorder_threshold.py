@@ -0,0 +1,43 @@
+"""add inventory reorder threshold
+
+Revision ID: d4f7a2c81e90
+Revises: a91d3e6b2c58
+Create Date: 2026-10-18 19:22:08.604137
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f7a2c81e90"
+down_revision: Union[str, None] = "a91d3e6b2c58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "inventory", sa.Column("reorder_threshold", sa.Integer(), nullable=True)
+    )
+    # Partial index holding only the items at or below their threshold, so
+    # low-stock listings never scan the whole inventory
+    op.create_index(
+        "ix_inventory_low_stock",
+        "inventory",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("quantity <= reorder_threshold"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_inventory_low_stock",
+        table_name="inventory",
+        postgresql_where=sa.text("quantity <= reorder_threshold"),
+    )
+    op.drop_column("inventory", "reorder_threshold")
@@ -0,0 +1,42 @@
+"""add company data version
+
+Revision ID: f2b7c4d9e610
+Revises: c3a9f6e1d824
+Create Date: 2026-10-18 23:12:40.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b7c4d9e610"
+down_revision: Union[str, None] = "c3a9f6e1d824"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("companies_data_version_seq")))
+    # The server default also versions companies inserted with plain SQL
+    op.add_column(
+        "companies",
+        sa.Column(
+            "data_version",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('companies_data_version_seq')"),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        op.f("ix_companies_data_version"), "companies", ["data_version"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_companies_data_version"), table_name="companies")
+    op.drop_column("companies", "data_version")
+    op.execute(sa.schema.DropSequence(sa.Sequence("companies_data_version_seq")))
@@ -8,13 +8,48 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Prueba Lite Thinking"
     DATABASE_URL: str
     DATABASE_URL_SYNC: str = ""
+    DATABASE_REPLICA_URL: str = ""  # Optional read replica for GET requests
+    READ_YOUR_WRITES_WINDOW: int = 5  # seconds reads stay on primary after a write
     DEBUG: bool = False
 
+    # Database connection pool settings
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection
+
     # JWT Settings
     JWT_SECRET: str  # Change in production
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION: int = 30  # minutes
 
+    # Maximum concurrent bcrypt hash/verify operations per worker
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Authenticated principal cache
+    PRINCIPAL_CACHE_SIZE: int = 1024  # 0 disables the cache
+    PRINCIPAL_CACHE_TTL: int = 10  # seconds other workers may serve a stale role
+
+    # Stock movement ledger batch writer
+    STOCK_LEDGER_FLUSH_INTERVAL_MS: int = 200  # flush at least this often
+    STOCK_LEDGER_FLUSH_ROWS: int = 500  # flush early once this many are buffered
+    STOCK_LEDGER_MAX_BUFFERED_ROWS: int = 100_000  # oldest dropped beyond this
+
+    # Exchange rates used to convert report and summary totals
+    EXCHANGE_RATES_FILE: str = ""  # JSON of currency to rate, empty for bundled
+    EXCHANGE_RATE_TTL: int = 3600  # seconds between provider refreshes
+    REPORT_CURRENCY: str = "USD"  # default currency of report totals
+
+    # Report PDF rendering process pool
+    REPORT_RENDER_WORKERS: int = 2  # reports rendered at the same time
+    REPORT_RENDER_QUEUE_SIZE: int = 8  # renders waiting before new ones get 503
+    REPORT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # cached PDFs, 0 disables
+    REPORT_CHUNK_ROWS: int = 2000  # larger reports are rendered in chunks this big
+    REPORT_SPOOL_DIR: str = ""  # files of large reports, a temp dir subfolder if empty
+    REPORT_SPOOL_MAX_AGE: int = 3600  # seconds before unsent report files are removed
+
     # DeepSeek Settings
     API_KEY: str = ""
 
@@ -1,28 +1,199 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from api.core.config import settings
+from api.core.metrics import Histogram
+
+# Upper bounds (milliseconds) of the pool wait time histogram buckets
+POOL_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram(POOL_WAIT_BUCKETS_MS)
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_time.observe((time.perf_counter() - start) * 1000)
+
+    def recreate(self):
+        # Keep the recorded statistics when the pool is recreated (e.g. dispose)
+        pool = super().recreate()
+        pool.wait_time = self.wait_time
+        pool.timeouts = self.timeouts
+        return pool
+
+
+def create_engine_from_url(url: str) -> AsyncEngine:
+    """Create an async engine using the pool settings from configuration.
+
+    Args:
+        url: Async database URL
+
+    Returns:
+        AsyncEngine: Configured async engine
+    """
+    options = {"echo": False, "future": True}
+    backend = make_url(url)
+    if backend.get_backend_name() != "sqlite":
+        options.update(
+            poolclass=InstrumentedAsyncPool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    if backend.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        }
+    return create_async_engine(url, **options)
+
+
+def get_pool_stats(async_engine: AsyncEngine) -> dict:
+    """Get live statistics for the connection pool of an engine.
+
+    Args:
+        async_engine: Engine whose pool should be inspected
+
+    Returns:
+        dict: Pool size, checked out/in connections, overflow and wait times
+    """
+    pool = async_engine.pool
+    if not isinstance(pool, InstrumentedAsyncPool):
+        return {"pool": type(pool).__name__}
+
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+        "timeouts": pool.timeouts,
+        "wait_time_ms": pool.wait_time.snapshot(),
+    }
+
 
 # Create async engine
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+engine = create_engine_from_url(settings.DATABASE_URL)
 engine_sync = create_engine(settings.DATABASE_URL_SYNC, echo=False)
 
-# Create async session factory
+# Optional read replica engine
+read_engine = (
+    create_engine_from_url(settings.DATABASE_REPLICA_URL)
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+# Create async session factories, reads fall back to primary without a replica
 async_session = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False)
+async_read_session = (
+    sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    if read_engine is not None
+    else async_session
+)
+
+# Read-only methods that may be served by the replica
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Cookie set after a write so that the client reads its own writes from primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+# Header clients can send to force a read from primary
+READ_PRIMARY_HEADER = "X-Read-Primary"
 
 # Create declarative base for models
 Base = declarative_base()
 
 
-async def get_session() -> AsyncSession:
+def _reads_from_replica(request: Request | None) -> bool:
+    """Check whether a request can be served by the read replica."""
+    if request is None or request.method not in READ_ONLY_METHODS:
+        return False
+    if request.headers.get(READ_PRIMARY_HEADER):
+        return False
+
+    try:
+        pinned_until = float(request.cookies.get(READ_PRIMARY_COOKIE, 0))
+    except ValueError:
+        pinned_until = 0
+    return pinned_until < time.time()
+
+
+def get_session_factory(request: Request | None = None) -> sessionmaker:
+    """Pick the session factory for a request, replica or primary.
+
+    Read-only requests are routed to the read replica unless the client wrote
+    something within the last READ_YOUR_WRITES_WINDOW seconds or asked for the
+    primary explicitly. Any other request uses the primary.
+
+    Args:
+        request: Current request, or None for work outside a request
+
+    Returns:
+        sessionmaker: async_read_session or async_session
+    """
+    if async_read_session is not async_session and _reads_from_replica(request):
+        return async_read_session
+    return async_session
+
+
+def _pin_reads_to_primary(session: AsyncSession, response: Response) -> None:
+    """Keep the client's next reads on primary once this session commits."""
+
+    def after_commit(_) -> None:
+        window = settings.READ_YOUR_WRITES_WINDOW
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            str(time.time() + window),
+            max_age=window,
+            httponly=True,
+            samesite="lax",
+        )
+
+    event.listen(session.sync_session, "after_commit", after_commit)
+
+
+async def get_session(
+    request: Request = None, response: Response = None
+) -> AsyncSession:
     """Dependency for getting async database session.
 
+    The session is opened on the replica or the primary as decided by
+    get_session_factory.
+
+    Args:
+        request: Current request, if called as a FastAPI dependency
+        response: Current response, if called as a FastAPI dependency
+
     Yields:
         AsyncSession: Async database session
     """
-    async with async_session() as session:
+    has_replica = async_read_session is not async_session
+    session_factory = get_session_factory(request)
+
+    async with session_factory() as session:
+        if has_replica and response is not None and session_factory is async_session:
+            _pin_reads_to_primary(session, response)
         try:
             yield session
         finally:
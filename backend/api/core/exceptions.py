@@ -27,3 +27,33 @@ class ForbiddenException(HTTPException):
 
     def __init__(self, detail: str = "Access forbidden"):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+class BadRequestException(HTTPException):
+    """Base exception for malformed request errors."""
+
+    def __init__(self, detail: str = "Bad request"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class ConflictException(HTTPException):
+    """Base exception for requests conflicting with the current state."""
+
+    def __init__(self, detail: str = "Conflict with the current state"):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+class ServiceUnavailableException(HTTPException):
+    """Base exception for requests rejected while the server is saturated."""
+
+    def __init__(
+        self,
+        detail: str = "Service temporarily unavailable",
+        retry_after: int | None = None,
+    ):
+        headers = {"Retry-After": str(retry_after)} if retry_after else None
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers=headers,
+        )
@@ -0,0 +1,86 @@
+from typing import Any, Iterable
+
+from pydantic import BaseModel, model_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm import Load
+
+from api.core.exceptions import BadRequestException
+
+
+def parse_expand(expand: str | None, allowed: Iterable[str]) -> set[str]:
+    """Parse a comma separated `expand` query parameter.
+
+    Expanding a nested relationship (e.g. `product.company`) also expands its
+    parents (`product`).
+
+    Args:
+        expand: Raw query parameter value, if any
+        allowed: Relationship paths the endpoint can expand
+
+    Returns:
+        set[str]: Relationship paths to load
+
+    Raises:
+        BadRequestException: If a path cannot be expanded
+    """
+    if not expand:
+        return set()
+
+    paths = {path.strip() for path in expand.split(",") if path.strip()}
+    unknown = paths - set(allowed)
+    if unknown:
+        raise BadRequestException(f"Cannot expand: {', '.join(sorted(unknown))}")
+
+    for path in list(paths):
+        parts = path.split(".")
+        paths.update(".".join(parts[:depth]) for depth in range(1, len(parts)))
+    return paths
+
+
+def expand_options(entity: type, paths: Iterable[str]) -> list:
+    """Build loader options that eagerly load relationship paths.
+
+    Many-to-one relationships are joined into the main query and collections
+    are loaded with one extra SELECT ... IN query each, so the number of
+    queries does not depend on the number of rows.
+
+    Args:
+        entity: Mapped class the paths start from
+        paths: Relationship paths, as returned by parse_expand
+
+    Returns:
+        list: Options for Select.options()
+    """
+    options = []
+    for path in sorted(paths):
+        option, current = Load(entity), entity
+        for name in path.split("."):
+            attribute = getattr(current, name)
+            if attribute.property.uselist:
+                option = option.selectinload(attribute)
+            else:
+                option = option.joinedload(attribute)
+            current = attribute.property.mapper.class_
+        options.append(option)
+    return options
+
+
+class ExpandableResponse(BaseModel):
+    """Response schema that only reads the attributes already loaded.
+
+    Relationships that were not expanded are left unset instead of being lazy
+    loaded, which AsyncSession does not allow. Routes exclude unset fields so
+    they do not show up in the response.
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def _loaded_attributes(cls, data: Any) -> Any:
+        state = inspect(data, raiseerr=False)
+        if state is None or not hasattr(state, "unloaded"):
+            return data
+        return {
+            name: getattr(data, name)
+            for name in cls.model_fields
+            if name not in state.unloaded and hasattr(data, name)
+        }
@@ -0,0 +1,116 @@
+import csv
+import enum
+import io
+import json
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core import database
+from api.core.logging import get_logger
+
+# Set up logger
+logger = get_logger(__name__)
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 1000
+
+# Encoded bytes buffered before a chunk is sent to the client
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class ExportFormat(str, enum.Enum):
+    """Supported export file formats."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+RowSource = Callable[[AsyncSession], Awaitable[AsyncIterator]]
+
+
+def _csv_value(value):
+    """Flatten nested values (such as prices) into a JSON cell."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+async def _encode_rows(
+    rows: AsyncIterator, schema: type[BaseModel], file_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """Encode ORM rows with a response schema, in chunks of EXPORT_CHUNK_SIZE."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if file_format == ExportFormat.CSV:
+        writer.writerow(schema.model_fields)
+
+    async for row in rows:
+        data = schema.model_validate(row).model_dump(mode="json")
+        if file_format == ExportFormat.CSV:
+            writer.writerow([_csv_value(value) for value in data.values()])
+        else:
+            buffer.write(json.dumps(data, separators=(",", ":")))
+            buffer.write("\n")
+
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(
+    request: Request,
+    source: RowSource,
+    schema: type[BaseModel],
+    file_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """Stream the rows of a query to the client as CSV or NDJSON.
+
+    The request session is closed before a streaming body is sent, so the rows
+    are read with a session of their own, opened when the body starts and
+    closed when it ends or the client disconnects. It is opened on the replica
+    or the primary with the same rule as get_session, so an export right after
+    a write reads that write.
+
+    Args:
+        request: Current request, which decides the database to read from
+        source: Called with the export session, returns the rows to export
+        schema: Response schema used to serialize each row
+        file_format: Format of the exported file
+        filename: Name of the downloaded file, without extension
+
+    Returns:
+        StreamingResponse: Response streaming the encoded rows
+    """
+
+    session_factory = database.get_session_factory(request)
+
+    async def body() -> AsyncIterator[bytes]:
+        async with session_factory() as session:
+            rows = await source(session)
+            async for chunk in _encode_rows(rows, schema, file_format):
+                yield chunk
+        logger.info(f"Exported {filename} as {file_format.value}")
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{file_format.value}"'
+            )
+        },
+    )
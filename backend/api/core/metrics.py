@@ -0,0 +1,43 @@
+import threading
+from bisect import bisect_left
+
+
+class Histogram:
+    """Thread-safe histogram with fixed upper bucket bounds."""
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = tuple(sorted(bounds))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded observations."""
+        with self._lock:
+            # One extra bucket collects values above the last bound
+            self._counts = [0] * (len(self.bounds) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        with self._lock:
+            self._counts[bisect_left(self.bounds, value)] += 1
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def snapshot(self) -> dict:
+        """Return the current buckets and summary values.
+
+        Returns:
+            dict: Per-bucket counts keyed by upper bound, plus count, sum and max
+        """
+        with self._lock:
+            labels = [f"le_{bound:g}" for bound in self.bounds] + ["le_inf"]
+            return {
+                "buckets": dict(zip(labels, self._counts)),
+                "count": self._count,
+                "sum": round(self._sum, 3),
+                "max": round(self._max, 3),
+            }
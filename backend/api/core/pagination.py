@@ -0,0 +1,70 @@
+import base64
+import enum
+import json
+from typing import Any
+
+from fastapi import Response
+
+from api.core.exceptions import BadRequestException
+
+# Response header carrying the opaque cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class SortOrder(str, enum.Enum):
+    """Direction of a sort."""
+
+    ASC = "asc"
+    DESC = "desc"
+
+
+def encode_cursor(value: Any) -> str:
+    """Encode the sort key of the last returned row as an opaque cursor.
+
+    Args:
+        value: Sort key of the last row of the page
+
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = json.dumps({"after": value}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None, key_type: type = int) -> Any:
+    """Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor received from the client, if any
+        key_type: Expected type of the sort key
+
+    Returns:
+        Any: Sort key to continue after, or None without a cursor
+
+    Raises:
+        BadRequestException: If the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded))["after"]
+    except (ValueError, TypeError, KeyError):
+        raise BadRequestException("Invalid pagination cursor")
+
+    if not isinstance(value, key_type):
+        raise BadRequestException("Invalid pagination cursor")
+    return value
+
+
+def set_next_cursor(response: Response, items: list, key: str, limit: int) -> None:
+    """Expose the cursor of the next page when the current page is full.
+
+    Args:
+        response: Response to add the cursor header to
+        items: Rows of the current page, ordered by key
+        key: Attribute holding the sort key
+        limit: Requested page size
+    """
+    if items and len(items) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(items[-1], key))
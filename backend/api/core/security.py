@@ -1,28 +1,62 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from datetime import datetime, timedelta
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.core.cache import TTLCache
 from api.core.config import settings
+from api.core.database import get_session
+from api.core.exceptions import NotFoundException
 from api.src.users.models import User, UserRole
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Bounded pool for bcrypt, which would otherwise block the event loop
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Authenticated principals keyed by user id, so most requests skip the user query.
+# Writes to a user only invalidate the cache of the worker making them; other
+# workers keep the old principal for up to PRINCIPAL_CACHE_TTL seconds.
+principal_cache = TTLCache(
+    settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL
+)
+
+# ID of the user authenticated for the current request, for audit records
+current_user_id: ContextVar[int | None] = ContextVar("current_user_id", default=None)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
 
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_principal(mapper, connection, target: User) -> None:
+    """Drop a cached principal whenever its user row changes in this process."""
+    principal_cache.invalidate(target.id)
 
-def get_password_hash(password: str) -> str:
-    """Generate password hash."""
-    return pwd_context.hash(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash in the password hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def get_password_hash(password: str) -> str:
+    """Generate password hash in the password hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -35,8 +69,16 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    """Dependency to get current authenticated user."""
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_session),
+) -> User:
+    """Dependency to get current authenticated user.
+
+    The session is the same request-scoped session injected into the route
+    handler, so authenticating does not check out a second connection. Known
+    users are served from the principal cache without querying the database.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
@@ -53,15 +95,23 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError:
         raise credentials_exception
 
+    current_user_id.set(int(user_id))
+    principal = principal_cache.get(int(user_id))
+    if principal is not None:
+        return principal
+
     # Import here to avoid circular imports
-    from api.core.database import get_session
     from api.src.users.service import UserService
 
-    async for session in get_session():
+    try:
         user = await UserService(session).get_user(int(user_id))
-        if user is None:
-            raise credentials_exception
-        return user
+    except NotFoundException:
+        raise credentials_exception
+
+    # Cache a detached copy without the password hash
+    principal = User(id=user.id, email=user.email, role=user.role)
+    principal_cache.set(principal.id, principal)
+    return principal
 
 
 async def require_admin(current_user: User = Depends(get_current_user)) -> User:
@@ -1,8 +1,17 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 
 from api.core.config import settings
+from api.core.database import engine, get_pool_stats, read_engine
 from api.core.logging import get_logger, setup_logging
+from api.core.pagination import NEXT_CURSOR_HEADER
+from api.core.security import principal_cache, require_admin
 from api.src.companies.routes import router as companies_router
+from api.src.inventory.ledger import movement_writer
+from api.src.inventory.rendering import report_renderer
+from api.src.inventory.report_cache import report_cache
+from api.src.inventory.report_output import report_spool
 from api.src.inventory.routes import router as inventory_router
 from api.src.products.routes import router as products_router
 from api.src.users.routes import router as auth_router
@@ -22,6 +31,16 @@ run_migrations()
 # Set up logger for this module
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Write buffered stock movements and stop report workers on exit."""
+    yield
+    await movement_writer.stop()
+    await report_spool.stop()
+    report_renderer.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     debug=settings.DEBUG,
@@ -29,6 +48,7 @@ app = FastAPI(
     docs_url="/swagger",
     redoc_url=None,
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -37,6 +57,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -53,6 +74,21 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", dependencies=[Depends(require_admin)])
+async def metrics():
+    """Runtime statistics used to size the deployment, for admins only."""
+    database = {"primary": get_pool_stats(engine)}
+    if read_engine is not None:
+        database["replica"] = get_pool_stats(read_engine)
+    return {
+        "database": database,
+        "principal_cache": principal_cache.stats(),
+        "report_rendering": report_renderer.stats(),
+        "report_cache": report_cache.stats(),
+        "report_spool": report_spool.stats(),
+    }
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, String
+from sqlalchemy import BigInteger, Column, Sequence, String
 from sqlalchemy.orm import relationship
 
 from api.core.database import Base
 
+# Source of company data versions, shared so a recreated company never reuses
+# the version of a deleted one
+DATA_VERSION_SEQUENCE = Sequence("companies_data_version_seq")
+
 
 class Company(Base):
     """Company model."""
@@ -15,6 +19,10 @@ class Company(Base):
     address = Column(String, nullable=False)
     phone = Column(String, nullable=False)
 
+    # Changes whenever the data of the company's inventory report changes, in
+    # the same transaction, so cached reports can be checked with one lookup
+    data_version = Column(BigInteger, DATA_VERSION_SEQUENCE, index=True)
+
     # Relationships
     products = relationship(
         "Product", back_populates="company", cascade="all, delete-orphan"
@@ -1,12 +1,14 @@
-from typing import Optional
+from typing import Iterable, Optional
 
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
 
 from api.core.exceptions import AlreadyExistsException, NotFoundException
+from api.core.export import EXPORT_BATCH_SIZE
 from api.core.logging import get_logger
-from api.src.companies.models import Company
+from api.src.companies.models import DATA_VERSION_SEQUENCE, Company
 from api.src.companies.schemas import CompanyCreate, CompanyUpdate
+from api.src.products.models import Product
 
 logger = get_logger(__name__)
 
@@ -77,7 +79,7 @@ class CompanyRepository:
             stmt = (
                 update(Company)
                 .where(Company.nit == nit)
-                .values(**update_data)
+                .values(**update_data, data_version=DATA_VERSION_SEQUENCE.next_value())
                 .returning(Company)
             )
             result = await self.session.execute(stmt)
@@ -105,6 +107,55 @@ class CompanyRepository:
         await self.session.commit()
         logger.info(f"Deleted company with NIT: {nit}")
 
+    async def touch_products(self, product_ids: Iterable[int]) -> None:
+        """Give the companies of products a new data version, without committing.
+
+        Called in the transaction of every write that changes the data of the
+        companies' inventory reports, so cached reports stop matching once it
+        commits.
+
+        Args:
+            product_ids: IDs of the changed products, or of the products of
+                changed inventory items
+        """
+        company_nits = select(Product.company_nit).where(
+            Product.id.in_(set(product_ids))
+        )
+        # Rows are locked in NIT order so concurrent writes cannot deadlock;
+        # the lock does not block inserts of products referencing them
+        locked = (
+            select(Company.nit)
+            .where(Company.nit.in_(company_nits))
+            .order_by(Company.nit)
+            .with_for_update(key_share=True)
+            .subquery("locked")
+        )
+        await self.session.execute(
+            update(Company)
+            .where(Company.nit == locked.c.nit)
+            .values(data_version=DATA_VERSION_SEQUENCE.next_value())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_data_version(self, nit: str | None = None) -> tuple | None:
+        """Get the data version of the inventory report of a company.
+
+        Args:
+            nit: Company NIT, or None for the report of all companies
+
+        Returns:
+            tuple | None: Value that changes whenever the report data changes,
+            or None if the company does not exist
+        """
+        if nit is not None:
+            query = select(Company.data_version).where(Company.nit == nit)
+            version = (await self.session.execute(query)).one_or_none()
+            return tuple(version) if version else None
+
+        # Deleting a company lowers the count, any other write raises the max
+        query = select(func.max(Company.data_version), func.count(Company.nit))
+        return tuple((await self.session.execute(query)).one())
+
     async def get_by_nit(self, nit: str) -> Optional[Company]:
         """Get company by NIT.
 
@@ -126,16 +177,33 @@ class CompanyRepository:
 
         return company
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> list[Company]:
-        """Get all companies with pagination.
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, after: str | None = None
+    ) -> list[Company]:
+        """Get all companies ordered by NIT with pagination.
 
         Args:
             skip: Number of companies to skip
             limit: Maximum number of companies to return
+            after: Only return companies with a NIT greater than this (keyset)
 
         Returns:
             List[Company]: List of companies
         """
-        query = select(Company).offset(skip).limit(limit)
+        query = select(Company).order_by(Company.nit)
+        if after is not None:
+            query = query.where(Company.nit > after)
+        query = query.offset(skip).limit(limit)
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    async def stream_all(self) -> AsyncScalarResult[Company]:
+        """Stream all companies ordered by NIT from a server-side cursor.
+
+        Returns:
+            AsyncScalarResult[Company]: Companies, fetched in batches
+        """
+        query = select(Company).order_by(Company.nit)
+        return await self.session.stream_scalars(
+            query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
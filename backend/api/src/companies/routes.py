@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.database import get_session
+from api.core.export import ExportFormat, export_response
 from api.core.logging import get_logger
+from api.core.pagination import decode_cursor, set_next_cursor
 from api.core.security import get_current_user, require_admin
 from api.src.companies.schemas import (
     CompanyCreate,
@@ -30,14 +33,40 @@ async def create_company(
 
 @router.get("", response_model=list[CompanyResponse])
 async def get_companies(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
 ) -> list[CompanyResponse]:
-    """Get all companies."""
+    """Get all companies.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
     logger.debug(f"Getting companies with skip={skip}, limit={limit}")
-    return await CompanyService(session).get_companies(skip, limit)
+    companies = await CompanyService(session).get_companies(
+        skip, limit, decode_cursor(cursor, str)
+    )
+    set_next_cursor(response, companies, "nit", limit)
+    return companies
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_companies(
+    request: Request,
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    _: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Export all companies as NDJSON or CSV in a single streamed response."""
+    logger.debug(f"Exporting companies as {file_format.value}")
+    return export_response(
+        request,
+        lambda session: CompanyService(session).stream_companies(),
+        CompanyResponse,
+        file_format,
+        "companies",
+    )
 
 
 @router.get("/{nit}", response_model=CompanyResponse)
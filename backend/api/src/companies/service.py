@@ -1,4 +1,4 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
 
 from api.core.logging import get_logger
 from api.src.companies.models import Company
@@ -32,6 +32,12 @@ class CompanyService:
         """Get a company by NIT."""
         return await self.repository.get_by_nit(nit)
 
-    async def get_companies(self, skip: int = 0, limit: int = 100) -> list[Company]:
+    async def get_companies(
+        self, skip: int = 0, limit: int = 100, after: str | None = None
+    ) -> list[Company]:
         """Get all companies with pagination."""
-        return await self.repository.get_all(skip, limit)
+        return await self.repository.get_all(skip, limit, after)
+
+    async def stream_companies(self) -> AsyncScalarResult[Company]:
+        """Stream all companies for an export."""
+        return await self.repository.stream_all()
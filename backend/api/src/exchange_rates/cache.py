@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from api.core import database
+from api.core.cache import TTLCache
+from api.core.config import settings
+from api.core.exceptions import BadRequestException
+from api.core.logging import get_logger
+from api.src.exchange_rates.provider import (
+    DEFAULT_RATES_FILE,
+    ExchangeRateProvider,
+    FileExchangeRateProvider,
+)
+from api.src.exchange_rates.repository import ExchangeRateRepository
+
+# Set up logger
+logger = get_logger(__name__)
+
+_RATES_KEY = "rates"
+
+
+class ExchangeRateCache:
+    """Keep the exchange_rates table fresh from a provider, and its rates cached.
+
+    On a cache miss the provider is asked for the current rates, which are
+    stored in the table (where conversion queries join them) and cached in
+    process for `ttl` seconds. If the provider fails, the last stored rates
+    are used and the provider is asked again on the next call. Concurrent
+    misses may refresh more than once, which is harmless.
+    """
+
+    def __init__(self, provider: ExchangeRateProvider, ttl: float):
+        self.provider = provider
+        self._cache = TTLCache(maxsize=1, ttl=ttl)
+
+    async def get_rates(self) -> dict[str, Decimal]:
+        """Get the current rates by currency, refreshing them if expired."""
+        rates = self._cache.get(_RATES_KEY)
+        if rates is None:
+            rates = await self.refresh()
+        return rates
+
+    async def refresh(self) -> dict[str, Decimal]:
+        """Fetch rates from the provider and store them.
+
+        Returns:
+            dict[str, Decimal]: Stored rates by currency
+        """
+        try:
+            fetched = await self.provider.fetch()
+        except Exception as e:
+            logger.error(f"Error fetching exchange rates: {str(e)}")
+            fetched = None
+
+        async with database.async_session() as session:
+            repository = ExchangeRateRepository(session)
+            if fetched:
+                await repository.upsert(fetched)
+                await session.commit()
+            rates = await repository.get_all()
+
+        if fetched:
+            self._cache.set(_RATES_KEY, rates)
+        return rates
+
+    async def require(self, currency: str) -> None:
+        """Check that amounts can be converted to a currency.
+
+        Raises:
+            BadRequestException: If the currency has no exchange rate
+        """
+        if currency not in await self.get_rates():
+            raise BadRequestException(f"No exchange rate for currency {currency}")
+
+    def clear(self) -> None:
+        """Forget the cached rates so the next call refreshes them."""
+        self._cache.clear()
+
+
+exchange_rates = ExchangeRateCache(
+    FileExchangeRateProvider(settings.EXCHANGE_RATES_FILE or DEFAULT_RATES_FILE),
+    ttl=settings.EXCHANGE_RATE_TTL,
+)
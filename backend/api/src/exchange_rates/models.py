@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, Numeric, String, func
+
+from api.core.database import Base
+
+
+class ExchangeRate(Base):
+    """Value of one unit of a currency in the common base of the provider.
+
+    Only ratios between rates are meaningful: converting an amount from A to
+    B multiplies it by rate(A) / rate(B).
+    """
+
+    __tablename__ = "exchange_rates"
+
+    currency = Column(String, primary_key=True)
+    rate = Column(Numeric, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
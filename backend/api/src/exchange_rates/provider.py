@@ -0,0 +1,40 @@
+import json
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from pathlib import Path
+
+# Rates bundled with the application, used when no file is configured
+DEFAULT_RATES_FILE = Path(__file__).parent / "rates.json"
+
+
+class ExchangeRateProvider(ABC):
+    """Source of exchange rates, e.g. a file or a market data API."""
+
+    @abstractmethod
+    async def fetch(self) -> dict[str, Decimal]:
+        """Fetch the current rates.
+
+        Returns:
+            dict[str, Decimal]: Value of one unit of each currency in a common
+            base currency
+        """
+
+
+class FileExchangeRateProvider(ExchangeRateProvider):
+    """Read exchange rates from a JSON object of currency to rate."""
+
+    def __init__(self, path: str | Path = DEFAULT_RATES_FILE):
+        self.path = Path(path)
+
+    async def fetch(self) -> dict[str, Decimal]:
+        """Read the rates file.
+
+        Raises:
+            ValueError: If a rate is not a positive number
+        """
+        rates = json.loads(self.path.read_text())
+        parsed = {currency: Decimal(str(rate)) for currency, rate in rates.items()}
+        invalid = [currency for currency, rate in parsed.items() if rate <= 0]
+        if invalid:
+            raise ValueError(f"Invalid exchange rates for: {', '.join(invalid)}")
+        return parsed
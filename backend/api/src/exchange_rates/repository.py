@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+from sqlalchemy import Lateral, case, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.logging import get_logger
+from api.src.exchange_rates.models import ExchangeRate
+from api.src.products.models import Product, ProductPrice
+
+logger = get_logger(__name__)
+
+
+def unit_price_in(currency: str) -> Lateral:
+    """Lateral subquery with the price of the joined product in a currency.
+
+    The product's own price in the currency is used when it has one, else its
+    price in the first currency (alphabetically) with an exchange rate is
+    converted. The `price` column is NULL when no price can be converted.
+
+    Args:
+        currency: Target currency, which must have an exchange rate
+
+    Returns:
+        Lateral: Subquery to outer join on true, correlated to Product
+    """
+    target_rate = (
+        select(ExchangeRate.rate)
+        .where(ExchangeRate.currency == currency)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            case(
+                (ProductPrice.currency == currency, ProductPrice.amount),
+                else_=ProductPrice.amount * ExchangeRate.rate / target_rate,
+            ).label("price")
+        )
+        .join(ExchangeRate, ExchangeRate.currency == ProductPrice.currency)
+        .where(ProductPrice.product_id == Product.id)
+        .order_by(ProductPrice.currency != currency, ProductPrice.currency)
+        .limit(1)
+        .lateral("unit_price")
+    )
+
+
+class ExchangeRateRepository:
+    """Repository for handling exchange rate database operations."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_all(self) -> dict[str, Decimal]:
+        """Get every stored rate by currency."""
+        result = await self.session.execute(
+            select(ExchangeRate.currency, ExchangeRate.rate)
+        )
+        return dict(result.all())
+
+    async def upsert(self, rates: dict[str, Decimal]) -> None:
+        """Insert or update rates with one statement, without committing.
+
+        Currencies missing from rates keep their last known rate.
+
+        Args:
+            rates: Rate by currency
+        """
+        stmt = insert(ExchangeRate.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ExchangeRate.currency],
+            set_={"rate": stmt.excluded.rate, "updated_at": func.now()},
+        )
+        await self.session.execute(
+            stmt,
+            [{"currency": currency, "rate": rate} for currency, rate in rates.items()],
+        )
+        logger.info(f"Stored {len(rates)} exchange rates")
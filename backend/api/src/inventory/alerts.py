@@ -0,0 +1,55 @@
+from typing import Callable
+
+from api.core.logging import get_logger
+from api.src.inventory.schemas import LowStockAlert
+
+# Set up logger
+logger = get_logger(__name__)
+
+LowStockHandler = Callable[[LowStockAlert], None]
+
+
+class LowStockNotifier:
+    """Dispatch low-stock alerts to the subscribed handlers.
+
+    Write paths call notify() after committing a change that took an item's
+    quantity from above its reorder threshold to at or below it. Handlers run
+    inline on the request, so slow work (emails, webhooks) should be scheduled
+    by the handler rather than done in it. A failing handler is logged and
+    does not affect the others or the write.
+    """
+
+    def __init__(self):
+        self._handlers: list[LowStockHandler] = [self._log]
+
+    @staticmethod
+    def _log(alert: LowStockAlert) -> None:
+        """Default handler logging every alert."""
+        logger.warning(
+            f"Inventory item {alert.inventory_id} of product {alert.product_id} "
+            f"is low on stock: {alert.quantity} <= {alert.reorder_threshold}"
+        )
+
+    def subscribe(self, handler: LowStockHandler) -> None:
+        """Call handler with every future alert."""
+        self._handlers.append(handler)
+
+    def unsubscribe(self, handler: LowStockHandler) -> None:
+        """Stop calling a subscribed handler."""
+        self._handlers.remove(handler)
+
+    def notify(self, alerts: list[LowStockAlert]) -> None:
+        """Pass alerts to every handler.
+
+        Args:
+            alerts: Items that crossed their reorder threshold
+        """
+        for alert in alerts:
+            for handler in list(self._handlers):
+                try:
+                    handler(alert)
+                except Exception as e:
+                    logger.error(f"Error in low-stock handler {handler!r}: {str(e)}")
+
+
+low_stock_notifier = LowStockNotifier()
@@ -0,0 +1,145 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.logging import get_logger
+from api.src.inventory.repository import InventoryRepository
+from api.src.inventory.schemas import (
+    ImportFormat,
+    InventoryImportError,
+    InventoryImportResult,
+    InventoryImportRow,
+)
+
+# Set up logger
+logger = get_logger(__name__)
+
+# Bytes read from the upload at a time
+READ_CHUNK_SIZE = 64 * 1024
+
+# Valid rows applied per UPDATE statement
+IMPORT_CHUNK_SIZE = 1000
+
+# Rejected rows listed in the response, the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(filename: str | None) -> ImportFormat:
+    """Guess the file format from its extension, defaulting to CSV."""
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return ImportFormat.NDJSON
+    return ImportFormat.CSV
+
+
+async def iter_lines(upload: UploadFile) -> AsyncIterator[tuple[int, str]]:
+    """Yield numbered, non-empty lines of an upload without reading it whole."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, line_number = "", 0
+    while True:
+        chunk = await upload.read(READ_CHUNK_SIZE)
+        buffer += decoder.decode(chunk, final=not chunk)
+        *lines, buffer = buffer.split("\n")
+        if not chunk:
+            lines.append(buffer)
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line.rstrip("\r")
+        if not chunk:
+            return
+
+
+async def iter_records(
+    upload: UploadFile, file_format: ImportFormat
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Yield (line, record, error) for every data line of an upload."""
+    header = None
+    async for line_number, line in iter_lines(upload):
+        if file_format == ImportFormat.NDJSON:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, record, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_number, None, f"Expected {len(header)} columns"
+            continue
+        yield line_number, dict(zip(header, values)), None
+
+
+async def import_inventory(
+    session: AsyncSession, upload: UploadFile, file_format: ImportFormat
+) -> InventoryImportResult:
+    """Apply the stock counts of a CSV or NDJSON upload.
+
+    Rows are validated while the file is read and applied in batches of
+    IMPORT_CHUNK_SIZE, each batch with one UPDATE and its own commit, so only
+    one batch of rows is held in memory at a time.
+
+    Args:
+        session: Database session
+        upload: Uploaded file with `id` and `quantity` per row
+        file_format: Format of the file
+
+    Returns:
+        InventoryImportResult: Accepted and rejected row counts
+    """
+    repository = InventoryRepository(session)
+    result = InventoryImportResult(accepted=0, rejected=0, errors=[])
+    # Quantity and line number by inventory ID for the current batch
+    pending: dict[int, tuple[int, int]] = {}
+
+    def reject(line: int, detail: str) -> None:
+        result.rejected += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(InventoryImportError(line=line, detail=detail))
+
+    async def flush() -> None:
+        updated = await repository.set_quantities(
+            {inventory_id: quantity for inventory_id, (quantity, _) in pending.items()}
+        )
+        result.accepted += len(updated)
+        for inventory_id, (_, line) in pending.items():
+            if inventory_id not in updated:
+                reject(line, f"Inventory item with ID {inventory_id} not found")
+        pending.clear()
+
+    async for line, record, error in iter_records(upload, file_format):
+        if error:
+            reject(line, error)
+            continue
+        try:
+            row = InventoryImportRow.model_validate(record)
+        except ValidationError as e:
+            first = e.errors()[0]
+            reject(line, f"{'.'.join(map(str, first['loc']))}: {first['msg']}")
+            continue
+
+        # A repeated ID must not be applied out of order within one UPDATE
+        if row.id in pending or len(pending) >= IMPORT_CHUNK_SIZE:
+            await flush()
+        pending[row.id] = (row.quantity, line)
+
+    if pending:
+        await flush()
+
+    logger.info(
+        f"Imported inventory counts: {result.accepted} accepted, "
+        f"{result.rejected} rejected"
+    )
+    return result
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from api.core import database
+from api.core.config import settings
+from api.core.logging import get_logger
+from api.core.security import current_user_id
+from api.src.inventory.models import MovementReason, StockMovement
+
+# Set up logger
+logger = get_logger(__name__)
+
+
+class StockMovementWriter:
+    """Buffer stock movements in memory and insert them in batches.
+
+    Write paths call record() after committing their change, which only
+    appends to the buffer. A background task inserts the buffered movements
+    with one multi-row INSERT every `flush_interval` seconds, or as soon as
+    `max_rows` are waiting. Movements still buffered when the process dies are
+    lost, which is the price of keeping the ledger off the write latency.
+
+    Movements that fail to insert are kept for the next flush, but at most
+    `max_buffered` are held: while the database is down, the oldest ones are
+    dropped (and counted) rather than growing memory without limit.
+    """
+
+    def __init__(self, flush_interval: float, max_rows: int, max_buffered: int):
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_buffered = max_buffered
+        self.dropped = 0
+        self._buffer: list[dict] = []
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def _ensure_running(self) -> None:
+        """Start the flush task on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    def record(
+        self,
+        reason: MovementReason,
+        inventory_id: int,
+        product_id: int,
+        delta: int,
+        quantity: int,
+    ) -> None:
+        """Buffer a stock movement.
+
+        Args:
+            reason: Write path that changed the stock
+            inventory_id: Inventory item ID
+            product_id: Product ID of the item
+            delta: Change of the quantity
+            quantity: Quantity after the change
+        """
+        if not delta and reason not in (MovementReason.CREATE, MovementReason.DELETE):
+            return
+
+        self._ensure_running()
+        self._buffer.append(
+            {
+                "inventory_id": inventory_id,
+                "product_id": product_id,
+                "delta": delta,
+                "quantity": quantity,
+                "reason": reason,
+                "user_id": current_user_id.get(),
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+        self._trim()
+        if len(self._buffer) >= self.max_rows:
+            self._wakeup.set()
+
+    def _trim(self) -> None:
+        """Drop the oldest movements beyond max_buffered."""
+        excess = len(self._buffer) - self.max_buffered
+        if excess > 0:
+            del self._buffer[:excess]
+            self.dropped += excess
+            logger.error(f"Dropped {excess} stock movements, the ledger buffer is full")
+
+    async def _run(self) -> None:
+        """Flush the buffer periodically until cancelled."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Insert all buffered movements with one statement."""
+        rows, self._buffer = self._buffer, []
+        if not rows:
+            return
+
+        committed = False
+        try:
+            async with database.async_session() as session:
+                await session.execute(insert(StockMovement), rows)
+                await session.commit()
+                committed = True
+        except asyncio.CancelledError:
+            if not committed:
+                self._buffer[:0] = rows
+            raise
+        except Exception as e:
+            # Keep the movements for the next flush rather than dropping them
+            if not committed:
+                self._buffer[:0] = rows
+                self._trim()
+            logger.error(f"Error writing {len(rows)} stock movements: {str(e)}")
+            return
+        logger.debug(f"Wrote {len(rows)} stock movements")
+
+    async def stop(self) -> None:
+        """Stop the flush task and write what is left in the buffer."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+
+movement_writer = StockMovementWriter(
+    flush_interval=settings.STOCK_LEDGER_FLUSH_INTERVAL_MS / 1000,
+    max_rows=settings.STOCK_LEDGER_FLUSH_ROWS,
+    max_buffered=settings.STOCK_LEDGER_MAX_BUFFERED_ROWS,
+)
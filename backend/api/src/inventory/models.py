@@ -1,16 +1,44 @@
-from sqlalchemy import Column, ForeignKey, Integer
+import enum
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from api.core.database import Base
 
+# Currency of the rollup row holding a company's totals across all currencies
+ALL_CURRENCIES = ""
+
 
 class InventoryItem(Base):
     """Inventory item model."""
 
     __tablename__ = "inventory"
+    __table_args__ = (
+        Index("ix_inventory_product_id_id", "product_id", "id"),
+        # Only items at or below their reorder threshold, for low-stock listings
+        Index(
+            "ix_inventory_low_stock",
+            "id",
+            postgresql_where=text("quantity <= reorder_threshold"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     quantity = Column(Integer, default=0, nullable=False)
+    # Quantity at or below which the item needs reordering, None to not track
+    reorder_threshold = Column(Integer, nullable=True)
 
     # Foreign keys
     product_id = Column(
@@ -19,3 +47,67 @@ class InventoryItem(Base):
 
     # Relationships
     product = relationship("Product", back_populates="inventory_items")
+
+
+class InventoryRollup(Base):
+    """Stock totals of a company in one currency, kept up to date on writes.
+
+    The row with currency ALL_CURRENCIES counts every item of the company,
+    including items of products without prices.
+    """
+
+    __tablename__ = "inventory_rollups"
+
+    company_nit = Column(
+        String, ForeignKey("companies.nit", ondelete="CASCADE"), primary_key=True
+    )
+    currency = Column(String, primary_key=True)
+    items = Column(Integer, nullable=False, default=0)
+    total_quantity = Column(BigInteger, nullable=False, default=0)
+    total_value = Column(Numeric, nullable=False, default=0)
+
+
+class MovementReason(str, enum.Enum):
+    """Write path that changed the stock of an inventory item."""
+
+    CREATE = "create"
+    UPDATE = "update"
+    ADJUST = "adjust"
+    IMPORT = "import"
+    DELETE = "delete"
+
+
+class StockMovement(Base):
+    """Append-only record of a stock change, written in batches.
+
+    Inventory IDs are not foreign keys so the history outlives deleted items.
+    """
+
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index(
+            "ix_stock_movements_inventory_id_created_at", "inventory_id", "created_at"
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    inventory_id = Column(Integer, nullable=False)
+    product_id = Column(Integer, nullable=False)
+    delta = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)  # Quantity after the change
+    reason = Column(Enum(MovementReason), nullable=False)
+    user_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class StockSnapshot(Base):
+    """Quantity of an inventory item at the end of a day (UTC).
+
+    Written by compacting the stock movements of that day.
+    """
+
+    __tablename__ = "stock_snapshots"
+
+    inventory_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    quantity = Column(Integer, nullable=False)
@@ -1,95 +1,189 @@
+import hashlib
 import os
-import tempfile
 from datetime import datetime
-from pathlib import Path
+from typing import AsyncIterator
 
+import resend
 from fastapi import HTTPException
-from jinja2 import Environment, FileSystemLoader
-from sqlalchemy import select
+from sqlalchemy import Row, Select, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
-from weasyprint import HTML
 
+from api.core.config import settings
+from api.core.email import email_manager
 from api.core.logging import get_logger
 from api.src.companies.models import Company
+from api.src.companies.repository import CompanyRepository
+from api.src.exchange_rates.cache import exchange_rates
+from api.src.exchange_rates.repository import unit_price_in
 from api.src.inventory.models import InventoryItem
+from api.src.inventory.rendering import report_renderer, report_templates
+from api.src.inventory.report_cache import report_cache
+from api.src.inventory.report_output import ReportOutput, report_spool
+from api.src.inventory.repository import InventoryRepository
 from api.src.products.models import Product
-import resend
-from api.core.email import email_manager
-
-from fastapi.responses import FileResponse
 
 # Set up logger
 logger = get_logger(__name__)
 
-# Get the templates directory
-TEMPLATES_DIR = Path(__file__).parent / "templates"
+# Report template and the stylesheet it is rendered with
+REPORT_TEMPLATE = "inventory_report.html"
+REPORT_STYLESHEET = "inventory_report.css"
 
 
-async def get_inventory_data(session: AsyncSession, company_nit: str = None):
-    """Get inventory data for report."""
-    # Query to join inventory items with products and companies
-    if company_nit:
-        query = (
-            select(InventoryItem, Product, Company)
-            .join(Product, InventoryItem.product_id == Product.id)
-            .join(Company, Product.company_nit == Company.nit)
-            .where(Company.nit == company_nit)
-        )
-    else:
-        query = (
-            select(InventoryItem, Product, Company)
-            .join(Product, InventoryItem.product_id == Product.id)
-            .join(Company, Product.company_nit == Company.nit)
-        )
+def format_amount(currency: str, amount) -> str:
+    """Format an amount for the report, or N/A when it is unknown."""
+    if amount is None:
+        return "N/A"
+    return f"{currency} {amount:,.2f}"
 
-    result = await session.execute(query)
-    rows = result.all()
 
-    # Format data for the report
-    data = []
-    for inventory_item, product, company in rows:
-        # Get the first price (usually USD) for display in the report
-        price_currency, price_value = next(iter(product.prices.items()))
+def _inventory_data_query(company_nit: str | None, currency: str) -> Select:
+    """Build the query of the report rows, valued in one currency."""
+    unit_price = unit_price_in(currency)
+    # Query to join inventory items with products and companies
+    query = (
+        select(
+            Company.nit,
+            Company.name,
+            Product.code,
+            Product.name,
+            InventoryItem.quantity,
+            unit_price.c.price,
+            (InventoryItem.quantity * unit_price.c.price).label("total_value"),
+        )
+        .select_from(InventoryItem)
+        .join(Product, InventoryItem.product_id == Product.id)
+        .join(Company, Product.company_nit == Company.nit)
+        .outerjoin(unit_price, true())
+    )
+    if company_nit:
+        query = query.where(Company.nit == company_nit)
+    return query
+
+
+def _report_row(currency: str, row: Row) -> dict:
+    """Format a row of the report query for the template."""
+    nit, company_name, code, product_name, quantity, price, total_value = row
+    return {
+        "company_nit": nit,
+        "company_name": company_name,
+        "product_code": code,
+        "product_name": product_name,
+        "price": format_amount(currency, price),
+        "quantity": quantity,
+        "total_value": format_amount(currency, total_value),
+    }
 
-        data.append({
-            "company_nit": company.nit,
-            "company_name": company.name,
-            "product_code": product.code,
-            "product_name": product.name,
-            "price": f"{price_currency} {price_value}",
-            "quantity": inventory_item.quantity,
-            "total_value": price_value * inventory_item.quantity
-        })
 
-    return data
+async def get_inventory_data(
+    session: AsyncSession, company_nit: str = None, currency: str = None
+):
+    """Get inventory data for report, with prices and values in one currency.
 
+    Prices are picked or converted in the query (see unit_price_in), so no
+    row is valued in Python.
+    """
+    currency = currency or settings.REPORT_CURRENCY
+    result = await session.execute(_inventory_data_query(company_nit, currency))
+    return [_report_row(currency, row) for row in result.all()]
 
-async def generate_inventory_pdf(session: AsyncSession, company_nit: str = None):
-    """Generate PDF report of inventory using WeasyPrint and HTML template."""
-    # Get inventory data
-    inventory_data = await get_inventory_data(session, company_nit)
 
-    if not inventory_data:
-        raise HTTPException(status_code=404, detail="No inventory data found")
+async def stream_inventory_chunks(
+    session: AsyncSession,
+    company_nit: str = None,
+    currency: str = None,
+    chunk_rows: int = None,
+) -> AsyncIterator[tuple[list[dict], bool]]:
+    """Stream report rows from a server-side cursor in chunks.
 
-    # Create a temporary file for the PDF
-    fd, temp_path = tempfile.mkstemp(suffix=".pdf")
-    os.close(fd)
+    One chunk is read ahead to tell whether the current one is the last, so
+    at most two chunks are in memory however many rows the report has.
 
-    # Set up Jinja2 environment
-    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
-    template = env.get_template("inventory_report.html")
+    Args:
+        session: Database session
+        company_nit: Optional company NIT to filter inventory by company
+        currency: Optional currency of the report values
+        chunk_rows: Rows per chunk, REPORT_CHUNK_ROWS by default
 
-    # Calculate totals
-    total_quantity = sum(item["quantity"] for item in inventory_data)
+    Yields:
+        tuple[list[dict], bool]: Rows of a chunk and whether it is the last
+    """
+    currency = currency or settings.REPORT_CURRENCY
+    chunk_rows = chunk_rows or settings.REPORT_CHUNK_ROWS
+    query = _inventory_data_query(company_nit, currency)
+    result = await session.stream(query.execution_options(yield_per=chunk_rows))
+
+    previous = None
+    async for rows in result.partitions():
+        if previous is not None:
+            yield previous, False
+        previous = [_report_row(currency, row) for row in rows]
+    if previous is not None:
+        yield previous, True
+
+
+async def _render_chunked_pdf(
+    session: AsyncSession,
+    context: dict,
+    path: str,
+    company_nit: str = None,
+    currency: str = None,
+) -> None:
+    """Render a large report chunk by chunk and merge the chunks into path.
+
+    Every chunk is rendered and laid out in the pool on its own, numbering its
+    pages after those of the previous chunks, so neither this process nor the
+    render processes lay out more than a chunk of the report at a time. The
+    merge, also in the pool, copies the chunk files into path one at a time.
+    """
+    with report_spool.workspace() as directory:
+        paths, page_offset = [], 0
+        chunks = stream_inventory_chunks(session, company_nit, currency)
+        async for rows, last in chunks:
+            html_content = report_templates.render_html(
+                REPORT_TEMPLATE,
+                {
+                    **context,
+                    "inventory_data": rows,
+                    "first_chunk": not paths,
+                    "last_chunk": last,
+                    "page_offset": page_offset,
+                },
+            )
+            chunk_path = os.path.join(directory, f"{len(paths)}.pdf")
+            page_offset += await report_renderer.render_chunk(
+                html_content, chunk_path, REPORT_STYLESHEET
+            )
+            paths.append(chunk_path)
+        if not paths:
+            raise HTTPException(status_code=404, detail="No inventory data found")
+        await report_renderer.merge(paths, path)
+    logger.info(f"Merged {len(paths)} chunks of {page_offset} pages into {path}")
+
+
+async def generate_inventory_pdf(
+    session: AsyncSession, company_nit: str = None, currency: str = None
+) -> ReportOutput:
+    """Generate PDF report of inventory using WeasyPrint and HTML template.
+
+    Values are shown in `currency` (REPORT_CURRENCY by default), converting
+    prices in other currencies at the cached exchange rates. Reports of more
+    than REPORT_CHUNK_ROWS items are streamed from the database and rendered
+    in chunks, so memory use does not grow with the size of the inventory.
+
+    Reports are rendered in memory; only chunked reports are written to a file
+    of the report spool. Callers must release() the output once sent.
+    """
+    currency = currency or settings.REPORT_CURRENCY
+    await exchange_rates.require(currency)
 
-    # For total value, we need to standardize to one currency
-    # Here we'll use the first item's currency as the standard
-    if inventory_data:
-        currency = inventory_data[0]["price"].split()[0]
-        total_value = f"{currency} {sum(item['total_value'] for item in inventory_data)}"
-    else:
-        total_value = "0"
+    # Calculate totals in SQL, valuing every item once in the report currency
+    repository = InventoryRepository(session)
+    summaries = await repository.get_summary(company_nit)
+    items = sum(summary.items for summary in summaries)
+    total_quantity = sum(summary.total_quantity for summary in summaries)
+    converted = await repository.get_converted_totals(currency, company_nit)
+    total_value = format_amount(currency, sum(converted.values()))
 
     # Get company info if filtering by company
     company = None
@@ -106,24 +200,105 @@ async def generate_inventory_pdf(session: AsyncSession, company_nit: str = None)
     context = {
         "title": title,
         "generation_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "inventory_data": inventory_data,
         "company": company,
         "total_quantity": total_quantity,
         "total_value": total_value,
-        "current_year": datetime.now().year
+        "current_year": datetime.now().year,
+        "first_chunk": True,
+        "last_chunk": True,
+        "page_offset": None,
     }
 
-    # Render HTML
-    html_content = template.render(**context)
+    # Generate PDF in the render pool, off the event loop
+    if items > settings.REPORT_CHUNK_ROWS:
+        output = ReportOutput(path=report_spool.create())
+        try:
+            await _render_chunked_pdf(
+                session, context, output.path, company_nit, currency
+            )
+        except BaseException:
+            output.release()
+            raise
+        logger.info(f"Generated inventory PDF report at {output.path}")
+        return output
+
+    inventory_data = await get_inventory_data(session, company_nit, currency)
+    if not inventory_data:
+        raise HTTPException(status_code=404, detail="No inventory data found")
+    context["inventory_data"] = inventory_data
+    # Render HTML with the precompiled template
+    html_content = report_templates.render_html(REPORT_TEMPLATE, context)
+    content = await report_renderer.render(html_content, REPORT_STYLESHEET)
+    logger.info(f"Generated inventory PDF report of {len(content)} bytes")
+    return ReportOutput(content=content)
+
+
+async def get_report_etag(
+    session: AsyncSession, company_nit: str = None, currency: str = None
+) -> str:
+    """Get the ETag of an inventory report without generating it.
+
+    The ETag is derived from the data version of the company (or of all
+    companies), the currency and the exchange rates, so it changes whenever
+    the report would, and costs a single indexed lookup.
+
+    Args:
+        session: Database session
+        company_nit: Optional company NIT to filter inventory by company
+        currency: Optional currency of the report values
 
-    # Generate PDF
-    HTML(string=html_content).write_pdf(temp_path)
+    Returns:
+        str: Quoted ETag
 
-    logger.info(f"Generated inventory PDF report at {temp_path}")
-    return temp_path
+    Raises:
+        HTTPException: If the company does not exist
+    """
+    currency = currency or settings.REPORT_CURRENCY
+    version = await CompanyRepository(session).get_data_version(company_nit)
+    if version is None:
+        raise HTTPException(status_code=404, detail="No inventory data found")
 
+    rates = sorted((await exchange_rates.get_rates()).items())
+    key = repr((company_nit, currency, version, rates)).encode()
+    return f'"{hashlib.sha256(key).hexdigest()[:32]}"'
 
-async def send_pdf_by_email(session: AsyncSession, email_to: str, company_nit: str = None) -> bool:
+
+async def get_inventory_pdf(
+    session: AsyncSession,
+    etag: str,
+    company_nit: str = None,
+    currency: str = None,
+) -> ReportOutput:
+    """Get an inventory report PDF from the report cache, generating it on a miss.
+
+    Only reports rendered in memory are cached; spilled reports are left in
+    their file, to be streamed from it.
+
+    Args:
+        session: Database session
+        etag: ETag of the report, from get_report_etag
+        company_nit: Optional company NIT to filter inventory by company
+        currency: Optional currency of the report values
+
+    Returns:
+        ReportOutput: The PDF, to be released once sent
+    """
+    content = report_cache.get(etag)
+    if content is not None:
+        return ReportOutput(content=content)
+
+    output = await generate_inventory_pdf(session, company_nit, currency)
+    if output.in_memory:
+        report_cache.set(etag, output.content)
+    return output
+
+
+async def send_pdf_by_email(
+    session: AsyncSession,
+    email_to: str,
+    company_nit: str = None,
+    currency: str = None,
+) -> bool:
     """Send inventory report PDF by email.
 
     This function generates a PDF report using WeasyPrint and sends it via email.
@@ -134,6 +309,7 @@ async def send_pdf_by_email(session: AsyncSession, email_to: str, company_nit: s
         session: Database session
         email_to: Recipient email address
         company_nit: Optional company NIT to filter inventory by company
+        currency: Optional currency of the report values
 
     Returns:
         bool: True if email was sent successfully
@@ -145,7 +321,7 @@ async def send_pdf_by_email(session: AsyncSession, email_to: str, company_nit: s
         print("Generating inventory PDF report",
               session, email_to, company_nit)
         # Generate the PDF using WeasyPrint
-        pdf_path = await generate_inventory_pdf(session, company_nit)
+        output = await generate_inventory_pdf(session, company_nit, currency)
 
         # Get company name if company_nit is provided
         company_name = None
@@ -172,24 +348,22 @@ Best regards,
 Lite Thinking Team
 """
 
-        # Attach PDF
-        f: bytes = open(
-            pdf_path, "rb"
-        ).read()
-        attachment: resend.Attachment = {
-            "content": list(f), "filename": "inventory_report.pdf"}
-
-        await email_manager.send_email(
-            email_to,
-            email_subject,
-            email_body,
-            [
-                attachment
-            ]
-        )
-
-        # Clean up temporary file
-        os.unlink(pdf_path)
+        # Attach PDF, releasing its file even if sending fails
+        try:
+            f: bytes = output.read()
+            attachment: resend.Attachment = {
+                "content": list(f), "filename": "inventory_report.pdf"}
+
+            await email_manager.send_email(
+                email_to,
+                email_subject,
+                email_body,
+                [
+                    attachment
+                ]
+            )
+        finally:
+            output.release()
 
         logger.info(f"Sent inventory report to {email_to} via resend")
         return True
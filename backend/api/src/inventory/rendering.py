@@ -0,0 +1,450 @@
+import asyncio
+import copy
+import gc
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, BinaryIO, Callable
+
+from jinja2 import Environment, FileSystemLoader
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NullObject,
+    NumberObject,
+    PdfObject,
+)
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from api.core.config import settings
+from api.core.exceptions import ServiceUnavailableException
+from api.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Report templates and their stylesheets
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+# Seconds a client rejected by a saturated pool is asked to wait before retrying
+RETRY_AFTER = 5
+
+# Object numbers of the catalog, page tree and metadata of a merged PDF
+CATALOG, PAGES, INFO = 1, 2, 3
+
+
+class ReportTemplates:
+    """Report templates and stylesheets, compiled once per process.
+
+    Jinja2 templates are compiled on first use and WeasyPrint stylesheets are
+    parsed once, sharing one font configuration, so a report only pays for
+    its own content. With `reload` set (in DEBUG), changed template and
+    stylesheet files are picked up on the next report.
+    """
+
+    def __init__(self, directory: Path, reload: bool = False):
+        """Initialize the templates.
+
+        Args:
+            directory: Directory of the templates and stylesheets
+            reload: Whether to check the files for changes on every use
+        """
+        self.directory = directory
+        self.reload = reload
+        self.environment = Environment(
+            loader=FileSystemLoader(directory), auto_reload=reload
+        )
+        self._font_config: FontConfiguration | None = None
+        self._stylesheets: dict[str, tuple[float, CSS]] = {}
+
+    @property
+    def font_config(self) -> FontConfiguration:
+        """Font configuration shared by the stylesheets and documents."""
+        if self._font_config is None:
+            self._font_config = FontConfiguration()
+        return self._font_config
+
+    def render_html(self, name: str, context: dict) -> str:
+        """Render a template with a context.
+
+        Args:
+            name: File name of the template
+            context: Template variables
+
+        Returns:
+            str: Rendered HTML
+        """
+        return self.environment.get_template(name).render(**context)
+
+    def stylesheet(self, name: str) -> CSS:
+        """Get a parsed stylesheet, parsing it on first use or after a change.
+
+        Args:
+            name: File name of the stylesheet
+
+        Returns:
+            CSS: Parsed stylesheet
+        """
+        cached = self._stylesheets.get(name)
+        if cached is not None and not self.reload:
+            return cached[1]
+
+        path = self.directory / name
+        modified = path.stat().st_mtime
+        if cached is None or cached[0] != modified:
+            logger.debug(f"Parsing report stylesheet {name}")
+            stylesheet = CSS(filename=str(path), font_config=self.font_config)
+            cached = self._stylesheets[name] = (modified, stylesheet)
+        return cached[1]
+
+    def write_pdf(self, html_content: str, stylesheet: str) -> bytes:
+        """Render an HTML document to PDF in memory with a stylesheet.
+
+        Args:
+            html_content: Rendered HTML of the report
+            stylesheet: File name of the stylesheet
+
+        Returns:
+            bytes: Content of the PDF
+        """
+        return HTML(string=html_content).write_pdf(
+            stylesheets=[self.stylesheet(stylesheet)],
+            font_config=self.font_config,
+        )
+
+    def write_pdf_chunk(self, html_content: str, path: str, stylesheet: str) -> int:
+        """Render one chunk of a large report to a PDF file.
+
+        Args:
+            html_content: Rendered HTML of the chunk
+            path: File to write the PDF to
+            stylesheet: File name of the stylesheet
+
+        Returns:
+            int: Number of pages of the chunk
+        """
+        document = HTML(string=html_content).render(
+            stylesheets=[self.stylesheet(stylesheet)], font_config=self.font_config
+        )
+        document.write_pdf(path)
+        return len(document.pages)
+
+
+report_templates = ReportTemplates(TEMPLATES_DIR, reload=settings.DEBUG)
+
+
+def write_pdf(html_content: str, stylesheet: str) -> bytes:
+    """Render an HTML document to PDF in memory. Runs in a worker process."""
+    return report_templates.write_pdf(html_content, stylesheet)
+
+
+def write_pdf_chunk(html_content: str, path: str, stylesheet: str) -> int:
+    """Render a chunk of a large report to a PDF file. Runs in a worker process."""
+    return report_templates.write_pdf_chunk(html_content, path, stylesheet)
+
+
+class StreamingPdfWriter:
+    """PDF file written object by object, to concatenate large PDFs.
+
+    pypdf's PdfWriter holds every object of a document in memory until it is
+    written. Here the objects reachable from the pages of each appended file
+    are renumbered and written out straight away, so memory use is bounded by
+    the largest input file, not by the merged document. Only the offset of
+    each object and the number of each page are kept, for the page tree and
+    cross-reference table written by close().
+    """
+
+    def __init__(self, output: BinaryIO):
+        """Initialize the writer and write the PDF header.
+
+        Args:
+            output: Binary file to write the PDF to
+        """
+        self.output = output
+        self.info: DictionaryObject | None = None
+        # Offsets of the objects by number - 1; catalog, pages and info are
+        # written last, by close()
+        self._offsets = [0, 0, 0]
+        self._pages: list[int] = []
+        output.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def _reserve(self) -> int:
+        """Reserve the number of a new object."""
+        self._offsets.append(0)
+        return len(self._offsets)
+
+    def _write(self, number: int, obj: PdfObject) -> None:
+        """Write an indirect object to the output."""
+        self._offsets[number - 1] = self.output.tell()
+        self.output.write(b"%d 0 obj\n" % number)
+        obj.write_to_stream(self.output)
+        self.output.write(b"\nendobj\n")
+
+    def append(self, path: str) -> None:
+        """Append the pages of a PDF file, keeping the metadata of the first.
+
+        Args:
+            path: PDF file to append
+        """
+        reader = PdfReader(path)
+        numbers: dict[tuple[int, int], int] = {}
+        queue: deque[IndirectObject] = deque()
+
+        def renumber(obj: PdfObject) -> PdfObject:
+            if isinstance(obj, IndirectObject):
+                key = (obj.idnum, obj.generation)
+                if key not in numbers:
+                    numbers[key] = self._reserve()
+                    queue.append(obj)
+                return IndirectObject(numbers[key], 0, None)
+            if isinstance(obj, DictionaryObject):
+                # Copied to keep the data of streams
+                renumbered = copy.copy(obj)
+                for key, value in obj.items():
+                    renumbered[key] = renumber(value)
+                return renumbered
+            if isinstance(obj, ArrayObject):
+                return ArrayObject(renumber(value) for value in obj)
+            return obj
+
+        pages = set()
+        for page in reader.pages:
+            reference = page.indirect_reference
+            pages.add((reference.idnum, reference.generation))
+            self._pages.append(renumber(reference).idnum)
+        if self.info is None:
+            info = reader.trailer.get("/Info")
+            self.info = renumber(info.get_object()) if info else DictionaryObject()
+
+        parent = IndirectObject(PAGES, 0, None)
+        while queue:
+            reference = queue.popleft()
+            key = (reference.idnum, reference.generation)
+            obj = reference.get_object()
+            if obj is None:
+                obj = NullObject()
+            elif key in pages:
+                # Moved from the page tree of the file to the merged one
+                obj = renumber(
+                    DictionaryObject(
+                        {
+                            name: value
+                            for name, value in obj.items()
+                            if name != "/Parent"
+                        }
+                    )
+                )
+                obj[NameObject("/Parent")] = parent
+            else:
+                obj = renumber(obj)
+            self._write(numbers[key], obj)
+
+    def close(self) -> None:
+        """Write the page tree, catalog, metadata and cross-reference table."""
+        self._offsets[PAGES - 1] = self.output.tell()
+        self.output.write(
+            b"%d 0 obj\n<< /Type /Pages /Count %d /Kids [" % (PAGES, len(self._pages))
+        )
+        for number in self._pages:
+            self.output.write(b" %d 0 R" % number)
+        self.output.write(b" ] >>\nendobj\n")
+        self._write(
+            CATALOG,
+            DictionaryObject(
+                {
+                    NameObject("/Type"): NameObject("/Catalog"),
+                    NameObject("/Pages"): IndirectObject(PAGES, 0, None),
+                }
+            ),
+        )
+        self._write(INFO, self.info or DictionaryObject())
+
+        startxref = self.output.tell()
+        self.output.write(
+            b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._offsets) + 1)
+        )
+        for offset in self._offsets:
+            self.output.write(b"%010d 00000 n \n" % offset)
+        self.output.write(b"trailer\n")
+        DictionaryObject(
+            {
+                NameObject("/Size"): NumberObject(len(self._offsets) + 1),
+                NameObject("/Root"): IndirectObject(CATALOG, 0, None),
+                NameObject("/Info"): IndirectObject(INFO, 0, None),
+            }
+        ).write_to_stream(self.output)
+        self.output.write(b"\nstartxref\n%d\n%%%%EOF\n" % startxref)
+
+
+def merge_pdfs(paths: list[str], path: str) -> None:
+    """Concatenate the pages of PDF files into one PDF file.
+
+    Input files are read one at a time and their pages written out as they
+    are copied, so memory use does not grow with the number of files. The
+    document metadata (title, producer) of the first file is kept. Runs in a
+    worker process.
+
+    Args:
+        paths: Input files, in page order
+        path: Output file
+    """
+    with open(path, "wb") as output:
+        writer = StreamingPdfWriter(output)
+        for input_path in paths:
+            writer.append(input_path)
+            # Readers are reference cycles; free each before reading the next
+            gc.collect()
+        writer.close()
+
+
+class ReportRenderPool:
+    """Bounded process pool for rendering report PDFs.
+
+    WeasyPrint is synchronous and CPU bound, so rendering on the event loop
+    stalls every other request of the worker. Renders run in at most `workers`
+    processes, and up to `queue_size` more wait for a free one; beyond that,
+    new renders are rejected with 503 instead of piling up.
+
+    The processes are started on first use with the spawn method, so they do
+    not inherit the event loop, connection pools or threads of the app.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        """Initialize the pool.
+
+        Args:
+            workers: Maximum number of reports rendered at the same time
+            queue_size: Maximum number of renders waiting for a free process
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rejected = 0
+        self._pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a function in the pool and wait for its result.
+
+        A render counts against the limits until its process finishes it, even
+        if the request waiting for it is cancelled; a render cancelled while
+        still queued is dropped.
+
+        Args:
+            fn: Picklable module level function to call
+            *args: Picklable arguments of the function
+
+        Returns:
+            Any: Return value of the function
+
+        Raises:
+            ServiceUnavailableException: If the pool and its queue are full
+        """
+        if self._pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            logger.warning(
+                f"Rejected report render, {self._pending} already in progress"
+            )
+            raise ServiceUnavailableException(
+                "Too many reports are being generated, try again later",
+                retry_after=RETRY_AFTER,
+            )
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool
+            logger.error("Report render pool is broken, restarting it")
+            self._executor = None
+            future = self._get_executor().submit(fn, *args)
+
+        self._pending += 1
+
+        def release(_: Future) -> None:
+            loop.call_soon_threadsafe(self._release)
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    async def render(self, html_content: str, stylesheet: str) -> bytes:
+        """Render an HTML document to PDF in the pool.
+
+        Each worker process parses the stylesheet once and reuses it. The PDF
+        is sent back through the pool rather than written to a file.
+
+        Args:
+            html_content: Rendered HTML of the report
+            stylesheet: File name of the stylesheet in TEMPLATES_DIR
+
+        Returns:
+            bytes: Content of the PDF
+
+        Raises:
+            ServiceUnavailableException: If the pool and its queue are full
+        """
+        return await self.run(write_pdf, html_content, stylesheet)
+
+    async def render_chunk(self, html_content: str, path: str, stylesheet: str) -> int:
+        """Render a chunk of a large report to a PDF file in the pool.
+
+        Args:
+            html_content: Rendered HTML of the chunk
+            path: File to write the PDF to
+            stylesheet: File name of the stylesheet in TEMPLATES_DIR
+
+        Returns:
+            int: Number of pages of the chunk
+
+        Raises:
+            ServiceUnavailableException: If the pool and its queue are full
+        """
+        return await self.run(write_pdf_chunk, html_content, path, stylesheet)
+
+    async def merge(self, paths: list[str], path: str) -> None:
+        """Concatenate the PDF files of report chunks in the pool.
+
+        Args:
+            paths: Chunk files, in page order
+            path: File to write the merged PDF to
+
+        Raises:
+            ServiceUnavailableException: If the pool and its queue are full
+        """
+        await self.run(merge_pdfs, paths, path)
+
+    def stats(self) -> dict:
+        """Return pool limits, current load and rejected renders."""
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "rendering": min(self._pending, self.workers),
+            "queued": max(0, self._pending - self.workers),
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, dropping queued renders."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+report_renderer = ReportRenderPool(
+    settings.REPORT_RENDER_WORKERS, settings.REPORT_RENDER_QUEUE_SIZE
+)
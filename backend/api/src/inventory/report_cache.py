@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+from api.core.config import settings
+
+
+class ReportCache:
+    """LRU cache of rendered report PDFs, bounded by their total size.
+
+    Entries are keyed by the report ETag, which is derived from the version of
+    the report data, so an entry never goes stale: once the data changes it is
+    no longer requested and ages out. The cache is local to the process.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Maximum total size of the cached PDFs, 0 disables it
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    def get(self, etag: str) -> bytes | None:
+        """Get a cached PDF by its ETag, or None if it is not cached."""
+        content = self._entries.get(etag)
+        if content is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(etag)
+        self.hits += 1
+        return content
+
+    def set(self, etag: str, content: bytes) -> None:
+        """Store a PDF, evicting the least recently used ones to make room.
+
+        PDFs larger than the whole cache are not stored.
+        """
+        if len(content) > self.max_bytes:
+            return
+        self.invalidate(etag)
+        self._entries[etag] = content
+        self._size += len(content)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def invalidate(self, etag: str) -> None:
+        """Remove a single PDF from the cache."""
+        content = self._entries.pop(etag, None)
+        if content is not None:
+            self._size -= len(content)
+
+    def clear(self) -> None:
+        """Remove every PDF from the cache."""
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters for monitoring."""
+        return {
+            "reports": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+report_cache = ReportCache(settings.REPORT_CACHE_MAX_BYTES)
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.responses import FileResponse, Response
+from starlette.background import BackgroundTask
+
+from api.core.config import settings
+from api.core.logging import get_logger
+
+# Set up logger
+logger = get_logger(__name__)
+
+# Seconds between two sweeps of the spool directory
+CLEANUP_INTERVAL = 60
+
+# Name prefixes of the report files and chunk directories of the spool
+FILE_PREFIX = "report-"
+WORKSPACE_PREFIX = "chunks-"
+
+
+class ReportOutput:
+    """A rendered report PDF, held in memory or spilled to a file.
+
+    Reports are rendered to memory; only large reports, which are merged from
+    chunk files, are left in a file of the report spool. release() deletes
+    that file, and is safe to call more than once.
+    """
+
+    def __init__(self, content: bytes | None = None, path: str | None = None):
+        """Initialize the output.
+
+        Args:
+            content: Content of the PDF, if it is held in memory
+            path: File of the PDF, if it was spilled to disk
+        """
+        self.content = content
+        self.path = path
+
+    @property
+    def in_memory(self) -> bool:
+        """Whether the PDF is held in memory."""
+        return self.content is not None
+
+    def read(self) -> bytes:
+        """Get the content of the PDF, reading it from its file if spilled."""
+        if self.content is not None:
+            return self.content
+        return Path(self.path).read_bytes()
+
+    def response(self, headers: dict[str, str]) -> Response:
+        """Build a response that sends the PDF to the client.
+
+        A spilled PDF is streamed from its file, which is deleted once it has
+        been sent.
+
+        Args:
+            headers: Headers of the response
+
+        Returns:
+            Response: PDF response
+        """
+        if self.content is not None:
+            return Response(self.content, media_type="application/pdf", headers=headers)
+        return FileResponse(
+            self.path,
+            media_type="application/pdf",
+            headers=headers,
+            background=BackgroundTask(self.release),
+        )
+
+    def release(self) -> None:
+        """Delete the file of a spilled PDF."""
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self.content = None
+
+
+class ReportSpool:
+    """Directory of report files too large to keep in memory.
+
+    Files are deleted as soon as their report has been sent, but a request
+    can be cancelled (e.g. the client disconnects) or a process killed before
+    that happens. A background task started on first use removes the report
+    files and chunk directories older than `max_age` seconds, so leftovers
+    never pile up on disk. Other entries of the directory are left alone, and
+    the directory can be shared by the workers of a deployment.
+    """
+
+    def __init__(self, directory: Path, max_age: float):
+        """Initialize the spool.
+
+        Args:
+            directory: Directory of the report files
+            max_age: Seconds after which a report file is considered leaked
+        """
+        self.directory = directory
+        self.max_age = max_age
+        self.removed = 0
+        self._task: asyncio.Task | None = None
+
+    def _ensure_running(self) -> None:
+        """Start the cleanup task on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def create(self) -> str:
+        """Create an empty file for a report.
+
+        Returns:
+            str: Path of the file
+        """
+        self._ensure_running()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(
+            prefix=FILE_PREFIX, suffix=".pdf", dir=self.directory
+        )
+        os.close(fd)
+        return path
+
+    def workspace(self) -> tempfile.TemporaryDirectory:
+        """Create a temporary directory for the chunk files of a report.
+
+        Returns:
+            tempfile.TemporaryDirectory: Directory, removed when its context exits
+        """
+        self._ensure_running()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return tempfile.TemporaryDirectory(prefix=WORKSPACE_PREFIX, dir=self.directory)
+
+    def cleanup(self) -> int:
+        """Remove the report files and chunk directories older than max_age.
+
+        Only entries named like the ones create() and workspace() make are
+        considered, so a directory shared with other data is safe to sweep.
+
+        Returns:
+            int: Number of entries removed
+        """
+        removed = 0
+        deadline = time.time() - self.max_age
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime >= deadline:
+                    continue
+                if entry.name.startswith(WORKSPACE_PREFIX) and entry.is_dir(
+                    follow_symlinks=False
+                ):
+                    shutil.rmtree(entry.path)
+                elif entry.name.startswith(FILE_PREFIX) and entry.is_file(
+                    follow_symlinks=False
+                ):
+                    os.unlink(entry.path)
+                else:
+                    continue
+            except FileNotFoundError:
+                # Released or swept by another worker in the meantime
+                continue
+            removed += 1
+        if removed:
+            logger.warning(f"Removed {removed} leftover report files")
+            self.removed += removed
+        return removed
+
+    async def _run(self) -> None:
+        """Sweep the directory periodically until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.cleanup)
+            except OSError as e:
+                logger.error(f"Error cleaning up report files: {str(e)}")
+            await asyncio.sleep(CLEANUP_INTERVAL)
+
+    def stats(self) -> dict:
+        """Return the number of leftover report files removed."""
+        return {"directory": str(self.directory), "removed": self.removed}
+
+    async def stop(self) -> None:
+        """Stop the cleanup task."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+report_spool = ReportSpool(
+    (
+        Path(settings.REPORT_SPOOL_DIR)
+        if settings.REPORT_SPOOL_DIR
+        else Path(tempfile.gettempdir()) / "inventory-reports"
+    ),
+    max_age=settings.REPORT_SPOOL_MAX_AGE,
+)
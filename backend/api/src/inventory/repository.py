@@ -1,19 +1,106 @@
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable
 
-from api.core.exceptions import NotFoundException
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    FromClause,
+    Integer,
+    Numeric,
+    Select,
+    any_,
+    asc,
+    bindparam,
+    cast,
+    column,
+    delete,
+    desc,
+    func,
+    literal,
+    not_,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from api.core.exceptions import (
+    BadRequestException,
+    ConflictException,
+    NotFoundException,
+)
+from api.core.expand import expand_options
+from api.core.export import EXPORT_BATCH_SIZE
 from api.core.logging import get_logger
-from api.src.inventory.models import InventoryItem
-from api.src.inventory.schemas import InventoryItemCreate, InventoryItemUpdate
+from api.core.pagination import SortOrder
+from api.src.companies.models import Company
+from api.src.companies.repository import CompanyRepository
+from api.src.exchange_rates.repository import unit_price_in
+from api.src.inventory.alerts import low_stock_notifier
+from api.src.inventory.ledger import movement_writer
+from api.src.inventory.models import (
+    ALL_CURRENCIES,
+    InventoryItem,
+    InventoryRollup,
+    MovementReason,
+    StockMovement,
+    StockSnapshot,
+)
+from api.src.inventory.schemas import (
+    InventoryItemCreate,
+    InventoryItemUpdate,
+    InventoryRollupMismatch,
+    InventorySort,
+    InventorySummary,
+    LowStockAlert,
+)
+from api.src.products.models import Product
 
 logger = get_logger(__name__)
 
 
+def _crossed_threshold(
+    old_quantity: ColumnElement, old_threshold: ColumnElement
+) -> ColumnElement[bool]:
+    """Whether an updated item dropped to its reorder threshold.
+
+    Meant for RETURNING, where the inventory columns hold the new values: the
+    item is low on stock now but was not before the update.
+
+    Args:
+        old_quantity: Quantity before the update
+        old_threshold: Reorder threshold before the update
+
+    Returns:
+        ColumnElement[bool]: Crossing flag
+    """
+    return (InventoryItem.quantity <= InventoryItem.reorder_threshold) & not_(
+        func.coalesce(old_quantity <= old_threshold, False)
+    )
+
+
+def _low_stock_alert(item: InventoryItem) -> LowStockAlert:
+    """Build the alert of an item that crossed its reorder threshold."""
+    return LowStockAlert(
+        inventory_id=item.id,
+        product_id=item.product_id,
+        quantity=item.quantity,
+        reorder_threshold=item.reorder_threshold,
+    )
+
+
 class InventoryRepository:
     """Repository for handling inventory database operations."""
 
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.rollup = InventoryRollupRepository(session)
+        self.companies = CompanyRepository(session)
 
     async def create(self, inventory_data: InventoryItemCreate) -> InventoryItem:
         """Create a new inventory item.
@@ -28,10 +115,22 @@ class InventoryRepository:
         inventory_item = InventoryItem(
             quantity=inventory_data.quantity,
             product_id=inventory_data.product_id,
+            reorder_threshold=inventory_data.reorder_threshold,
         )
         self.session.add(inventory_item)
+        await self.rollup.apply_items(
+            [(inventory_data.product_id, 1, inventory_data.quantity)]
+        )
+        await self.companies.touch_products([inventory_data.product_id])
         await self.session.commit()
         await self.session.refresh(inventory_item)
+        movement_writer.record(
+            MovementReason.CREATE,
+            inventory_item.id,
+            inventory_item.product_id,
+            inventory_item.quantity,
+            inventory_item.quantity,
+        )
 
         logger.info(
             f"Created inventory item for product ID: {inventory_item.product_id}"
@@ -53,24 +152,285 @@ class InventoryRepository:
         Raises:
             NotFoundException: If inventory item not found
         """
-        inventory_item = await self.get_by_id(inventory_id)
-
         # Update inventory item fields
         update_data = inventory_data.model_dump(exclude_unset=True)
         if update_data:
+            # Lock the row and return its previous values for the rollup and
+            # the low-stock check
+            old = (
+                select(
+                    InventoryItem.id,
+                    InventoryItem.quantity,
+                    InventoryItem.reorder_threshold,
+                )
+                .where(InventoryItem.id == inventory_id)
+                .with_for_update()
+                .subquery("old")
+            )
             stmt = (
                 update(InventoryItem)
-                .where(InventoryItem.id == inventory_id)
+                .where(InventoryItem.id == old.c.id)
                 .values(**update_data)
-                .returning(InventoryItem)
+                .returning(
+                    InventoryItem,
+                    old.c.quantity,
+                    _crossed_threshold(old.c.quantity, old.c.reorder_threshold),
+                )
             )
             result = await self.session.execute(stmt)
+            row = result.one_or_none()
+            if not row:
+                raise NotFoundException(
+                    f"Inventory item with ID {inventory_id} not found")
+
+            updated_item, old_quantity, crossed = row
+            # Read what is recorded before the commit may expire the item
+            product_id, quantity = updated_item.product_id, updated_item.quantity
+            delta = quantity - old_quantity
+            alerts = [_low_stock_alert(updated_item)] if crossed else []
+            await self.rollup.apply_items([(product_id, 0, delta)])
+            if delta:
+                await self.companies.touch_products([product_id])
             await self.session.commit()
-            updated_item = result.scalar_one()
+            movement_writer.record(
+                MovementReason.UPDATE, inventory_id, product_id, delta, quantity
+            )
+            low_stock_notifier.notify(alerts)
             logger.info(f"Updated inventory item with ID: {inventory_id}")
             return updated_item
+        return await self.get_by_id(inventory_id)
+
+    async def adjust(
+        self, inventory_id: int, delta: int, non_negative: bool = True
+    ) -> InventoryItem:
+        """Add a signed delta to the quantity of an inventory item.
+
+        The change is applied with a single UPDATE ... SET quantity =
+        quantity + :delta, so concurrent adjustments never overwrite each
+        other.
+
+        Args:
+            inventory_id: Inventory item ID
+            delta: Quantity to add, negative to remove stock
+            non_negative: Reject the adjustment if the quantity would drop
+                below zero
+
+        Returns:
+            InventoryItem: Adjusted inventory item
+
+        Raises:
+            NotFoundException: If inventory item not found
+            ConflictException: If the quantity would drop below zero
+        """
+        stmt = (
+            update(InventoryItem)
+            .where(InventoryItem.id == inventory_id)
+            .values(quantity=InventoryItem.quantity + delta)
+            .returning(
+                InventoryItem,
+                _crossed_threshold(
+                    InventoryItem.quantity - delta, InventoryItem.reorder_threshold
+                ),
+            )
+        )
+        if non_negative:
+            stmt = stmt.where(InventoryItem.quantity + delta >= 0)
+        row = (await self.session.execute(stmt)).one_or_none()
+
+        if not row:
+            # Only failed adjustments pay for telling both cases apart
+            await self.get_by_id(inventory_id)
+            raise ConflictException(
+                f"Inventory item with ID {inventory_id} has less than "
+                f"{-delta} units in stock"
+            )
+
+        inventory_item, crossed = row
+        # Read what is recorded before the commit may expire the item
+        product_id, quantity = inventory_item.product_id, inventory_item.quantity
+        alerts = [_low_stock_alert(inventory_item)] if crossed else []
+        await self.rollup.apply_items([(product_id, 0, delta)])
+        await self.companies.touch_products([product_id])
+        await self.session.commit()
+        movement_writer.record(
+            MovementReason.ADJUST, inventory_id, product_id, delta, quantity
+        )
+        low_stock_notifier.notify(alerts)
+        logger.info(f"Adjusted inventory item with ID: {inventory_id} by {delta}")
         return inventory_item
 
+    async def adjust_many(
+        self, deltas: dict[int, int], non_negative: bool = True
+    ) -> tuple[list[InventoryItem], dict[int, str]]:
+        """Add signed deltas to the quantities of many items with one UPDATE.
+
+        Items are locked in ID order so concurrent batches cannot deadlock.
+        With non_negative set, an adjustment that would drop a quantity below
+        zero is skipped while the rest of the batch is applied.
+
+        Args:
+            deltas: Quantity to add by inventory item ID
+            non_negative: Skip adjustments that would drop a quantity below zero
+
+        Returns:
+            tuple[list[InventoryItem], dict[int, str]]: Adjusted items and the
+            reason each skipped adjustment was rejected, by ID
+        """
+        incoming = (
+            func.unnest(
+                bindparam("ids", type_=ARRAY(Integer)),
+                bindparam("deltas", type_=ARRAY(Integer)),
+            )
+            .table_valued(column("id", Integer), column("delta", Integer))
+            .render_derived(name="incoming")
+        )
+        locked = (
+            select(InventoryItem.id)
+            .where(InventoryItem.id == any_(bindparam("ids")))
+            .order_by(InventoryItem.id)
+            .with_for_update()
+            .subquery("locked")
+        )
+        stmt = (
+            update(InventoryItem)
+            .where(InventoryItem.id == incoming.c.id)
+            .where(InventoryItem.id == locked.c.id)
+            .values(quantity=InventoryItem.quantity + incoming.c.delta)
+            .returning(
+                InventoryItem,
+                _crossed_threshold(
+                    InventoryItem.quantity - incoming.c.delta,
+                    InventoryItem.reorder_threshold,
+                ),
+            )
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        if non_negative:
+            stmt = stmt.where(InventoryItem.quantity + incoming.c.delta >= 0)
+        result = await self.session.execute(
+            stmt, {"ids": list(deltas), "deltas": list(deltas.values())}
+        )
+        rows = result.all()
+        items = [item for item, _ in rows]
+
+        rejected = {}
+        missing = deltas.keys() - {item.id for item in items}
+        if missing:
+            query = select(InventoryItem.id).where(InventoryItem.id.in_(missing))
+            existing = set(await self.session.scalars(query))
+            for inventory_id in sorted(missing):
+                rejected[inventory_id] = (
+                    "Not enough units in stock"
+                    if inventory_id in existing
+                    else f"Inventory item with ID {inventory_id} not found"
+                )
+
+        # Read what is recorded before the commit may expire the items
+        adjusted = [
+            (item.id, item.product_id, deltas[item.id], item.quantity)
+            for item in items
+        ]
+        alerts = [_low_stock_alert(item) for item, crossed in rows if crossed]
+        await self.rollup.apply_items(
+            [(product_id, 0, delta) for _, product_id, delta, _ in adjusted]
+        )
+        await self.companies.touch_products(
+            product_id for _, product_id, _, _ in adjusted
+        )
+        await self.session.commit()
+        for inventory_id, product_id, delta, quantity in adjusted:
+            movement_writer.record(
+                MovementReason.ADJUST, inventory_id, product_id, delta, quantity
+            )
+        low_stock_notifier.notify(alerts)
+        logger.info(f"Adjusted {len(items)} inventory items")
+        return items, rejected
+
+    async def set_quantities(self, quantities: dict[int, int]) -> set[int]:
+        """Set the quantity of many inventory items with a single UPDATE.
+
+        The new quantities are sent as two arrays and joined with
+        UPDATE ... FROM unnest(...), so the statement is compiled once and
+        costs one round trip regardless of the number of items. The rows are
+        locked to read their previous quantities for the rollup.
+
+        Args:
+            quantities: New quantity by inventory item ID
+
+        Returns:
+            set[int]: IDs of the inventory items that were updated
+        """
+        if not quantities:
+            return set()
+
+        incoming = (
+            func.unnest(
+                bindparam("ids", type_=ARRAY(Integer)),
+                bindparam("quantities", type_=ARRAY(Integer)),
+            )
+            .table_valued(column("id", Integer), column("quantity", Integer))
+            .render_derived(name="incoming")
+        )
+        old = (
+            select(
+                InventoryItem.id,
+                InventoryItem.quantity,
+                InventoryItem.reorder_threshold,
+            )
+            .where(InventoryItem.id == any_(bindparam("ids")))
+            .order_by(InventoryItem.id)
+            .with_for_update()
+            .subquery("old")
+        )
+        stmt = (
+            update(InventoryItem)
+            .where(InventoryItem.id == incoming.c.id)
+            .where(InventoryItem.id == old.c.id)
+            .values(quantity=incoming.c.quantity)
+            .returning(
+                InventoryItem.id,
+                InventoryItem.product_id,
+                InventoryItem.quantity,
+                InventoryItem.quantity - old.c.quantity,
+                InventoryItem.reorder_threshold,
+                _crossed_threshold(old.c.quantity, old.c.reorder_threshold),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(
+            stmt,
+            {"ids": list(quantities), "quantities": list(quantities.values())},
+        )
+        rows = result.all()
+        deltas = defaultdict(int)
+        for _, product_id, _, delta, _, _ in rows:
+            deltas[product_id] += delta
+        await self.rollup.apply_items(
+            [(product_id, 0, delta) for product_id, delta in deltas.items()]
+        )
+        await self.companies.touch_products(deltas)
+        await self.session.commit()
+
+        updated, alerts = set(), []
+        for inventory_id, product_id, quantity, delta, threshold, crossed in rows:
+            updated.add(inventory_id)
+            movement_writer.record(
+                MovementReason.IMPORT, inventory_id, product_id, delta, quantity
+            )
+            if crossed:
+                alerts.append(
+                    LowStockAlert(
+                        inventory_id=inventory_id,
+                        product_id=product_id,
+                        quantity=quantity,
+                        reorder_threshold=threshold,
+                    )
+                )
+        low_stock_notifier.notify(alerts)
+
+        logger.info(f"Set quantities of {len(updated)} inventory items")
+        return updated
+
     async def delete(self, inventory_id: int) -> None:
         """Delete an inventory item.
 
@@ -80,16 +440,36 @@ class InventoryRepository:
         Raises:
             NotFoundException: If inventory item not found
         """
-        inventory_item = await self.get_by_id(inventory_id)
-        await self.session.delete(inventory_item)
+        stmt = (
+            delete(InventoryItem)
+            .where(InventoryItem.id == inventory_id)
+            .returning(InventoryItem.product_id, InventoryItem.quantity)
+        )
+        deleted = (await self.session.execute(stmt)).one_or_none()
+        if not deleted:
+            raise NotFoundException(
+                f"Inventory item with ID {inventory_id} not found")
+
+        await self.rollup.apply_items([(deleted.product_id, -1, -deleted.quantity)])
+        await self.companies.touch_products([deleted.product_id])
         await self.session.commit()
+        movement_writer.record(
+            MovementReason.DELETE,
+            inventory_id,
+            deleted.product_id,
+            -deleted.quantity,
+            0,
+        )
         logger.info(f"Deleted inventory item with ID: {inventory_id}")
 
-    async def get_by_id(self, inventory_id: int) -> InventoryItem:
+    async def get_by_id(
+        self, inventory_id: int, expand: Iterable[str] = ()
+    ) -> InventoryItem:
         """Get inventory item by ID.
 
         Args:
             inventory_id: Inventory item ID
+            expand: Relationships to load with the item
 
         Returns:
             InventoryItem: Found inventory item
@@ -97,7 +477,11 @@ class InventoryRepository:
         Raises:
             NotFoundException: If inventory item not found
         """
-        query = select(InventoryItem).where(InventoryItem.id == inventory_id)
+        query = (
+            select(InventoryItem)
+            .where(InventoryItem.id == inventory_id)
+            .options(*expand_options(InventoryItem, expand))
+        )
         result = await self.session.execute(query)
         inventory_item = result.scalar_one_or_none()
 
@@ -107,29 +491,51 @@ class InventoryRepository:
 
         return inventory_item
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> list[InventoryItem]:
-        """Get all inventory items with pagination.
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
+    ) -> list[InventoryItem]:
+        """Get all inventory items ordered by ID with pagination.
 
         Args:
             skip: Number of inventory items to skip
             limit: Maximum number of inventory items to return
+            after: Only return items with an ID greater than this (keyset)
+            expand: Relationships to load with the items
 
         Returns:
             List[InventoryItem]: List of inventory items
         """
-        query = select(InventoryItem).offset(skip).limit(limit)
+        query = (
+            select(InventoryItem)
+            .options(*expand_options(InventoryItem, expand))
+            .order_by(InventoryItem.id)
+        )
+        if after is not None:
+            query = query.where(InventoryItem.id > after)
+        query = query.offset(skip).limit(limit)
         result = await self.session.execute(query)
         return result.scalars().all()
 
     async def get_by_product_id(
-        self, product_id: int, skip: int = 0, limit: int = 100
+        self,
+        product_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
     ) -> list[InventoryItem]:
-        """Get inventory items by product ID with pagination.
+        """Get inventory items by product ID ordered by ID with pagination.
 
         Args:
             product_id: Product ID
             skip: Number of inventory items to skip
             limit: Maximum number of inventory items to return
+            after: Only return items with an ID greater than this (keyset)
+            expand: Relationships to load with the items
 
         Returns:
             List[InventoryItem]: List of inventory items for the product
@@ -137,8 +543,550 @@ class InventoryRepository:
         query = (
             select(InventoryItem)
             .where(InventoryItem.product_id == product_id)
+            .options(*expand_options(InventoryItem, expand))
+            .order_by(InventoryItem.id)
+        )
+        if after is not None:
+            query = query.where(InventoryItem.id > after)
+        query = query.offset(skip).limit(limit)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def get_by_company_nit(
+        self,
+        company_nit: str,
+        skip: int = 0,
+        limit: int = 100,
+        sort: InventorySort = InventorySort.ID,
+        order: SortOrder = SortOrder.ASC,
+        currency: str | None = None,
+        expand: Iterable[str] = (),
+    ) -> list[InventoryItem]:
+        """Get the inventory items of a company with their products.
+
+        Items and products are read with one join, walking the products of the
+        company through their (company_nit, id) index.
+
+        Args:
+            company_nit: Company NIT
+            skip: Number of inventory items to skip
+            limit: Maximum number of inventory items to return
+            sort: Sort by item ID, quantity or stock value
+            order: Sort ascending or descending
+            currency: Currency of the stock value, required to sort by value
+            expand: Relationships of the product to load (`product.company`)
+
+        Returns:
+            List[InventoryItem]: Inventory items with their product loaded
+
+        Raises:
+            BadRequestException: If sorting by value without a currency
+        """
+        if sort == InventorySort.ID:
+            key = InventoryItem.id
+        elif sort == InventorySort.QUANTITY:
+            key = InventoryItem.quantity
+        elif currency is None:
+            raise BadRequestException("Sorting by value requires a currency")
+        else:
+            # Products without a price in the currency count as zero value
+            key = func.coalesce(
+                cast(Product.prices[currency].as_string(), Numeric), 0
+            ) * InventoryItem.quantity
+
+        product = contains_eager(InventoryItem.product)
+        if "product.company" in expand:
+            product = product.joinedload(Product.company)
+
+        direction = desc if order == SortOrder.DESC else asc
+        query = (
+            select(InventoryItem)
+            .join(InventoryItem.product)
+            .where(Product.company_nit == company_nit)
+            .options(product)
+            .order_by(direction(key), direction(InventoryItem.id))
             .offset(skip)
             .limit(limit)
         )
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    async def get_low_stock(
+        self,
+        company_nit: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
+    ) -> list[InventoryItem]:
+        """Get the items at or below their reorder threshold ordered by ID.
+
+        The filter matches the predicate of the partial ix_inventory_low_stock
+        index, which only holds low-stock items, so the query reads that index
+        instead of the whole inventory.
+
+        Args:
+            company_nit: Only return the items of products of this company
+            skip: Number of inventory items to skip
+            limit: Maximum number of inventory items to return
+            after: Only return items with an ID greater than this (keyset)
+            expand: Relationships to load with the items
+
+        Returns:
+            List[InventoryItem]: Low-stock inventory items
+        """
+        query = (
+            select(InventoryItem)
+            .where(InventoryItem.quantity <= InventoryItem.reorder_threshold)
+            .options(*expand_options(InventoryItem, expand))
+            .order_by(InventoryItem.id)
+        )
+        if company_nit is not None:
+            query = query.join(InventoryItem.product).where(
+                Product.company_nit == company_nit
+            )
+        if after is not None:
+            query = query.where(InventoryItem.id > after)
+        query = query.offset(skip).limit(limit)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def stream_all(
+        self, company_nit: str | None = None
+    ) -> AsyncScalarResult[InventoryItem]:
+        """Stream inventory items ordered by ID from a server-side cursor.
+
+        Args:
+            company_nit: Only stream the items of products of this company
+
+        Returns:
+            AsyncScalarResult[InventoryItem]: Inventory items, fetched in batches
+        """
+        query = select(InventoryItem).order_by(InventoryItem.id)
+        if company_nit is not None:
+            query = query.join(InventoryItem.product).where(
+                Product.company_nit == company_nit
+            )
+        return await self.session.stream_scalars(
+            query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+    async def get_summary(
+        self,
+        company_nit: str | None = None,
+        by_currency: bool = False,
+        convert_to: str | None = None,
+    ) -> list[InventorySummary]:
+        """Get stock totals per company from the inventory rollup.
+
+        Reads one row per company and currency, however many inventory items
+        the companies have.
+
+        Args:
+            company_nit: Only summarize this company
+            by_currency: Return one row per company and currency, counting only
+                the items priced in that currency
+            convert_to: Also total the value of every item in this currency,
+                see get_converted_totals
+
+        Returns:
+            list[InventorySummary]: Totals ordered by company NIT (and currency)
+        """
+        query = (
+            select(
+                Company.nit,
+                Company.name,
+                InventoryRollup.currency,
+                InventoryRollup.items,
+                InventoryRollup.total_quantity,
+                InventoryRollup.total_value,
+            )
+            .join(Company, Company.nit == InventoryRollup.company_nit)
+            .where(InventoryRollup.items > 0)
+            .order_by(InventoryRollup.company_nit, InventoryRollup.currency)
+        )
+        if company_nit is not None:
+            query = query.where(InventoryRollup.company_nit == company_nit)
+
+        summaries = []
+        # The ALL_CURRENCIES row sorts first among the rows of its company
+        for nit, name, currency, items, quantity, value in await self.session.execute(
+            query
+        ):
+            if currency == ALL_CURRENCIES:
+                if not by_currency:
+                    summaries.append(
+                        InventorySummary(
+                            company_nit=nit,
+                            company_name=name,
+                            items=items,
+                            total_quantity=quantity,
+                            total_values={},
+                        )
+                    )
+            elif by_currency:
+                summaries.append(
+                    InventorySummary(
+                        company_nit=nit,
+                        company_name=name,
+                        currency=currency,
+                        items=items,
+                        total_quantity=quantity,
+                        total_values={currency: float(value)},
+                    )
+                )
+            else:
+                summaries[-1].total_values[currency] = float(value)
+
+        if convert_to is not None:
+            converted = await self.get_converted_totals(convert_to, company_nit)
+            for summary in summaries:
+                summary.converted_currency = convert_to
+                summary.converted_value = float(
+                    converted.get(summary.company_nit, 0)
+                )
+        return summaries
+
+    async def get_converted_totals(
+        self, currency: str, company_nit: str | None = None
+    ) -> dict[str, Decimal]:
+        """Get the stock value of each company in a single currency.
+
+        Every item is valued once, at its product's price in the currency or
+        else at a converted price (see unit_price_in), and summed in the same
+        query. Items whose product has no convertible price add nothing.
+
+        Args:
+            currency: Target currency, which must have an exchange rate
+            company_nit: Only total this company
+
+        Returns:
+            dict[str, Decimal]: Stock value by company NIT
+        """
+        unit_price = unit_price_in(currency)
+        query = (
+            select(
+                Product.company_nit,
+                func.coalesce(
+                    func.sum(InventoryItem.quantity * unit_price.c.price), 0
+                ),
+            )
+            .select_from(InventoryItem)
+            .join(InventoryItem.product)
+            .outerjoin(unit_price, true())
+            .group_by(Product.company_nit)
+        )
+        if company_nit is not None:
+            query = query.where(Product.company_nit == company_nit)
+        return dict((await self.session.execute(query)).all())
+
+
+class InventoryRollupRepository:
+    """Repository for the per company and currency inventory rollup.
+
+    Writers apply their changes to the rollup in the same transaction as the
+    change itself, before committing.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _totals(source: FromClause, items, quantity) -> Select:
+        """Aggregate rows joined with their product into rollup rows.
+
+        Every row is counted once per currency of its product's prices and
+        once more under ALL_CURRENCIES.
+
+        Args:
+            source: FROM clause joined with the products table
+            items: Number of items each row adds
+            quantity: Quantity each row adds
+
+        Returns:
+            Select: company_nit, currency, items, total_quantity, total_value
+        """
+        price = func.json_each_text(Product.prices).table_valued("key", "value")
+        prices = union_all(
+            select(
+                price.c.key.label("currency"),
+                cast(price.c.value, Numeric).label("price"),
+            ),
+            select(literal(ALL_CURRENCIES), literal(0, Numeric)),
+        ).lateral("price")
+        return (
+            select(
+                Product.company_nit,
+                prices.c.currency,
+                func.sum(items),
+                func.sum(quantity),
+                func.sum(prices.c.price * quantity),
+            )
+            .select_from(source)
+            .join(prices, true())
+            .group_by(Product.company_nit, prices.c.currency)
+            # A stable order keeps concurrent upserts from deadlocking
+            .order_by(Product.company_nit, prices.c.currency)
+        )
+
+    async def _add(self, totals: Select, params: dict | None = None) -> None:
+        """Add aggregated rows to the rollup, creating missing rows."""
+        rollup = InventoryRollup.__table__
+        stmt = insert(rollup).from_select(
+            ["company_nit", "currency", "items", "total_quantity", "total_value"],
+            totals,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[rollup.c.company_nit, rollup.c.currency],
+            set_={
+                # "items" is also a method of column collections
+                "items": rollup.c["items"] + stmt.excluded["items"],
+                "total_quantity": (
+                    rollup.c.total_quantity + stmt.excluded.total_quantity
+                ),
+                "total_value": rollup.c.total_value + stmt.excluded.total_value,
+            },
+        )
+        await self.session.execute(stmt, params)
+
+    async def apply_items(self, deltas: list[tuple[int, int, int]]) -> None:
+        """Apply changes of inventory items to the rollup.
+
+        The products are share-locked first, so a concurrent price change
+        either sees these items or values them at its new prices.
+
+        Args:
+            deltas: (product ID, items added, quantity added) per change
+        """
+        deltas = [delta for delta in deltas if delta[1] or delta[2]]
+        if not deltas:
+            return
+
+        product_ids, items, quantities = zip(*deltas)
+        await self.session.execute(
+            select(Product.id)
+            .where(Product.id.in_(set(product_ids)))
+            .order_by(Product.id)
+            .with_for_update(read=True)
+        )
+        incoming = (
+            func.unnest(
+                bindparam("product_ids", type_=ARRAY(Integer)),
+                bindparam("items", type_=ARRAY(Integer)),
+                bindparam("quantities", type_=ARRAY(Integer)),
+            )
+            .table_valued(
+                column("product_id", Integer),
+                column("items_added", Integer),
+                column("quantity_added", Integer),
+            )
+            .render_derived(name="incoming")
+        )
+        source = incoming.join(Product, Product.id == incoming.c.product_id)
+        await self._add(
+            self._totals(
+                source, incoming.c.items_added, incoming.c.quantity_added
+            ),
+            {
+                "product_ids": list(product_ids),
+                "items": list(items),
+                "quantities": list(quantities),
+            },
+        )
+
+    async def apply_products(self, product_ids: list[int], sign: int) -> None:
+        """Add (sign 1) or remove (sign -1) all items of products.
+
+        Removing before and adding after a change of the products' prices
+        revalues their items. Callers lock the products first.
+
+        Args:
+            product_ids: Products whose items are added or removed
+            sign: 1 to add the items, -1 to remove them
+        """
+        if not product_ids:
+            return
+
+        source = InventoryItem.__table__.join(Product)
+        await self._add(
+            self._totals(source, literal(sign), InventoryItem.quantity * sign).where(
+                InventoryItem.product_id.in_(product_ids)
+            )
+        )
+
+    def _live_totals(self) -> Select:
+        """Aggregate the rollup rows from the inventory itself."""
+        source = InventoryItem.__table__.join(Product)
+        return self._totals(source, literal(1), InventoryItem.quantity)
+
+    async def rebuild(self) -> None:
+        """Recompute the whole rollup from the inventory, without committing."""
+        await self.session.execute(delete(InventoryRollup))
+        await self._add(self._live_totals())
+        logger.info("Rebuilt inventory rollup")
+
+    async def diff(self) -> list[InventoryRollupMismatch]:
+        """Compare the rollup with the totals aggregated from the inventory.
+
+        Returns:
+            list[InventoryRollupMismatch]: Rows that differ, empty when consistent
+        """
+        live = {
+            (nit, currency): (items, quantity, value)
+            for nit, currency, items, quantity, value in await self.session.execute(
+                self._live_totals()
+            )
+        }
+        stored = {
+            (row.company_nit, row.currency): (
+                row.items,
+                row.total_quantity,
+                row.total_value,
+            )
+            for row in await self.session.scalars(select(InventoryRollup))
+            if row.items or row.total_quantity or row.total_value
+        }
+
+        mismatches = []
+        for key in sorted(live.keys() | stored.keys()):
+            if live.get(key) != stored.get(key):
+                mismatches.append(
+                    InventoryRollupMismatch(
+                        company_nit=key[0],
+                        currency=key[1],
+                        stored=stored.get(key),
+                        live=live.get(key),
+                    )
+                )
+        return mismatches
+
+
+class StockLedgerRepository:
+    """Repository for the stock movement ledger and its daily snapshots."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_movements(
+        self, inventory_id: int, limit: int = 100, after: int | None = None
+    ) -> list[StockMovement]:
+        """Get the movements of an inventory item, newest first.
+
+        Args:
+            inventory_id: Inventory item ID
+            limit: Maximum number of movements to return
+            after: Only return movements with an ID lower than this (keyset)
+
+        Returns:
+            List[StockMovement]: Movements not yet folded into snapshots
+        """
+        query = (
+            select(StockMovement)
+            .where(StockMovement.inventory_id == inventory_id)
+            .order_by(StockMovement.id.desc())
+        )
+        if after is not None:
+            query = query.where(StockMovement.id < after)
+        result = await self.session.execute(query.limit(limit))
+        return result.scalars().all()
+
+    async def get_quantity_as_of(self, inventory_id: int, as_of: datetime) -> int:
+        """Get the quantity of an inventory item at a point in time.
+
+        Starts from the last daily snapshot up to that day and adds the
+        movements recorded after it. Days that were compacted only have a
+        snapshot, so within them the end-of-day quantity is returned.
+
+        Args:
+            inventory_id: Inventory item ID
+            as_of: Point in time, UTC if naive
+
+        Returns:
+            int: Quantity at that time, 0 before the first record
+        """
+        if as_of.tzinfo is None:
+            as_of = as_of.replace(tzinfo=timezone.utc)
+        as_of = as_of.astimezone(timezone.utc)
+
+        query = (
+            select(StockSnapshot.day, StockSnapshot.quantity)
+            .where(StockSnapshot.inventory_id == inventory_id)
+            .where(StockSnapshot.day <= as_of.date())
+            .order_by(StockSnapshot.day.desc())
+            .limit(1)
+        )
+        snapshot = (await self.session.execute(query)).one_or_none()
+
+        tail = select(func.coalesce(func.sum(StockMovement.delta), 0)).where(
+            StockMovement.inventory_id == inventory_id,
+            StockMovement.created_at <= as_of,
+        )
+        if snapshot:
+            since = datetime.combine(
+                snapshot.day + timedelta(days=1), time(), tzinfo=timezone.utc
+            )
+            tail = tail.where(StockMovement.created_at >= since)
+        base = snapshot.quantity if snapshot else 0
+        return base + await self.session.scalar(tail)
+
+    async def compact(self, before: date) -> int:
+        """Fold the movements of the days before a date into daily snapshots.
+
+        The movements are deleted and aggregated by one statement, so
+        movements flushed while compacting are either folded or kept.
+
+        Args:
+            before: First day (UTC) whose movements are kept
+
+        Returns:
+            int: Number of snapshots written
+        """
+        cutoff = datetime.combine(before, time(), tzinfo=timezone.utc)
+        folded = (
+            delete(StockMovement)
+            .where(StockMovement.created_at < cutoff)
+            .returning(
+                StockMovement.inventory_id,
+                StockMovement.delta,
+                cast(func.timezone("UTC", StockMovement.created_at), Date).label(
+                    "day"
+                ),
+            )
+            .cte("folded")
+        )
+        daily = (
+            select(
+                folded.c.inventory_id,
+                folded.c.day,
+                func.sum(folded.c.delta).label("delta"),
+            )
+            .group_by(folded.c.inventory_id, folded.c.day)
+            .cte("daily")
+        )
+        # Quantity at the end of the last compacted day of each item
+        opening = (
+            select(StockSnapshot.inventory_id, StockSnapshot.quantity)
+            .where(StockSnapshot.inventory_id.in_(select(daily.c.inventory_id)))
+            .where(StockSnapshot.day < before)
+            .distinct(StockSnapshot.inventory_id)
+            .order_by(StockSnapshot.inventory_id, StockSnapshot.day.desc())
+            .cte("opening")
+        )
+        running = func.coalesce(opening.c.quantity, 0) + func.sum(
+            daily.c.delta
+        ).over(partition_by=daily.c.inventory_id, order_by=daily.c.day)
+        snapshots = select(daily.c.inventory_id, daily.c.day, running).select_from(
+            daily.outerjoin(opening, opening.c.inventory_id == daily.c.inventory_id)
+        )
+
+        table = StockSnapshot.__table__
+        stmt = insert(table).from_select(["inventory_id", "day", "quantity"], snapshots)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.inventory_id, table.c.day],
+            set_={"quantity": stmt.excluded.quantity},
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+
+        logger.info(f"Compacted stock movements before {before}")
+        return result.rowcount
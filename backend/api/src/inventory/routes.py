@@ -1,25 +1,58 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, Query, status
-from fastapi.responses import FileResponse
+from datetime import datetime
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Header,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.database import get_session
+from api.core.expand import parse_expand
+from api.core.export import ExportFormat, export_response
 from api.core.logging import get_logger
+from api.core.pagination import SortOrder, decode_cursor, set_next_cursor
 from api.core.security import get_current_user, require_admin
+from api.src.inventory.importer import detect_format, import_inventory
 from api.src.inventory.schemas import (
     EmailData,
+    InventoryAdjustment,
+    InventoryBatchAdjustment,
+    InventoryBatchAdjustmentResult,
+    ImportFormat,
+    InventoryImportResult,
     InventoryItemCreate,
     InventoryItemDetail,
     InventoryItemResponse,
     InventoryItemUpdate,
+    InventorySort,
+    InventorySummary,
+    StockLevel,
+    StockMovementResponse,
 )
 from api.src.inventory.service import InventoryService
 from api.src.users.models import User
-from api.src.inventory.pdf_generator import generate_inventory_pdf, send_pdf_by_email
+from api.src.inventory.pdf_generator import (
+    get_inventory_pdf,
+    get_report_etag,
+    send_pdf_by_email,
+)
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
+# Relationship paths accepted by the `expand` query parameter
+EXPANDABLE = ("product", "product.company")
+
 
 @router.post(
     "", response_model=InventoryItemResponse, status_code=status.HTTP_201_CREATED
@@ -35,42 +68,260 @@ async def create_inventory_item(
     return await InventoryService(session).create_inventory_item(inventory_data)
 
 
-@router.get("", response_model=list[InventoryItemResponse])
+@router.post("/adjust", response_model=InventoryBatchAdjustmentResult)
+async def adjust_inventory_items(
+    batch: InventoryBatchAdjustment,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(require_admin),
+) -> InventoryBatchAdjustmentResult:
+    """Adjust the quantities of many inventory items at once. Admin only.
+
+    Deltas of a repeated item are summed. Adjustments of unknown items, or that
+    would drop a quantity below zero when `non_negative` is set, are skipped
+    and listed in `rejected`.
+    """
+    logger.debug(f"Adjusting {len(batch.adjustments)} inventory items")
+    return await InventoryService(session).adjust_inventory_items(batch)
+
+
+@router.post("/import", response_model=InventoryImportResult)
+async def import_inventory_counts(
+    file: UploadFile = File(..., description="Stock counts with id and quantity"),
+    file_format: ImportFormat | None = Query(
+        None, alias="format", description="csv or ndjson, guessed from file name"
+    ),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(require_admin),
+) -> InventoryImportResult:
+    """Import stock counts from a CSV or NDJSON file. Admin only.
+
+    CSV files need an `id,quantity` header; NDJSON files hold one
+    `{"id": ..., "quantity": ...}` object per line.
+    """
+    file_format = file_format or detect_format(file.filename)
+    logger.debug(f"Importing inventory counts from {file.filename} ({file_format})")
+    return await import_inventory(session, file, file_format)
+
+
+@router.get(
+    "",
+    response_model=list[InventoryItemDetail],
+    response_model_exclude_unset=True,
+)
 async def get_inventory_items(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    expand: str | None = Query(
+        None, description="Comma separated: product, product.company"
+    ),
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
-) -> list[InventoryItemResponse]:
-    """Get all inventory items."""
+) -> list[InventoryItemDetail]:
+    """Get all inventory items.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    Expanded relationships are loaded in the same query as the items.
+    """
     logger.debug(f"Getting inventory items with skip={skip}, limit={limit}")
-    return await InventoryService(session).get_inventory_items(skip, limit)
+    items = await InventoryService(session).get_inventory_items(
+        skip, limit, decode_cursor(cursor), parse_expand(expand, EXPANDABLE)
+    )
+    set_next_cursor(response, items, "id", limit)
+    return items
 
 
-@router.get("/product/{product_id}", response_model=list[InventoryItemResponse])
+@router.get(
+    "/product/{product_id}",
+    response_model=list[InventoryItemDetail],
+    response_model_exclude_unset=True,
+)
 async def get_inventory_items_by_product(
     product_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    expand: str | None = Query(
+        None, description="Comma separated: product, product.company"
+    ),
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
-) -> list[InventoryItemResponse]:
-    """Get inventory items by product ID."""
+) -> list[InventoryItemDetail]:
+    """Get inventory items by product ID.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
     logger.debug(f"Getting inventory items for product ID: {product_id}")
-    return await InventoryService(session).get_inventory_items_by_product(
-        product_id, skip, limit
+    items = await InventoryService(session).get_inventory_items_by_product(
+        product_id,
+        skip,
+        limit,
+        decode_cursor(cursor),
+        parse_expand(expand, EXPANDABLE),
     )
+    set_next_cursor(response, items, "id", limit)
+    return items
 
 
-@router.get("/{inventory_id}", response_model=InventoryItemDetail)
+@router.get(
+    "/company/{company_nit}",
+    response_model=list[InventoryItemDetail],
+    response_model_exclude_unset=True,
+)
+async def get_inventory_items_by_company(
+    company_nit: str,
+    skip: int = 0,
+    limit: int = 100,
+    sort: InventorySort = Query(InventorySort.ID, description="id, quantity or value"),
+    order: SortOrder = Query(SortOrder.ASC, description="asc or desc"),
+    currency: str | None = Query(
+        None, description="Currency of the stock value, required to sort by value"
+    ),
+    expand: str | None = Query(None, description="Comma separated: product.company"),
+    session: AsyncSession = Depends(get_session),
+    _: User = Depends(get_current_user),
+) -> list[InventoryItemDetail]:
+    """Get the inventory items of a company, each with its product."""
+    logger.debug(f"Getting inventory items for company NIT: {company_nit}")
+    return await InventoryService(session).get_inventory_items_by_company(
+        company_nit,
+        skip,
+        limit,
+        sort,
+        order,
+        currency,
+        parse_expand(expand, EXPANDABLE),
+    )
+
+
+@router.get(
+    "/low-stock",
+    response_model=list[InventoryItemDetail],
+    response_model_exclude_unset=True,
+)
+async def get_low_stock_items(
+    response: Response,
+    company_nit: str | None = Query(None, description="Filter by company NIT"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    expand: str | None = Query(
+        None, description="Comma separated: product, product.company"
+    ),
+    session: AsyncSession = Depends(get_session),
+    _: User = Depends(get_current_user),
+) -> list[InventoryItemDetail]:
+    """Get the inventory items at or below their reorder threshold.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
+    logger.debug(f"Getting low-stock inventory items for company NIT: {company_nit}")
+    items = await InventoryService(session).get_low_stock_items(
+        company_nit,
+        skip,
+        limit,
+        decode_cursor(cursor),
+        parse_expand(expand, EXPANDABLE),
+    )
+    set_next_cursor(response, items, "id", limit)
+    return items
+
+
+@router.get("/summary", response_model=list[InventorySummary])
+async def get_inventory_summary(
+    company_nit: str | None = Query(None, description="Filter by company NIT"),
+    by_currency: bool = Query(
+        False, description="One row per company and currency"
+    ),
+    convert_to: str | None = Query(
+        None, description="Also total each company's stock value in this currency"
+    ),
+    session: AsyncSession = Depends(get_session),
+    _: User = Depends(get_current_user),
+) -> list[InventorySummary]:
+    """Get the stock quantity and value totals of each company."""
+    logger.debug(f"Getting inventory summary for company NIT: {company_nit}")
+    return await InventoryService(session).get_inventory_summary(
+        company_nit, by_currency, convert_to
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_inventory_items(
+    request: Request,
+    company_nit: str | None = Query(None, description="Filter by company NIT"),
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    _: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Export inventory items as NDJSON or CSV in a single streamed response."""
+    logger.debug(f"Exporting inventory items as {file_format.value}")
+    return export_response(
+        request,
+        lambda session: InventoryService(session).stream_inventory_items(
+            company_nit
+        ),
+        InventoryItemResponse,
+        file_format,
+        "inventory",
+    )
+
+
+@router.get(
+    "/{inventory_id}",
+    response_model=InventoryItemDetail,
+    response_model_exclude_unset=True,
+)
 async def get_inventory_item(
     inventory_id: int,
+    expand: str | None = Query(
+        None, description="Comma separated: product, product.company"
+    ),
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
 ) -> InventoryItemDetail:
-    """Get an inventory item by ID."""
+    """Get an inventory item by ID, always with its product."""
     logger.debug(f"Getting inventory item with ID: {inventory_id}")
-    return await InventoryService(session).get_inventory_item(inventory_id)
+    return await InventoryService(session).get_inventory_item(
+        inventory_id, parse_expand(expand, EXPANDABLE) | {"product"}
+    )
+
+
+@router.get(
+    "/{inventory_id}/movements", response_model=list[StockMovementResponse]
+)
+async def get_stock_movements(
+    inventory_id: int,
+    response: Response,
+    limit: int = 100,
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_session),
+    _: User = Depends(get_current_user),
+) -> list[StockMovementResponse]:
+    """Get who changed the stock of an inventory item and when, newest first.
+
+    Movements are recorded asynchronously and show up within a flush interval.
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
+    logger.debug(f"Getting stock movements of inventory item ID: {inventory_id}")
+    movements = await InventoryService(session).get_stock_movements(
+        inventory_id, limit, decode_cursor(cursor)
+    )
+    set_next_cursor(response, movements, "id", limit)
+    return movements
+
+
+@router.get("/{inventory_id}/stock", response_model=StockLevel)
+async def get_stock_level(
+    inventory_id: int,
+    as_of: datetime = Query(..., description="Point in time, UTC if no offset"),
+    session: AsyncSession = Depends(get_session),
+    _: User = Depends(get_current_user),
+) -> StockLevel:
+    """Get the quantity of an inventory item at a point in time."""
+    logger.debug(f"Getting stock of inventory item ID: {inventory_id} at {as_of}")
+    return await InventoryService(session).get_stock_level(inventory_id, as_of)
 
 
 @router.put("/{inventory_id}", response_model=InventoryItemResponse)
@@ -87,6 +338,23 @@ async def update_inventory_item(
     )
 
 
+@router.post("/{inventory_id}/adjust", response_model=InventoryItemResponse)
+async def adjust_inventory_item(
+    inventory_id: int,
+    adjustment: InventoryAdjustment,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(require_admin),
+) -> InventoryItemResponse:
+    """Add a signed delta to the quantity of an inventory item. Admin only.
+
+    Returns 409 if `non_negative` is set and the quantity would drop below zero.
+    """
+    logger.debug(f"Adjusting inventory item with ID: {inventory_id}")
+    return await InventoryService(session).adjust_inventory_item(
+        inventory_id, adjustment
+    )
+
+
 @router.delete("/{inventory_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_inventory_item(
     inventory_id: int,
@@ -98,20 +366,45 @@ async def delete_inventory_item(
     await InventoryService(session).delete_inventory_item(inventory_id)
 
 
-@router.get("/report/download", response_class=FileResponse)
+@router.get(
+    "/report/download",
+    response_class=Response,
+    responses={
+        200: {"content": {"application/pdf": {}}},
+        304: {"description": "The report has not changed"},
+    },
+)
 async def download_inventory_report(
     company_nit: str = Query(None, description="Filter by company NIT"),
+    currency: str = Query(None, description="Currency of the report values"),
+    if_none_match: str | None = Header(None),
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
-) -> FileResponse:
-    """Generate and download inventory report as PDF."""
+) -> Response:
+    """Generate and download inventory report as PDF.
+
+    The response has an ETag that changes with the report data. Sending it back
+    in If-None-Match returns 304 Not Modified while the data is unchanged,
+    without generating the report; unchanged reports are also served from a
+    cache. Large reports are streamed from a temporary file, deleted once sent.
+    """
     logger.debug("Generating inventory report PDF")
-    pdf_path = await generate_inventory_pdf(session, company_nit)
-    return FileResponse(
-        path=pdf_path,
-        filename="inventory_report.pdf",
-        media_type="application/pdf",
-    )
+    etag = await get_report_etag(session, company_nit, currency)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    output = await get_inventory_pdf(session, etag, company_nit, currency)
+    headers["Content-Disposition"] = 'attachment; filename="inventory_report.pdf"'
+    return output.response(headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
 
 
 @router.post("/report/email", status_code=status.HTTP_202_ACCEPTED)
@@ -124,6 +417,10 @@ async def email_inventory_report(
     """Generate inventory report and send it by email."""
     logger.debug(f"Sending inventory report to email: {email_data.email}")
     background_tasks.add_task(
-        send_pdf_by_email, session, email_data.email, email_data.company_nit
+        send_pdf_by_email,
+        session,
+        email_data.email,
+        email_data.company_nit,
+        email_data.currency,
     )
     return {"message": "Inventory report will be sent to your email shortly"}
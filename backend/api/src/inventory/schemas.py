@@ -1,18 +1,30 @@
+import enum
+from datetime import datetime
+from decimal import Decimal
+
 from pydantic import BaseModel, ConfigDict, Field
 
-from api.src.products.schemas import ProductResponse
+from api.core.expand import ExpandableResponse
+from api.src.inventory.models import MovementReason
+from api.src.products.schemas import ProductDetail
+
+# Maximum number of adjustments accepted by a single batch request
+MAX_BATCH_ADJUSTMENTS = 10000
 
 
 class InventoryItemBase(BaseModel):
     """Base inventory item schema."""
 
-    quantity: int = Field(...,
-                          description="Quantity of the product in inventory")
+    quantity: int = Field(..., description="Quantity of the product in inventory")
     product_id: int = Field(..., description="ID of the product")
+    reorder_threshold: int | None = Field(
+        None, ge=0, description="Quantity at or below which to reorder"
+    )
 
 
 class InventoryItemCreate(InventoryItemBase):
     """Inventory item creation schema."""
+
     pass
 
 
@@ -20,6 +32,9 @@ class InventoryItemUpdate(BaseModel):
     """Inventory item update schema."""
 
     quantity: int | None = Field(None, description="Quantity of the product")
+    reorder_threshold: int | None = Field(
+        None, ge=0, description="Reorder threshold, null to stop tracking"
+    )
 
 
 class InventoryItemResponse(InventoryItemBase):
@@ -29,13 +44,162 @@ class InventoryItemResponse(InventoryItemBase):
     id: int
 
 
-class InventoryItemDetail(InventoryItemResponse):
-    """Detailed inventory item response with product information."""
+class InventoryItemDetail(InventoryItemResponse, ExpandableResponse):
+    """Inventory item response with optionally expanded relationships."""
+
+    product: ProductDetail | None = None
+
+
+class InventorySort(str, enum.Enum):
+    """Sort key of a company inventory listing."""
+
+    ID = "id"
+    QUANTITY = "quantity"
+    VALUE = "value"
+
+
+class InventoryAdjustment(BaseModel):
+    """Signed change of the quantity of an inventory item."""
+
+    delta: int = Field(..., description="Quantity to add (negative to remove)")
+    non_negative: bool = Field(
+        True, description="Reject the adjustment if the quantity would drop below 0"
+    )
+
+
+class InventoryAdjustmentItem(BaseModel):
+    """Signed change of one item of a batch adjustment."""
+
+    id: int = Field(..., description="ID of the inventory item")
+    delta: int = Field(..., description="Quantity to add (negative to remove)")
+
+
+class InventoryBatchAdjustment(BaseModel):
+    """Adjustments of many inventory items applied with one statement."""
+
+    adjustments: list[InventoryAdjustmentItem] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_ADJUSTMENTS
+    )
+    non_negative: bool = Field(
+        True, description="Reject adjustments that would drop a quantity below 0"
+    )
+
+
+class InventoryAdjustmentRejection(BaseModel):
+    """Adjustment of a batch that was not applied."""
+
+    id: int
+    detail: str
+
+
+class InventoryBatchAdjustmentResult(BaseModel):
+    """Outcome of a batch adjustment."""
 
-    product: ProductResponse
+    items: list[InventoryItemResponse] = Field(
+        ..., description="Adjusted items with their new quantities"
+    )
+    rejected: list[InventoryAdjustmentRejection]
 
 
 class EmailData(BaseModel):
     """Email data schema."""
+
     email: str
     company_nit: str | None = None
+    currency: str | None = None
+
+
+class ImportFormat(str, enum.Enum):
+    """Supported stock count file formats."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class InventoryImportRow(BaseModel):
+    """Single stock count of an import file."""
+
+    id: int = Field(..., description="ID of the inventory item")
+    quantity: int = Field(..., ge=0, description="Counted quantity")
+
+
+class InventoryImportError(BaseModel):
+    """Rejected row of an import file."""
+
+    line: int = Field(..., description="Line number in the file")
+    detail: str
+
+
+class InventoryImportResult(BaseModel):
+    """Summary of an inventory import."""
+
+    accepted: int
+    rejected: int
+    errors: list[InventoryImportError] = Field(
+        ..., description="First rejected rows, capped to keep responses small"
+    )
+
+
+class InventorySummary(BaseModel):
+    """Stock totals of a company, optionally restricted to one currency."""
+
+    company_nit: str
+    company_name: str
+    currency: str | None = Field(
+        None, description="Currency of the row when grouping by currency"
+    )
+    items: int = Field(..., description="Number of inventory items")
+    total_quantity: int = Field(..., description="Sum of the item quantities")
+    total_values: dict[str, float] = Field(
+        ..., description="Stock value (price times quantity) by currency"
+    )
+    converted_currency: str | None = Field(
+        None, description="Currency of converted_value, when requested"
+    )
+    converted_value: float | None = Field(
+        None, description="Stock value with every item valued once in one currency"
+    )
+
+
+class InventoryRollupMismatch(BaseModel):
+    """Rollup row that differs from the totals aggregated from the inventory."""
+
+    company_nit: str
+    currency: str
+    stored: tuple[int, int, Decimal] | None = Field(
+        ..., description="Stored items, quantity and value, if any"
+    )
+    live: tuple[int, int, Decimal] | None = Field(
+        ..., description="Aggregated items, quantity and value, if any"
+    )
+
+
+class StockMovementResponse(BaseModel):
+    """Stock movement response schema."""
+
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    inventory_id: int
+    product_id: int
+    delta: int = Field(..., description="Change of the quantity")
+    quantity: int = Field(..., description="Quantity after the change")
+    reason: MovementReason
+    user_id: int | None = Field(None, description="User who made the change")
+    created_at: datetime
+
+
+class LowStockAlert(BaseModel):
+    """Inventory item whose quantity dropped to its reorder threshold."""
+
+    inventory_id: int
+    product_id: int
+    quantity: int
+    reorder_threshold: int
+
+
+class StockLevel(BaseModel):
+    """Quantity of an inventory item at a point in time."""
+
+    inventory_id: int
+    as_of: datetime
+    quantity: int
@@ -1,9 +1,27 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable
 
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
+
+from api.core.exceptions import BadRequestException
 from api.core.logging import get_logger
-from api.src.inventory.models import InventoryItem
-from api.src.inventory.repository import InventoryRepository
-from api.src.inventory.schemas import InventoryItemCreate, InventoryItemUpdate
+from api.core.pagination import SortOrder
+from api.src.exchange_rates.cache import exchange_rates
+from api.src.inventory.models import InventoryItem, StockMovement
+from api.src.inventory.repository import InventoryRepository, StockLedgerRepository
+from api.src.inventory.schemas import (
+    InventoryAdjustment,
+    InventoryAdjustmentRejection,
+    InventoryBatchAdjustment,
+    InventoryBatchAdjustmentResult,
+    InventoryItemCreate,
+    InventoryItemResponse,
+    InventoryItemUpdate,
+    InventorySort,
+    InventorySummary,
+    StockLevel,
+)
 
 logger = get_logger(__name__)
 
@@ -14,6 +32,7 @@ class InventoryService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.repository = InventoryRepository(session)
+        self.ledger = StockLedgerRepository(session)
 
     async def create_inventory_item(
         self, inventory_data: InventoryItemCreate
@@ -27,22 +46,120 @@ class InventoryService:
         """Update an inventory item."""
         return await self.repository.update(inventory_id, inventory_data)
 
+    async def adjust_inventory_item(
+        self, inventory_id: int, adjustment: InventoryAdjustment
+    ) -> InventoryItem:
+        """Add a signed delta to the quantity of an inventory item."""
+        return await self.repository.adjust(
+            inventory_id, adjustment.delta, adjustment.non_negative
+        )
+
+    async def adjust_inventory_items(
+        self, batch: InventoryBatchAdjustment
+    ) -> InventoryBatchAdjustmentResult:
+        """Apply many adjustments at once, summing repeated item IDs."""
+        deltas = defaultdict(int)
+        for adjustment in batch.adjustments:
+            deltas[adjustment.id] += adjustment.delta
+
+        items, rejected = await self.repository.adjust_many(deltas, batch.non_negative)
+        return InventoryBatchAdjustmentResult(
+            items=[InventoryItemResponse.model_validate(item) for item in items],
+            rejected=[
+                InventoryAdjustmentRejection(id=inventory_id, detail=detail)
+                for inventory_id, detail in rejected.items()
+            ],
+        )
+
     async def delete_inventory_item(self, inventory_id: int) -> None:
         """Delete an inventory item."""
         await self.repository.delete(inventory_id)
 
-    async def get_inventory_item(self, inventory_id: int) -> InventoryItem:
+    async def get_inventory_item(
+        self, inventory_id: int, expand: Iterable[str] = ()
+    ) -> InventoryItem:
         """Get an inventory item by ID."""
-        return await self.repository.get_by_id(inventory_id)
+        return await self.repository.get_by_id(inventory_id, expand)
 
     async def get_inventory_items(
-        self, skip: int = 0, limit: int = 100
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
     ) -> list[InventoryItem]:
         """Get all inventory items with pagination."""
-        return await self.repository.get_all(skip, limit)
+        return await self.repository.get_all(skip, limit, after, expand)
 
     async def get_inventory_items_by_product(
-        self, product_id: int, skip: int = 0, limit: int = 100
+        self,
+        product_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
     ) -> list[InventoryItem]:
         """Get inventory items by product ID with pagination."""
-        return await self.repository.get_by_product_id(product_id, skip, limit)
+        return await self.repository.get_by_product_id(
+            product_id, skip, limit, after, expand
+        )
+
+    async def get_inventory_items_by_company(
+        self,
+        company_nit: str,
+        skip: int = 0,
+        limit: int = 100,
+        sort: InventorySort = InventorySort.ID,
+        order: SortOrder = SortOrder.ASC,
+        currency: str | None = None,
+        expand: Iterable[str] = (),
+    ) -> list[InventoryItem]:
+        """Get the inventory items of a company with their products."""
+        return await self.repository.get_by_company_nit(
+            company_nit, skip, limit, sort, order, currency, expand
+        )
+
+    async def get_low_stock_items(
+        self,
+        company_nit: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
+    ) -> list[InventoryItem]:
+        """Get the items at or below their reorder threshold with pagination."""
+        return await self.repository.get_low_stock(
+            company_nit, skip, limit, after, expand
+        )
+
+    async def get_inventory_summary(
+        self,
+        company_nit: str | None = None,
+        by_currency: bool = False,
+        convert_to: str | None = None,
+    ) -> list[InventorySummary]:
+        """Get stock totals per company, optionally per currency or converted."""
+        if convert_to is not None:
+            if by_currency:
+                raise BadRequestException(
+                    "convert_to cannot be combined with by_currency"
+                )
+            await exchange_rates.require(convert_to)
+        return await self.repository.get_summary(company_nit, by_currency, convert_to)
+
+    async def stream_inventory_items(
+        self, company_nit: str | None = None
+    ) -> AsyncScalarResult[InventoryItem]:
+        """Stream inventory items, optionally of one company, for an export."""
+        return await self.repository.stream_all(company_nit)
+
+    async def get_stock_movements(
+        self, inventory_id: int, limit: int = 100, after: int | None = None
+    ) -> list[StockMovement]:
+        """Get the recorded stock movements of an inventory item."""
+        return await self.ledger.get_movements(inventory_id, limit, after)
+
+    async def get_stock_level(self, inventory_id: int, as_of: datetime) -> StockLevel:
+        """Get the quantity of an inventory item at a point in time."""
+        quantity = await self.ledger.get_quantity_as_of(inventory_id, as_of)
+        return StockLevel(inventory_id=inventory_id, as_of=as_of, quantity=quantity)
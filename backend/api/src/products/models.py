@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, JSON, String
+from sqlalchemy import JSON, Column, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import relationship
 
 from api.core.database import Base
@@ -8,6 +8,7 @@ class Product(Base):
     """Product model."""
 
     __tablename__ = "products"
+    __table_args__ = (Index("ix_products_company_nit_id", "company_nit", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String, unique=True, index=True, nullable=False)
@@ -18,6 +19,10 @@ class Product(Base):
     # Example: {"USD": 10.50, "EUR": 9.80, "COP": 40000}
     prices = Column(JSON, nullable=False)
 
+    # The generated search_vector column used by product search is PostgreSQL
+    # only, so it is created by the migrations and not mapped here; alembic/env.py
+    # keeps autogenerate from dropping it and its indexes.
+
     # Foreign key to company
     company_nit = Column(
         String, ForeignKey("companies.nit", ondelete="CASCADE"), nullable=False
@@ -28,3 +33,23 @@ class Product(Base):
     inventory_items = relationship(
         "InventoryItem", back_populates="product", cascade="all, delete-orphan"
     )
+
+
+class ProductPrice(Base):
+    """Price of a product in one currency, mirrored from Product.prices.
+
+    ProductRepository rewrites these rows whenever it writes prices, so price
+    filters and sorts can use the (currency, amount) index instead of reading
+    the JSON of every product.
+    """
+
+    __tablename__ = "product_prices"
+    __table_args__ = (
+        Index("ix_product_prices_currency_amount", "currency", "amount", "product_id"),
+    )
+
+    product_id = Column(
+        Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    currency = Column(String, primary_key=True)
+    amount = Column(Numeric, nullable=False)
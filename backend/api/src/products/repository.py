@@ -1,19 +1,64 @@
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
+import re
+from typing import Iterable
+
+from sqlalchemy import (
+    Integer,
+    Numeric,
+    any_,
+    asc,
+    bindparam,
+    cast,
+    delete,
+    desc,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, insert
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
 
 from api.core.exceptions import AlreadyExistsException, NotFoundException
+from api.core.expand import expand_options
+from api.core.export import EXPORT_BATCH_SIZE
 from api.core.logging import get_logger
-from api.src.products.models import Product
-from api.src.products.schemas import ProductCreate, ProductUpdate
+from api.core.pagination import SortOrder
+from api.src.companies.models import Company
+from api.src.companies.repository import CompanyRepository
+from api.src.inventory.repository import InventoryRollupRepository
+from api.src.products.models import Product, ProductPrice
+from api.src.products.schemas import (
+    BulkRowStatus,
+    ConflictStrategy,
+    ProductBulkResult,
+    ProductCreate,
+    ProductUpdate,
+)
 
 logger = get_logger(__name__)
 
+# Shorter search words match whole words only, as their prefixes would match
+# a large part of the catalog
+SEARCH_MIN_PREFIX = 3
+
+# Generated column added by the migrations, PostgreSQL only so not mapped
+SEARCH_VECTOR = literal_column("products.search_vector", TSVECTOR)
+
 
 class ProductRepository:
     """Repository for handling product database operations."""
 
+    # Whether the pg_trgm extension is installed, checked once per process
+    _trigram_available: bool | None = None
+
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.rollup = InventoryRollupRepository(session)
+        self.companies = CompanyRepository(session)
 
     async def create(self, product_data: ProductCreate) -> Product:
         """Create a new product.
@@ -41,12 +86,124 @@ class ProductRepository:
             company_nit=product_data.company_nit,
         )
         self.session.add(product)
+        await self.session.flush()
+        await self.sync_prices([product.id])
         await self.session.commit()
         await self.session.refresh(product)
 
         logger.info(f"Created product: {product.name} with code: {product.code}")
         return product
 
+    async def bulk_upsert(
+        self, products: list[ProductCreate], on_conflict: ConflictStrategy
+    ) -> list[ProductBulkResult]:
+        """Create many products with multi-row INSERT ... ON CONFLICT (code).
+
+        Rows referencing an unknown company or repeating a code of the same
+        request are rejected up front, the remaining rows are written with one
+        statement (sent as multi-row pages) and committed in one transaction.
+
+        Args:
+            products: Products to create
+            on_conflict: Whether to skip, update or reject existing codes
+
+        Returns:
+            list[ProductBulkResult]: Outcome of every product, in request order
+
+        Raises:
+            AlreadyExistsException: If on_conflict is ERROR and a code exists
+        """
+        results: dict[int, ProductBulkResult] = {}
+        company_nits = {product.company_nit for product in products}
+        query = select(Company.nit).where(Company.nit.in_(company_nits))
+        known_nits = set((await self.session.execute(query)).scalars())
+
+        # Index in the request of every row that will be written, by code
+        pending: dict[str, int] = {}
+        for index, product in enumerate(products):
+            detail = None
+            if product.company_nit not in known_nits:
+                detail = f"Company with NIT {product.company_nit} not found"
+            elif product.code in pending:
+                detail = "Duplicate code in request"
+            if detail:
+                results[index] = ProductBulkResult(
+                    index=index,
+                    code=product.code,
+                    status=BulkRowStatus.REJECTED,
+                    detail=detail,
+                )
+            else:
+                pending[product.code] = index
+
+        stmt = insert(Product.__table__)
+        if on_conflict == ConflictStrategy.UPDATE:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Product.code],
+                set_={
+                    "name": stmt.excluded.name,
+                    "characteristics": stmt.excluded.characteristics,
+                    "prices": stmt.excluded.prices,
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Product.code])
+        # xmax is 0 only for rows inserted (not updated) by this statement
+        stmt = stmt.returning(
+            Product.id, Product.code, literal_column("xmax = 0").label("inserted")
+        )
+
+        # Existing products may get new prices, so their items are revalued
+        repriced = []
+        if pending and on_conflict == ConflictStrategy.UPDATE:
+            query = (
+                select(Product.id)
+                .where(Product.code.in_(pending))
+                .order_by(Product.id)
+                .with_for_update()
+            )
+            repriced = list(await self.session.scalars(query))
+            await self.rollup.apply_products(repriced, -1)
+            await self.companies.touch_products(repriced)
+
+        if pending:
+            # Executing with a list of rows batches them into multi-row VALUES
+            # pages ("insertmanyvalues") from a single cached statement
+            connection = await self.session.connection()
+            rows = await connection.execute(
+                stmt, [products[index].model_dump() for index in pending.values()]
+            )
+            written = []
+            for row in rows:
+                written.append(row.id)
+                index = pending[row.code]
+                results[index] = ProductBulkResult(
+                    index=index,
+                    code=row.code,
+                    id=row.id,
+                    status=(
+                        BulkRowStatus.CREATED if row.inserted else BulkRowStatus.UPDATED
+                    ),
+                )
+            await self.sync_prices(written)
+
+        conflicts = [code for code, index in pending.items() if index not in results]
+        if conflicts and on_conflict == ConflictStrategy.ERROR:
+            await self.session.rollback()
+            raise AlreadyExistsException(
+                f"Products with these codes already exist: {', '.join(conflicts)}"
+            )
+        for code in conflicts:
+            index = pending[code]
+            results[index] = ProductBulkResult(
+                index=index, code=code, status=BulkRowStatus.SKIPPED
+            )
+
+        await self.rollup.apply_products(repriced, 1)
+        await self.session.commit()
+        logger.info(f"Bulk wrote {len(pending) - len(conflicts)} products")
+        return [results[index] for index in range(len(products))]
+
     async def update(self, product_id: int, product_data: ProductUpdate) -> Product:
         """Update a product.
 
@@ -60,11 +217,16 @@ class ProductRepository:
         Raises:
             NotFoundException: If product not found
         """
-        product = await self.get_by_id(product_id)
-
         # Update product fields
         update_data = product_data.model_dump(exclude_unset=True)
+        # Items are revalued at the new prices, with the product locked so
+        # concurrent inventory changes are valued consistently
+        reprice = "prices" in update_data
+        product = await self.get_by_id(product_id, for_update=reprice)
         if update_data:
+            if reprice:
+                await self.rollup.apply_products([product_id], -1)
+            await self.companies.touch_products([product_id])
             stmt = (
                 update(Product)
                 .where(Product.id == product_id)
@@ -72,8 +234,11 @@ class ProductRepository:
                 .returning(Product)
             )
             result = await self.session.execute(stmt)
-            await self.session.commit()
             updated_product = result.scalar_one()
+            if reprice:
+                await self.sync_prices([product_id])
+                await self.rollup.apply_products([product_id], 1)
+            await self.session.commit()
             logger.info(f"Updated product: {updated_product.name}")
             return updated_product
         return product
@@ -87,16 +252,25 @@ class ProductRepository:
         Raises:
             NotFoundException: If product not found
         """
-        product = await self.get_by_id(product_id)
+        product = await self.get_by_id(product_id, for_update=True)
+        await self.rollup.apply_products([product_id], -1)
+        await self.companies.touch_products([product_id])
         await self.session.delete(product)
         await self.session.commit()
         logger.info(f"Deleted product with ID: {product_id}")
 
-    async def get_by_id(self, product_id: int) -> Product:
+    async def get_by_id(
+        self,
+        product_id: int,
+        for_update: bool = False,
+        expand: Iterable[str] = (),
+    ) -> Product:
         """Get product by ID.
 
         Args:
             product_id: Product ID
+            for_update: Lock the product row until the end of the transaction
+            expand: Relationships to load with the product
 
         Returns:
             Product: Found product
@@ -104,7 +278,13 @@ class ProductRepository:
         Raises:
             NotFoundException: If product not found
         """
-        query = select(Product).where(Product.id == product_id)
+        query = (
+            select(Product)
+            .where(Product.id == product_id)
+            .options(*expand_options(Product, expand))
+        )
+        if for_update:
+            query = query.with_for_update()
         result = await self.session.execute(query)
         product = result.scalar_one_or_none()
 
@@ -126,29 +306,51 @@ class ProductRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> list[Product]:
-        """Get all products with pagination.
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
+    ) -> list[Product]:
+        """Get all products ordered by ID with pagination.
 
         Args:
             skip: Number of products to skip
             limit: Maximum number of products to return
+            after: Only return products with an ID greater than this (keyset)
+            expand: Relationships to load with the products
 
         Returns:
             List[Product]: List of products
         """
-        query = select(Product).offset(skip).limit(limit)
+        query = (
+            select(Product)
+            .options(*expand_options(Product, expand))
+            .order_by(Product.id)
+        )
+        if after is not None:
+            query = query.where(Product.id > after)
+        query = query.offset(skip).limit(limit)
         result = await self.session.execute(query)
         return result.scalars().all()
 
     async def get_by_company_nit(
-        self, company_nit: str, skip: int = 0, limit: int = 100
+        self,
+        company_nit: str,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
     ) -> list[Product]:
-        """Get products by company NIT with pagination.
+        """Get products by company NIT ordered by ID with pagination.
 
         Args:
             company_nit: Company NIT
             skip: Number of products to skip
             limit: Maximum number of products to return
+            after: Only return products with an ID greater than this (keyset)
+            expand: Relationships to load with the products
 
         Returns:
             List[Product]: List of products for the company
@@ -156,8 +358,173 @@ class ProductRepository:
         query = (
             select(Product)
             .where(Product.company_nit == company_nit)
+            .options(*expand_options(Product, expand))
+            .order_by(Product.id)
+        )
+        if after is not None:
+            query = query.where(Product.id > after)
+        query = query.offset(skip).limit(limit)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def get_by_price(
+        self,
+        currency: str,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        order: SortOrder = SortOrder.ASC,
+        company_nit: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        expand: Iterable[str] = (),
+    ) -> list[Product]:
+        """Get the products priced in a currency, ordered by that price.
+
+        The range filter and the order come from one scan of the (currency,
+        amount) index of product_prices, however many products there are.
+
+        Args:
+            currency: Currency the products must have a price in
+            min_price: Only return products priced at least this much
+            max_price: Only return products priced at most this much
+            order: Sort by price ascending or descending, then by ID
+            company_nit: Only return the products of this company
+            skip: Number of products to skip
+            limit: Maximum number of products to return
+            expand: Relationships to load with the products
+
+        Returns:
+            List[Product]: Products priced in the currency
+        """
+        direction = desc if order == SortOrder.DESC else asc
+        query = (
+            select(Product)
+            .join(ProductPrice, ProductPrice.product_id == Product.id)
+            .where(ProductPrice.currency == currency)
+            .options(*expand_options(Product, expand))
+            .order_by(
+                direction(ProductPrice.amount), direction(ProductPrice.product_id)
+            )
+        )
+        if min_price is not None:
+            query = query.where(ProductPrice.amount >= min_price)
+        if max_price is not None:
+            query = query.where(ProductPrice.amount <= max_price)
+        if company_nit is not None:
+            query = query.where(Product.company_nit == company_nit)
+        query = query.offset(skip).limit(limit)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def search(
+        self,
+        q: str,
+        company_nit: str | None = None,
+        skip: int = 0,
+        limit: int = 20,
+        expand: Iterable[str] = (),
+    ) -> list[Product]:
+        """Search products by the words of their name and characteristics.
+
+        Every word of q must start a word of the product (`lap` finds
+        "laptop"), matched through the GIN index of search_vector; words
+        shorter than SEARCH_MIN_PREFIX must match a whole word, which keeps
+        the number of matches down. With pg_trgm installed, products whose
+        name is similar to q also match, so small typos are tolerated.
+
+        All matches are ordered by their ts_rank_cd score, in which name
+        matches weigh more than characteristics matches, then by ID, so every
+        match can be reached by paging and pages do not depend on the plan.
+
+        Args:
+            q: Search text
+            company_nit: Only search the products of this company
+            skip: Number of products to skip
+            limit: Maximum number of products to return
+            expand: Relationships to load with the products
+
+        Returns:
+            List[Product]: Matching products, by descending score
+        """
+        words = re.findall(r"\w+", q.lower())
+        if not words:
+            return []
+
+        # Words are alphanumeric, so they cannot inject tsquery operators
+        query_text = " & ".join(
+            f"{word}:*" if len(word) >= SEARCH_MIN_PREFIX else word for word in words
+        )
+        ts_query = func.to_tsquery("simple", query_text)
+        matches = SEARCH_VECTOR.op("@@")(ts_query)
+        rank = func.ts_rank_cd(SEARCH_VECTOR, ts_query)
+        if await self._has_trigram():
+            phrase = literal(" ".join(words))
+            matches = or_(matches, phrase.op("<%")(Product.name))
+            rank = func.greatest(rank, func.word_similarity(phrase, Product.name))
+
+        query = select(Product).where(matches)
+        if company_nit is not None:
+            query = query.where(Product.company_nit == company_nit)
+        query = (
+            query.options(*expand_options(Product, expand))
+            .order_by(rank.desc(), Product.id)
             .offset(skip)
             .limit(limit)
         )
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    async def _has_trigram(self) -> bool:
+        """Whether pg_trgm is installed, for typo tolerant search."""
+        if ProductRepository._trigram_available is None:
+            ProductRepository._trigram_available = await self.session.scalar(
+                text(
+                    "SELECT EXISTS "
+                    "(SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+                )
+            )
+        return ProductRepository._trigram_available
+
+    async def sync_prices(self, product_ids: list[int]) -> None:
+        """Rewrite the product_prices rows of products from their prices.
+
+        Does not commit. Writers of products.prices that bypass this
+        repository must call it for the products they wrote.
+
+        Args:
+            product_ids: IDs of the products whose prices were written
+        """
+        if not product_ids:
+            return
+
+        ids = bindparam("ids", product_ids, type_=ARRAY(Integer))
+        await self.session.execute(
+            delete(ProductPrice).where(ProductPrice.product_id == any_(ids))
+        )
+        price = func.json_each_text(Product.prices).table_valued("key", "value")
+        await self.session.execute(
+            insert(ProductPrice.__table__).from_select(
+                ["product_id", "currency", "amount"],
+                select(Product.id, price.c.key, cast(price.c.value, Numeric))
+                .join(price, true())
+                .where(Product.id == any_(ids)),
+            )
+        )
+
+    async def stream_all(
+        self, company_nit: str | None = None
+    ) -> AsyncScalarResult[Product]:
+        """Stream products ordered by ID from a server-side cursor.
+
+        Args:
+            company_nit: Only stream the products of this company
+
+        Returns:
+            AsyncScalarResult[Product]: Products, fetched in batches
+        """
+        query = select(Product).order_by(Product.id)
+        if company_nit is not None:
+            query = query.where(Product.company_nit == company_nit)
+        return await self.session.stream_scalars(
+            query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.database import get_session
+from api.core.expand import parse_expand
+from api.core.export import ExportFormat, export_response
 from api.core.logging import get_logger
+from api.core.pagination import SortOrder, decode_cursor, set_next_cursor
 from api.core.security import get_current_user, require_admin
 from api.src.products.schemas import (
+    ProductBulkCreate,
+    ProductBulkResponse,
     ProductCreate,
+    ProductDetail,
     ProductResponse,
     ProductUpdate,
 )
@@ -16,6 +23,9 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Relationship paths accepted by the `expand` query parameter
+EXPANDABLE = ("company",)
+
 
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
@@ -28,42 +38,165 @@ async def create_product(
     return await ProductService(session).create_product(product_data)
 
 
-@router.get("", response_model=list[ProductResponse])
+@router.post("/bulk", response_model=ProductBulkResponse)
+async def bulk_create_products(
+    bulk_data: ProductBulkCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(require_admin),
+) -> ProductBulkResponse:
+    """Create many products in one request. Admin only.
+
+    Existing codes are skipped, updated or make the whole batch fail with 409,
+    depending on `on_conflict`.
+    """
+    logger.debug(f"Bulk creating {len(bulk_data.products)} products")
+    return await ProductService(session).bulk_create_products(bulk_data)
+
+
+@router.get("", response_model=list[ProductDetail], response_model_exclude_unset=True)
 async def get_products(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    expand: str | None = Query(None, description="Comma separated: company"),
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
-) -> list[ProductResponse]:
-    """Get all products."""
+) -> list[ProductDetail]:
+    """Get all products.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
     logger.debug(f"Getting products with skip={skip}, limit={limit}")
-    return await ProductService(session).get_products(skip, limit)
+    products = await ProductService(session).get_products(
+        skip, limit, decode_cursor(cursor), parse_expand(expand, EXPANDABLE)
+    )
+    set_next_cursor(response, products, "id", limit)
+    return products
 
 
-@router.get("/company/{company_nit}", response_model=list[ProductResponse])
+@router.get(
+    "/company/{company_nit}",
+    response_model=list[ProductDetail],
+    response_model_exclude_unset=True,
+)
 async def get_products_by_company(
     company_nit: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    expand: str | None = Query(None, description="Comma separated: company"),
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
-) -> list[ProductResponse]:
-    """Get products by company NIT."""
+) -> list[ProductDetail]:
+    """Get products by company NIT.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
     logger.debug(f"Getting products for company NIT: {company_nit}")
-    return await ProductService(session).get_products_by_company(
-        company_nit, skip, limit
+    products = await ProductService(session).get_products_by_company(
+        company_nit,
+        skip,
+        limit,
+        decode_cursor(cursor),
+        parse_expand(expand, EXPANDABLE),
+    )
+    set_next_cursor(response, products, "id", limit)
+    return products
+
+
+@router.get(
+    "/search",
+    response_model=list[ProductDetail],
+    response_model_exclude_unset=True,
+)
+async def search_products(
+    q: str = Query(
+        ..., min_length=1, description="Words of the name or characteristics"
+    ),
+    company_nit: str | None = Query(None, description="Filter by company NIT"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    expand: str | None = Query(None, description="Comma separated: company"),
+    session: AsyncSession = Depends(get_session),
+    _: User = Depends(get_current_user),
+) -> list[ProductDetail]:
+    """Search products by name and characteristics, highest score first.
+
+    Words of three or more characters match as prefixes (`lap` finds
+    "laptop"), shorter ones as whole words; small typos in the name are
+    tolerated where the database has pg_trgm.
+    """
+    logger.debug(f"Searching products for: {q}")
+    return await ProductService(session).search_products(
+        q, company_nit, skip, limit, parse_expand(expand, EXPANDABLE)
+    )
+
+
+@router.get(
+    "/by-price",
+    response_model=list[ProductDetail],
+    response_model_exclude_unset=True,
+)
+async def get_products_by_price(
+    currency: str = Query(..., description="Currency of the price, e.g. USD"),
+    min_price: float | None = Query(None, ge=0, description="Lowest price"),
+    max_price: float | None = Query(None, ge=0, description="Highest price"),
+    order: SortOrder = Query(SortOrder.ASC, description="asc or desc"),
+    company_nit: str | None = Query(None, description="Filter by company NIT"),
+    skip: int = 0,
+    limit: int = 100,
+    expand: str | None = Query(None, description="Comma separated: company"),
+    session: AsyncSession = Depends(get_session),
+    _: User = Depends(get_current_user),
+) -> list[ProductDetail]:
+    """Get the products priced in a currency within a range, sorted by price."""
+    logger.debug(f"Getting products by {currency} price")
+    return await ProductService(session).get_products_by_price(
+        currency,
+        min_price,
+        max_price,
+        order,
+        company_nit,
+        skip,
+        limit,
+        parse_expand(expand, EXPANDABLE),
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_products(
+    request: Request,
+    company_nit: str | None = Query(None, description="Filter by company NIT"),
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    _: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Export products as NDJSON or CSV in a single streamed response."""
+    logger.debug(f"Exporting products as {file_format.value}")
+    return export_response(
+        request,
+        lambda session: ProductService(session).stream_products(company_nit),
+        ProductResponse,
+        file_format,
+        "products",
     )
 
 
-@router.get("/{product_id}", response_model=ProductResponse)
+@router.get(
+    "/{product_id}", response_model=ProductDetail, response_model_exclude_unset=True
+)
 async def get_product(
     product_id: int,
+    expand: str | None = Query(None, description="Comma separated: company"),
     session: AsyncSession = Depends(get_session),
     _: User = Depends(get_current_user),
-) -> ProductResponse:
+) -> ProductDetail:
     """Get a product by ID."""
     logger.debug(f"Getting product with ID: {product_id}")
-    return await ProductService(session).get_product(product_id)
+    return await ProductService(session).get_product(
+        product_id, parse_expand(expand, EXPANDABLE)
+    )
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
@@ -1,7 +1,14 @@
+import enum
 from typing import Dict
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from api.core.expand import ExpandableResponse
+from api.src.companies.schemas import CompanyResponse
+
+# Maximum number of products accepted by a single bulk request
+MAX_BULK_PRODUCTS = 10000
+
 
 class ProductBase(BaseModel):
     """Base product schema."""
@@ -38,3 +45,61 @@ class ProductResponse(ProductBase):
     model_config = ConfigDict(from_attributes=True)
     id: int
     company_nit: str
+
+
+class ProductDetail(ProductResponse, ExpandableResponse):
+    """Product response schema with optionally expanded relationships."""
+
+    company: CompanyResponse | None = None
+
+
+class ConflictStrategy(str, enum.Enum):
+    """What to do when a bulk product code already exists."""
+
+    SKIP = "skip"
+    UPDATE = "update"
+    ERROR = "error"
+
+
+class BulkRowStatus(str, enum.Enum):
+    """Outcome of a single row of a bulk product request."""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    SKIPPED = "skipped"
+    REJECTED = "rejected"
+
+
+class ProductBulkCreate(BaseModel):
+    """Bulk product creation schema."""
+
+    products: list[ProductCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BULK_PRODUCTS,
+        description="Products to create",
+    )
+    on_conflict: ConflictStrategy = Field(
+        ConflictStrategy.ERROR,
+        description="Skip, update or reject products whose code already exists",
+    )
+
+
+class ProductBulkResult(BaseModel):
+    """Outcome of a single product of a bulk request."""
+
+    index: int = Field(..., description="Position of the product in the request")
+    code: str
+    status: BulkRowStatus
+    id: int | None = None
+    detail: str | None = None
+
+
+class ProductBulkResponse(BaseModel):
+    """Bulk product creation response schema."""
+
+    created: int
+    updated: int
+    skipped: int
+    rejected: int
+    results: list[ProductBulkResult]
@@ -1,9 +1,18 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncScalarResult, AsyncSession
 
 from api.core.logging import get_logger
+from api.core.pagination import SortOrder
 from api.src.products.models import Product
 from api.src.products.repository import ProductRepository
-from api.src.products.schemas import ProductCreate, ProductUpdate
+from api.src.products.schemas import (
+    BulkRowStatus,
+    ProductBulkCreate,
+    ProductBulkResponse,
+    ProductCreate,
+    ProductUpdate,
+)
 
 logger = get_logger(__name__)
 
@@ -19,6 +28,25 @@ class ProductService:
         """Create a new product."""
         return await self.repository.create(product_data)
 
+    async def bulk_create_products(
+        self, bulk_data: ProductBulkCreate
+    ) -> ProductBulkResponse:
+        """Create many products at once and summarize the per-row outcomes."""
+        results = await self.repository.bulk_upsert(
+            bulk_data.products, bulk_data.on_conflict
+        )
+        counts = {status: 0 for status in BulkRowStatus}
+        for result in results:
+            counts[result.status] += 1
+
+        return ProductBulkResponse(
+            created=counts[BulkRowStatus.CREATED],
+            updated=counts[BulkRowStatus.UPDATED],
+            skipped=counts[BulkRowStatus.SKIPPED],
+            rejected=counts[BulkRowStatus.REJECTED],
+            results=results,
+        )
+
     async def update_product(
         self, product_id: int, product_data: ProductUpdate
     ) -> Product:
@@ -29,16 +57,62 @@ class ProductService:
         """Delete a product."""
         await self.repository.delete(product_id)
 
-    async def get_product(self, product_id: int) -> Product:
+    async def get_product(self, product_id: int, expand: Iterable[str] = ()) -> Product:
         """Get a product by ID."""
-        return await self.repository.get_by_id(product_id)
+        return await self.repository.get_by_id(product_id, expand=expand)
 
-    async def get_products(self, skip: int = 0, limit: int = 100) -> list[Product]:
+    async def get_products(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
+    ) -> list[Product]:
         """Get all products with pagination."""
-        return await self.repository.get_all(skip, limit)
+        return await self.repository.get_all(skip, limit, after, expand)
 
     async def get_products_by_company(
-        self, company_nit: str, skip: int = 0, limit: int = 100
+        self,
+        company_nit: str,
+        skip: int = 0,
+        limit: int = 100,
+        after: int | None = None,
+        expand: Iterable[str] = (),
     ) -> list[Product]:
         """Get products by company NIT with pagination."""
-        return await self.repository.get_by_company_nit(company_nit, skip, limit)
+        return await self.repository.get_by_company_nit(
+            company_nit, skip, limit, after, expand
+        )
+
+    async def get_products_by_price(
+        self,
+        currency: str,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        order: SortOrder = SortOrder.ASC,
+        company_nit: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        expand: Iterable[str] = (),
+    ) -> list[Product]:
+        """Get the products priced in a currency, ordered by that price."""
+        return await self.repository.get_by_price(
+            currency, min_price, max_price, order, company_nit, skip, limit, expand
+        )
+
+    async def search_products(
+        self,
+        q: str,
+        company_nit: str | None = None,
+        skip: int = 0,
+        limit: int = 20,
+        expand: Iterable[str] = (),
+    ) -> list[Product]:
+        """Search products by name and characteristics, highest score first."""
+        return await self.repository.search(q, company_nit, skip, limit, expand)
+
+    async def stream_products(
+        self, company_nit: str | None = None
+    ) -> AsyncScalarResult[Product]:
+        """Stream products, optionally of one company, for an export."""
+        return await self.repository.stream_all(company_nit)
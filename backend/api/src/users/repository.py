@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.exceptions import AlreadyExistsException, NotFoundException
 from api.core.logging import get_logger
-from api.core.security import get_password_hash
+from api.core.security import get_password_hash, principal_cache
 from api.src.users.models import User
 from api.src.users.schemas import UserCreate
 
@@ -36,12 +36,13 @@ class UserRepository:
         # Create user
         user = User(
             email=user_data.email,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await get_password_hash(user_data.password),
             role=user_data.role
         )
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
+        principal_cache.invalidate(user.id)
 
         logger.info(f"Created user: {user.email} with role: {user.role}")
         return user
@@ -31,7 +31,7 @@ class UserService:
         user = await self.repository.get_by_email(login_data.email)
 
         # Verify credentials
-        if not user or not verify_password(
+        if not user or not await verify_password(
             login_data.password, str(user.hashed_password)
         ):
             raise Exception(
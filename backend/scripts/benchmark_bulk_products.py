@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Compare product creation throughput of the single-item and the bulk paths.
+
+Both paths run against the configured database with a throwaway company that
+is deleted (with its products) at the end.
+
+Usage: python -m scripts.benchmark_bulk_products --products 2000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete
+
+from api.core.database import async_session
+from api.src.companies.models import Company
+from api.src.inventory.models import InventoryItem  # noqa: F401 (mapper registry)
+from api.src.products.repository import ProductRepository
+from api.src.products.schemas import ConflictStrategy, ProductCreate
+
+BENCHMARK_NIT = "999999999"
+
+
+def make_products(prefix: str, count: int) -> list[ProductCreate]:
+    """Build products with unique codes for the benchmark company."""
+    return [
+        ProductCreate(
+            code=f"{prefix}-{index}",
+            name=f"Benchmark product {index}",
+            characteristics="Benchmark",
+            prices={"USD": 10.5, "EUR": 9.8},
+            company_nit=BENCHMARK_NIT,
+        )
+        for index in range(count)
+    ]
+
+
+async def run(count: int) -> None:
+    async with async_session() as session:
+        await session.execute(delete(Company).where(Company.nit == BENCHMARK_NIT))
+        session.add(
+            Company(nit=BENCHMARK_NIT, name="Benchmark", address="-", phone="-")
+        )
+        await session.commit()
+
+    try:
+        async with async_session() as session:
+            repository = ProductRepository(session)
+            start = time.perf_counter()
+            for product in make_products("SINGLE", count):
+                await repository.create(product)
+            single = count / (time.perf_counter() - start)
+
+        async with async_session() as session:
+            repository = ProductRepository(session)
+            start = time.perf_counter()
+            await repository.bulk_upsert(
+                make_products("BULK", count), ConflictStrategy.ERROR
+            )
+            bulk = count / (time.perf_counter() - start)
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(Company).where(Company.nit == BENCHMARK_NIT))
+            await session.commit()
+
+    print(f"Products: {count}")
+    print(f"  single-item path: {single:,.0f} products/s")
+    print(f"  bulk path:        {bulk:,.0f} products/s")
+    print(f"  speedup:          {bulk / single:.1f}x")
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description="Bulk product creation benchmark")
+    parser.add_argument("--products", type=int, default=2000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.products))
+
+
+if __name__ == "__main__":
+    main()
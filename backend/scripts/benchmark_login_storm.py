@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Benchmark the latency of an unrelated endpoint while a login storm is running.
+
+The app is served in-process against the configured database. Run it once with
+--blocking to hash passwords on the event loop (the previous behaviour) and once
+without it to use the password hashing pool, then compare the p99 latencies.
+
+Usage: python -m scripts.benchmark_login_storm --logins 50 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import Executor, Future
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete
+
+from api.core import security
+from api.core.database import async_session
+from api.main import app
+from api.src.users.models import User, UserRole
+from api.src.users.repository import UserRepository
+from api.src.users.schemas import UserCreate
+
+BENCHMARK_EMAIL = "login-storm@example.com"
+BENCHMARK_PASSWORD = "login-storm-password"
+
+# Seconds between two probe requests to the unrelated endpoint
+PROBE_INTERVAL = 0.01
+
+
+class InlineExecutor(Executor):
+    """Executor that runs work on the calling thread, blocking the event loop."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the given percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def login_storm(client: AsyncClient, logins: int, concurrency: int) -> None:
+    """Send logins with a bounded number of requests in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> None:
+        async with semaphore:
+            response = await client.post(
+                "/auth/login",
+                data={"username": BENCHMARK_EMAIL, "password": BENCHMARK_PASSWORD},
+            )
+            response.raise_for_status()
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def probe(client: AsyncClient, stop: asyncio.Event) -> list[float]:
+    """Measure GET /health latencies (ms) until the storm stops.
+
+    Requests are scheduled at a fixed interval and latency is measured from the
+    scheduled time, so time spent waiting for a blocked event loop is counted.
+    """
+    latencies = []
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+        await client.get("/health")
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+        scheduled += PROBE_INTERVAL
+    return latencies
+
+
+async def run(logins: int, concurrency: int, blocking: bool) -> None:
+    if blocking:
+        security.password_executor = InlineExecutor()
+
+    async with async_session() as session:
+        await session.execute(delete(User).where(User.email == BENCHMARK_EMAIL))
+        await session.commit()
+        await UserRepository(session).create(
+            UserCreate(
+                email=BENCHMARK_EMAIL,
+                password=BENCHMARK_PASSWORD,
+                role=UserRole.EXTERNAL,
+            )
+        )
+
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://benchmark"
+        ) as client:
+            stop = asyncio.Event()
+            prober = asyncio.create_task(probe(client, stop))
+            start = time.perf_counter()
+            await login_storm(client, logins, concurrency)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            latencies = await prober
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(User).where(User.email == BENCHMARK_EMAIL))
+            await session.commit()
+
+    mode = "blocking (event loop)" if blocking else "password hashing pool"
+    print(f"Mode: {mode}")
+    print(f"Logins: {logins} in {elapsed:.2f}s ({logins / elapsed:.1f}/s)")
+    print(f"GET /health samples: {len(latencies)}")
+    print(f"  p50: {statistics.median(latencies):.1f} ms")
+    print(f"  p99: {percentile(latencies, 99):.1f} ms")
+    print(f"  max: {max(latencies):.1f} ms")
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description="Login storm latency benchmark")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Hash on the event loop to reproduce the previous behaviour",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.logins, args.concurrency, args.blocking))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Measure product search latency on a large generated catalog.
+
+Products are generated in the database for a throwaway company, with names
+and characteristics drawn from a vocabulary of --words pseudo-words, and
+deleted at the end. Queries are built from the names of random products: a
+whole word, a whole word plus the prefix of another, or a 4 letter prefix.
+
+Usage: python -m scripts.benchmark_product_search --products 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import delete, select, text
+
+from api.core.database import async_session
+from api.src.companies.models import Company
+from api.src.inventory.models import InventoryItem  # noqa: F401 (mapper registry)
+from api.src.products.models import Product
+from api.src.products.repository import ProductRepository
+
+BENCHMARK_NIT = "999999999"
+
+# Word k of the vocabulary is the start of md5(k), for k < :words
+SEED_SQL = text(
+    """
+    INSERT INTO products (code, name, characteristics, prices, company_nit)
+    SELECT
+        'SEARCH-BENCH-' || i,
+        concat_ws(
+            ' ',
+            substr(md5((i % :words)::text), 1, 7),
+            substr(md5((i * 7 % :words)::text), 1, 7),
+            substr(md5((i * 13 % :words)::text), 1, 7)
+        ),
+        concat_ws(
+            ' ',
+            substr(md5((i * 31 % :words)::text), 1, 7),
+            substr(md5((i * 37 % :words)::text), 1, 7),
+            substr(md5((i * 41 % :words)::text), 1, 7),
+            substr(md5((i * 43 % :words)::text), 1, 7)
+        ),
+        '{"USD": 10}',
+        :nit
+    FROM generate_series(1, :count) AS i
+    """
+)
+
+
+def make_query(name: str) -> str:
+    """Build a search query from the words of a product name."""
+    first, second, _ = name.split()
+    return random.choice([first, f"{first} {second[:3]}", second[:4]])
+
+
+async def run(count: int, words: int, repetitions: int) -> None:
+    async with async_session() as session:
+        await session.execute(delete(Company).where(Company.nit == BENCHMARK_NIT))
+        session.add(
+            Company(nit=BENCHMARK_NIT, name="Benchmark", address="-", phone="-")
+        )
+        await session.flush()
+        start = time.perf_counter()
+        await session.execute(
+            SEED_SQL, {"words": words, "nit": BENCHMARK_NIT, "count": count}
+        )
+        # Merge the fresh index entries, as autovacuum would in steady state
+        await session.execute(
+            text("SELECT gin_clean_pending_list('ix_products_search_vector')")
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE products"))
+        print(f"Seeded {count:,} products in {time.perf_counter() - start:.1f}s")
+
+    try:
+        async with async_session() as session:
+            names = await session.scalars(
+                select(Product.name)
+                .where(Product.company_nit == BENCHMARK_NIT)
+                .order_by(Product.id)
+                .offset(random.randrange(max(count - repetitions, 1)))
+                .limit(repetitions)
+            )
+            queries = [make_query(name) for name in names]
+
+            repository = ProductRepository(session)
+            latencies = []
+            for q in queries:
+                start = time.perf_counter()
+                await repository.search(q)
+                latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(Company).where(Company.nit == BENCHMARK_NIT))
+            await session.commit()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"Searches: {len(latencies)}")
+    print(f"  p50: {percentiles[49]:.1f} ms")
+    print(f"  p95: {percentiles[94]:.1f} ms")
+    print(f"  max: {max(latencies):.1f} ms")
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description="Product search benchmark")
+    parser.add_argument("--products", type=int, default=1000000)
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--searches", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.products, args.words, args.searches))
+
+
+if __name__ == "__main__":
+    main()
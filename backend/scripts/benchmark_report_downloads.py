@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+Benchmark the latency of an unrelated endpoint during concurrent report downloads.
+
+The app is served in-process against the configured database, with a throwaway
+company of --items priced inventory items that is deleted at the end. Reports of
+more than REPORT_CHUNK_ROWS items take the chunked rendering path. Run it once with
+--blocking to render PDFs on the event loop (the previous behaviour) and once
+without it to use the report render pool, then compare the p99 latencies.
+Downloads rejected by a saturated pool (503) are counted, not retried. The
+report cache is disabled so every download renders its report; pass --cached to
+keep it and measure downloads served from the cache instead.
+
+Usage: python -m scripts.benchmark_report_downloads --downloads 20 --concurrency 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Callable
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, text
+
+from api.core.database import async_session
+from api.core.security import get_current_user
+from api.main import app
+from api.src.companies.models import Company
+from api.src.inventory import pdf_generator
+from api.src.inventory.rendering import ReportRenderPool
+from api.src.inventory.report_cache import report_cache
+from api.src.inventory.repository import InventoryRollupRepository
+from api.src.products.repository import ProductRepository
+from api.src.users.models import User, UserRole
+
+BENCHMARK_NIT = "999999999"
+
+# Seconds between two probe requests to the unrelated endpoint
+PROBE_INTERVAL = 0.01
+
+SEED_SQL = text(
+    """
+    WITH products AS (
+        INSERT INTO products (code, name, characteristics, prices, company_nit)
+        SELECT 'REPORT-BENCH-' || i, 'Product ' || i, 'Benchmark',
+               '{"USD": 10}', :nit
+        FROM generate_series(1, :count) AS i
+        RETURNING id
+    )
+    INSERT INTO inventory (product_id, quantity)
+    SELECT id, 1 FROM products
+    RETURNING product_id
+    """
+)
+
+
+class InlineRenderPool(ReportRenderPool):
+    """Render pool that renders on the calling thread, blocking the event loop."""
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return fn(*args)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the given percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def download_storm(
+    client: AsyncClient, downloads: int, concurrency: int
+) -> dict[int, int]:
+    """Download reports with a bounded number of requests in flight.
+
+    Returns:
+        dict[int, int]: Number of responses by status code
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses: dict[int, int] = {}
+
+    async def download() -> None:
+        async with semaphore:
+            response = await client.get(
+                "/inventory/report/download", params={"company_nit": BENCHMARK_NIT}
+            )
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(download() for _ in range(downloads)))
+    return statuses
+
+
+async def probe(client: AsyncClient, stop: asyncio.Event) -> list[float]:
+    """Measure GET /health latencies (ms) until the downloads stop.
+
+    Requests are scheduled at a fixed interval and latency is measured from the
+    scheduled time, so time spent waiting for a blocked event loop is counted.
+    """
+    latencies = []
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+        await client.get("/health")
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+        scheduled += PROBE_INTERVAL
+    return latencies
+
+
+async def clean() -> None:
+    async with async_session() as session:
+        await session.execute(delete(Company).where(Company.nit == BENCHMARK_NIT))
+        await session.commit()
+
+
+async def run(
+    items: int, downloads: int, concurrency: int, blocking: bool, cached: bool
+) -> None:
+    renderer = pdf_generator.report_renderer
+    if blocking:
+        pdf_generator.report_renderer = InlineRenderPool(1, 0)
+    cache_max_bytes = report_cache.max_bytes
+    if not cached:
+        report_cache.max_bytes = 0
+
+    await clean()
+    async with async_session() as session:
+        session.add(
+            Company(
+                nit=BENCHMARK_NIT,
+                name="Report benchmark",
+                address="Street",
+                phone="123",
+            )
+        )
+        await session.flush()
+        result = await session.execute(SEED_SQL, {"nit": BENCHMARK_NIT, "count": items})
+        # Index the prices and totals the raw inserts bypass, as the
+        # repositories do, so the report values and chunking are real
+        product_ids = list(result.scalars())
+        await ProductRepository(session).sync_prices(product_ids)
+        await InventoryRollupRepository(session).apply_products(product_ids, 1)
+        await session.commit()
+
+    user = User(id=0, email="report-benchmark@example.com", role=UserRole.ADMIN)
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://benchmark"
+        ) as client:
+            # Start the render processes (and fill the cache) before measuring
+            await client.get(
+                "/inventory/report/download", params={"company_nit": BENCHMARK_NIT}
+            )
+            stop = asyncio.Event()
+            prober = asyncio.create_task(probe(client, stop))
+            start = time.perf_counter()
+            statuses = await download_storm(client, downloads, concurrency)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            latencies = await prober
+    finally:
+        app.dependency_overrides.clear()
+        pdf_generator.report_renderer = renderer
+        renderer.shutdown()
+        report_cache.max_bytes = cache_max_bytes
+        report_cache.clear()
+        await clean()
+
+    if blocking:
+        mode = "blocking (event loop)"
+    else:
+        mode = f"render pool ({renderer.workers} workers, {renderer.queue_size} queued)"
+    if cached:
+        mode += ", cached"
+    print(f"Mode: {mode}")
+    print(f"Downloads: {downloads} of {items} items in {elapsed:.2f}s")
+    print(f"  responses: {dict(sorted(statuses.items()))}")
+    print(f"GET /health samples: {len(latencies)}")
+    print(f"  p50: {statistics.median(latencies):.1f} ms")
+    print(f"  p99: {percentile(latencies, 99):.1f} ms")
+    print(f"  max: {max(latencies):.1f} ms")
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description="Report download latency benchmark")
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--downloads", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Render on the event loop to reproduce the previous behaviour",
+    )
+    parser.add_argument(
+        "--cached",
+        action="store_true",
+        help="Keep the report cache, so downloads after the first are cache hits",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(args.items, args.downloads, args.concurrency, args.blocking, args.cached)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Check the inventory rollup against the totals aggregated from the inventory.
+
+Every rollup row that differs from a fresh aggregate is printed and the script
+exits with status 1. With --repair the rollup is rebuilt from the inventory in
+the same transaction as the check.
+
+Usage: python -m scripts.check_inventory_rollup [--repair]
+"""
+import argparse
+import asyncio
+import sys
+
+from api.core.database import async_session
+from api.src.inventory.repository import InventoryRollupRepository
+from api.src.products.models import Product  # noqa: F401 (mapper registry)
+
+
+async def check(repair: bool) -> int:
+    """Diff the rollup, rebuild it if asked, and return the exit status."""
+    async with async_session() as session:
+        repository = InventoryRollupRepository(session)
+        mismatches = await repository.diff()
+        for mismatch in mismatches:
+            print(
+                f"{mismatch.company_nit} {mismatch.currency or '(all)'}: "
+                f"stored={mismatch.stored} live={mismatch.live}"
+            )
+
+        if not mismatches:
+            print("Inventory rollup is consistent")
+            return 0
+        if not repair:
+            print(f"{len(mismatches)} rollup rows differ, run with --repair")
+            return 1
+
+        await repository.rebuild()
+        await session.commit()
+        print(f"Rebuilt inventory rollup, {len(mismatches)} rows fixed")
+        return 0
+
+
+def main():
+    """Parse arguments and run the check."""
+    parser = argparse.ArgumentParser(description="Inventory rollup check")
+    parser.add_argument(
+        "--repair", action="store_true", help="Rebuild the rollup on mismatch"
+    )
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(check(args.repair)))
+
+
+if __name__ == "__main__":
+    main()
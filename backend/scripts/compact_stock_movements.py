@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Fold old stock movements into daily snapshots.
+
+Movements older than --keep-days full days (UTC) are replaced by one snapshot
+per inventory item and day. Stock levels stay answerable for any date, with
+daily resolution for the compacted days. Meant to run daily, e.g. from cron.
+
+Usage: python -m scripts.compact_stock_movements --keep-days 30
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from api.core.database import async_session
+from api.src.inventory.repository import StockLedgerRepository
+from api.src.products.models import Product  # noqa: F401 (mapper registry)
+
+
+async def compact(keep_days: int) -> None:
+    """Compact the movements older than keep_days."""
+    before = datetime.now(timezone.utc).date() - timedelta(days=keep_days)
+    async with async_session() as session:
+        written = await StockLedgerRepository(session).compact(before)
+    print(f"Compacted movements before {before} into {written} snapshots")
+
+
+def main():
+    """Parse arguments and run the compaction."""
+    parser = argparse.ArgumentParser(description="Stock movement compaction")
+    parser.add_argument(
+        "--keep-days",
+        type=int,
+        default=30,
+        help="Full days of individual movements to keep (at least 1)",
+    )
+    args = parser.parse_args()
+    if args.keep_days < 1:
+        parser.error("--keep-days must be at least 1")
+
+    asyncio.run(compact(args.keep_days))
+
+
+if __name__ == "__main__":
+    main()
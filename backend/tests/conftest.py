@@ -0,0 +1,49 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from api.core import database
+from api.core.config import settings
+from api.core.database import Base, create_engine_from_url
+from api.core.security import get_current_user, require_admin
+from api.main import app
+from api.src.inventory.ledger import movement_writer
+from api.src.users.models import User, UserRole
+
+
+@pytest.fixture
+async def engine(monkeypatch):
+    """Engine on the configured database used by the app sessions."""
+    engine = create_engine_from_url(settings.DATABASE_URL)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(database, "async_session", factory)
+    monkeypatch.setattr(database, "async_read_session", factory)
+    yield engine
+    # Write what the app buffered and stop the flush task with the event loop
+    await movement_writer.stop()
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(engine):
+    """Session on the test engine."""
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def admin_client(engine):
+    """HTTP client for the app authenticated as an admin."""
+    admin = User(id=1, email="admin@example.com", role=UserRole.ADMIN)
+    app.dependency_overrides[get_current_user] = lambda: admin
+    app.dependency_overrides[require_admin] = lambda: admin
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+    app.dependency_overrides.clear()
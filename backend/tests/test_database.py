@@ -0,0 +1,32 @@
+from sqlalchemy import text
+
+from api.core.config import settings
+from api.core.database import create_engine_from_url, get_pool_stats
+from api.core.metrics import Histogram
+
+
+def test_histogram_buckets():
+    histogram = Histogram((1, 10, 100))
+    for value in (0.5, 5, 5, 50, 500):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_1": 1, "le_10": 2, "le_100": 1, "le_inf": 1}
+    assert snapshot["count"] == 5
+    assert snapshot["max"] == 500
+
+
+async def test_pool_stats_track_checkouts():
+    engine = create_engine_from_url(settings.DATABASE_URL)
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            stats = get_pool_stats(engine)
+            assert stats["checked_out"] == 1
+
+        stats = get_pool_stats(engine)
+        assert stats["checked_out"] == 0
+        assert stats["size"] == settings.DB_POOL_SIZE
+        assert stats["wait_time_ms"]["count"] >= 1
+    finally:
+        await engine.dispose()
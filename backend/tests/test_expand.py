@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import delete, event, insert, select
+
+from api.core.pagination import encode_cursor
+from api.src.companies.models import Company
+from api.src.inventory.models import InventoryItem
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000010"
+PRODUCTS = 50
+
+
+@pytest.fixture
+async def product_ids(session):
+    """Products of one company, each with an inventory item."""
+    await session.execute(
+        insert(Company),
+        [
+            {
+                "nit": COMPANY_NIT,
+                "name": "Expand",
+                "address": "Street",
+                "phone": "123",
+                "email": "expand@example.com",
+            }
+        ],
+    )
+    await session.execute(
+        insert(Product),
+        [
+            {
+                "code": f"EXPAND-{index}",
+                "name": "Product",
+                "characteristics": "Expand",
+                "prices": {"USD": index},
+                "company_nit": COMPANY_NIT,
+            }
+            for index in range(PRODUCTS)
+        ],
+    )
+    product_ids = (
+        await session.scalars(
+            select(Product.id)
+            .where(Product.company_nit == COMPANY_NIT)
+            .order_by(Product.id)
+        )
+    ).all()
+    await session.execute(
+        insert(InventoryItem),
+        [{"product_id": product_id, "quantity": 1} for product_id in product_ids],
+    )
+    await session.commit()
+
+    yield product_ids
+
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+async def count_selects(engine, request) -> tuple:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await request
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    return response, len([s for s in statements if s.lstrip().startswith("SELECT")])
+
+
+async def test_expand_inventory_page_in_bounded_queries(
+    admin_client, engine, product_ids
+):
+    first_item = await admin_client.get(f"/inventory/product/{product_ids[0]}")
+    after = first_item.json()[0]["id"] - 1
+
+    response, selects = await count_selects(
+        engine,
+        admin_client.get(
+            "/inventory",
+            params={
+                "expand": "product.company",
+                "limit": PRODUCTS,
+                "cursor": encode_cursor(after),
+            },
+        ),
+    )
+
+    assert response.status_code == 200
+    items = response.json()
+    assert len(items) == PRODUCTS
+    assert [item["product"]["id"] for item in items] == list(product_ids)
+    assert {item["product"]["company"]["nit"] for item in items} == {COMPANY_NIT}
+    assert selects <= 3
+
+
+async def test_unexpanded_relationships_are_omitted(admin_client, product_ids):
+    items = await admin_client.get(f"/inventory/product/{product_ids[0]}")
+    products = await admin_client.get(f"/products/company/{COMPANY_NIT}")
+    product = await admin_client.get(
+        f"/products/{product_ids[0]}", params={"expand": "company"}
+    )
+
+    assert "product" not in items.json()[0]
+    assert "company" not in products.json()[0]
+    assert product.json()["company"]["name"] == "Expand"
+
+
+async def test_inventory_item_detail_always_has_product(admin_client, product_ids):
+    items = await admin_client.get(f"/inventory/product/{product_ids[0]}")
+
+    response = await admin_client.get(f"/inventory/{items.json()[0]['id']}")
+
+    assert response.status_code == 200
+    assert response.json()["product"]["code"] == "EXPAND-0"
+    assert "company" not in response.json()["product"]
+
+
+async def test_unknown_expand_is_rejected(admin_client):
+    response = await admin_client.get("/inventory", params={"expand": "company"})
+
+    assert response.status_code == 400
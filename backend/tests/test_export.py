@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import delete, event, insert, select
+
+from api.src.companies.models import Company
+from api.src.inventory.models import InventoryItem
+from api.src.products.models import Product
+
+COMPANY_NITS = ["900000004", "900000005"]
+PRODUCTS = 2500
+
+
+@pytest.fixture
+async def catalog(session):
+    """Two companies, the first one with more products than a fetch batch."""
+    await session.execute(
+        insert(Company),
+        [
+            {
+                "nit": nit,
+                "name": nit,
+                "address": "Street",
+                "phone": "123",
+                "email": f"{nit}@example.com",
+            }
+            for nit in COMPANY_NITS
+        ],
+    )
+    await session.execute(
+        insert(Product),
+        [
+            {
+                "code": f"EXPORT-{nit}-{index}",
+                "name": "Product",
+                "characteristics": "Export",
+                "prices": {"USD": index},
+                "company_nit": nit,
+            }
+            for nit, count in zip(COMPANY_NITS, [PRODUCTS, 1])
+            for index in range(count)
+        ],
+    )
+    product_ids = (
+        await session.scalars(
+            select(Product.id).where(Product.company_nit.in_(COMPANY_NITS))
+        )
+    ).all()
+    await session.execute(
+        insert(InventoryItem),
+        [{"product_id": product_id, "quantity": 3} for product_id in product_ids],
+    )
+    await session.commit()
+
+    yield
+
+    await session.execute(delete(Company).where(Company.nit.in_(COMPANY_NITS)))
+    await session.commit()
+
+
+async def test_export_products_ndjson_single_query(admin_client, engine, catalog):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await admin_client.get(
+            "/products/export", params={"company_nit": COMPANY_NITS[0]}
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == PRODUCTS
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert rows[1]["prices"] == {"USD": 1.0}
+    assert len([s for s in statements if s.lstrip().startswith("SELECT")]) == 1
+
+
+async def test_export_inventory_csv(admin_client, catalog):
+    response = await admin_client.get(
+        "/inventory/export",
+        params={"company_nit": COMPANY_NITS[1], "format": "csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="inventory.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert set(rows[0]) == {"quantity", "product_id", "reorder_threshold", "id"}
+    assert rows[0]["quantity"] == "3"
+
+
+async def test_export_companies(admin_client, catalog):
+    response = await admin_client.get("/companies/export", params={"format": "csv"})
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert {"900000004", "900000005"} <= {row["nit"] for row in rows}
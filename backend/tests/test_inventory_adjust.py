@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete, select
+
+from api.src.companies.models import Company
+from api.src.inventory.models import InventoryItem
+from api.src.inventory.repository import InventoryRollupRepository
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000008"
+ADJUSTERS = 300
+
+
+@pytest.fixture
+async def inventory_ids(session):
+    company = Company(
+        nit=COMPANY_NIT,
+        name="Adjust",
+        address="Street 1",
+        phone="123",
+        email="adjust@example.com",
+    )
+    product = Product(
+        code="ADJUST-1",
+        name="Product",
+        characteristics="Adjust",
+        prices={"USD": 1},
+        company=company,
+    )
+    items = [InventoryItem(product=product, quantity=10) for _ in range(2)]
+    session.add_all([company, product, *items])
+    await InventoryRollupRepository(session).rebuild()
+    await session.commit()
+    yield [item.id for item in items]
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+async def quantity(session, inventory_id: int) -> int:
+    session.expire_all()
+    query = select(InventoryItem.quantity).where(InventoryItem.id == inventory_id)
+    return await session.scalar(query)
+
+
+async def test_adjust_applies_signed_delta(admin_client, inventory_ids):
+    response = await admin_client.post(
+        f"/inventory/{inventory_ids[0]}/adjust", json={"delta": -4}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 6
+
+
+async def test_adjust_non_negative_guard(admin_client, session, inventory_ids):
+    response = await admin_client.post(
+        f"/inventory/{inventory_ids[0]}/adjust", json={"delta": -11}
+    )
+    assert response.status_code == 409
+    assert await quantity(session, inventory_ids[0]) == 10
+
+    response = await admin_client.post(
+        f"/inventory/{inventory_ids[0]}/adjust",
+        json={"delta": -11, "non_negative": False},
+    )
+    assert response.json()["quantity"] == -1
+
+
+async def test_adjust_unknown_item(admin_client, inventory_ids):
+    response = await admin_client.post("/inventory/0/adjust", json={"delta": 1})
+
+    assert response.status_code == 404
+
+
+async def test_batch_adjust(admin_client, session, inventory_ids):
+    first, second = inventory_ids
+    response = await admin_client.post(
+        "/inventory/adjust",
+        json={
+            "adjustments": [
+                {"id": first, "delta": 5},
+                {"id": first, "delta": -2},
+                {"id": second, "delta": -20},
+                {"id": 0, "delta": 1},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(item["id"], item["quantity"]) for item in body["items"]] == [(first, 13)]
+    assert [row["id"] for row in body["rejected"]] == [0, second]
+    assert await quantity(session, second) == 10
+
+
+async def test_concurrent_adjusters_do_not_lose_updates(
+    admin_client, session, inventory_ids
+):
+    first, second = inventory_ids
+
+    async def adjust(index: int):
+        if index % 2:
+            return await admin_client.post(
+                f"/inventory/{first}/adjust", json={"delta": -1}
+            )
+        return await admin_client.post(
+            "/inventory/adjust",
+            json={
+                "adjustments": [{"id": second, "delta": 1}, {"id": first, "delta": 1}]
+            },
+        )
+
+    responses = await asyncio.gather(*[adjust(index) for index in range(ADJUSTERS)])
+
+    assert all(response.status_code in (200, 409) for response in responses)
+    decrements = sum(
+        1
+        for index, response in enumerate(responses)
+        if index % 2 and response.status_code == 200
+    )
+    increments = ADJUSTERS // 2
+    assert await quantity(session, first) == 10 + increments - decrements
+    assert await quantity(session, second) == 10 + increments
+    assert await InventoryRollupRepository(session).diff() == []
@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import delete, event, insert, select
+
+from api.src.companies.models import Company
+from api.src.inventory.models import InventoryItem
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000011"
+# (code, prices, quantity)
+STOCK = [
+    ("BYCO-A", {"USD": 10}, 3),
+    ("BYCO-B", {"USD": 1}, 50),
+    ("BYCO-C", {"EUR": 5}, 7),
+    ("BYCO-D", {"USD": 2.5}, 7),
+]
+
+
+@pytest.fixture
+async def company(session):
+    """A company whose products each have one inventory item."""
+    await session.execute(
+        insert(Company),
+        [
+            {
+                "nit": COMPANY_NIT,
+                "name": "By company",
+                "address": "Street",
+                "phone": "123",
+                "email": "bycompany@example.com",
+            }
+        ],
+    )
+    product_ids = (
+        await session.scalars(
+            insert(Product).returning(Product.id),
+            [
+                {
+                    "code": code,
+                    "name": "Product",
+                    "characteristics": "By company",
+                    "prices": prices,
+                    "company_nit": COMPANY_NIT,
+                }
+                for code, prices, _ in STOCK
+            ],
+        )
+    ).all()
+    await session.execute(
+        insert(InventoryItem),
+        [
+            {"product_id": product_id, "quantity": quantity}
+            for product_id, (_, _, quantity) in zip(product_ids, STOCK)
+        ],
+    )
+    await session.commit()
+
+    yield
+
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+def codes(response) -> list[str]:
+    return [item["product"]["code"] for item in response.json()]
+
+
+async def test_lists_items_with_products_in_one_query(admin_client, engine, company):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await admin_client.get(
+            f"/inventory/company/{COMPANY_NIT}",
+            params={"expand": "product.company"},
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert codes(response) == ["BYCO-A", "BYCO-B", "BYCO-C", "BYCO-D"]
+    assert response.json()[0]["product"]["company"]["nit"] == COMPANY_NIT
+    assert len([s for s in statements if s.lstrip().startswith("SELECT")]) == 1
+
+
+async def test_sorts_by_quantity_with_id_tiebreak(admin_client, company):
+    response = await admin_client.get(
+        f"/inventory/company/{COMPANY_NIT}",
+        params={"sort": "quantity", "order": "desc", "limit": 3},
+    )
+
+    assert codes(response) == ["BYCO-B", "BYCO-D", "BYCO-C"]
+    assert "company" not in response.json()[0]["product"]
+
+
+async def test_sorts_by_value_in_currency(admin_client, company):
+    response = await admin_client.get(
+        f"/inventory/company/{COMPANY_NIT}",
+        params={"sort": "value", "currency": "USD", "skip": 1},
+    )
+
+    # Values in USD: A=30, B=50, C=0 (no USD price), D=17.5
+    assert codes(response) == ["BYCO-D", "BYCO-A", "BYCO-B"]
+
+
+async def test_value_sort_requires_currency(admin_client, company):
+    response = await admin_client.get(
+        f"/inventory/company/{COMPANY_NIT}", params={"sort": "value"}
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,120 @@
+import io
+import json
+import tempfile
+import tracemalloc
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import delete, select
+
+from api.src.companies.models import Company
+from api.src.inventory.importer import import_inventory
+from api.src.inventory.models import InventoryItem
+from api.src.inventory.schemas import ImportFormat
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000003"
+
+
+@pytest.fixture
+async def inventory_ids(session):
+    company = Company(
+        nit=COMPANY_NIT,
+        name="Import",
+        address="Street 1",
+        phone="123",
+        email="import@example.com",
+    )
+    product = Product(
+        code="IMPORT-1",
+        name="Product",
+        characteristics="Import",
+        prices={"USD": 1},
+        company=company,
+    )
+    items = [InventoryItem(product=product, quantity=0) for _ in range(3)]
+    session.add_all([company, product, *items])
+    await session.commit()
+
+    yield [item.id for item in items]
+
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+async def quantities(session, ids: list[int]) -> list[int]:
+    session.expire_all()
+    query = select(InventoryItem.quantity).where(InventoryItem.id.in_(ids))
+    return list(await session.scalars(query.order_by(InventoryItem.id)))
+
+
+async def test_import_csv(admin_client, session, inventory_ids):
+    first, second, third = inventory_ids
+    content = "\n".join(
+        [
+            "id,quantity",
+            f"{first},10",
+            f"{second},-1",
+            f"{third},abc",
+            "0,5",
+            f"{third}",
+            f"{second},20",
+            f"{first},11",
+        ]
+    )
+
+    response = await admin_client.post(
+        "/inventory/import", files={"file": ("counts.csv", content, "text/csv")}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["accepted"], body["rejected"]) == (3, 4)
+    assert sorted(error["line"] for error in body["errors"]) == [3, 4, 5, 6]
+    assert await quantities(session, inventory_ids) == [11, 20, 0]
+
+
+async def test_import_ndjson(admin_client, session, inventory_ids):
+    content = "\n".join(
+        [
+            json.dumps({"id": inventory_id, "quantity": 7})
+            for inventory_id in inventory_ids
+        ]
+        + ["not json", "[1, 2]"]
+    )
+
+    response = await admin_client.post(
+        "/inventory/import",
+        files={"file": ("counts.ndjson", content, "application/x-ndjson")},
+    )
+
+    body = response.json()
+    assert (body["accepted"], body["rejected"]) == (3, 2)
+    assert await quantities(session, inventory_ids) == [7, 7, 7]
+
+
+async def test_import_memory_is_flat(session):
+    rows = 200_000
+    with tempfile.TemporaryFile() as file:
+        file.write(b"id,quantity\n")
+        for inventory_id in range(rows):
+            file.write(f"{-inventory_id - 1},1\n".encode())
+        file.seek(0)
+
+        tracemalloc.start()
+        try:
+            result = await import_inventory(session, UploadFile(file), ImportFormat.CSV)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert result.rejected == rows
+    assert len(result.errors) == 100
+    # The file is about 2.5 MB; the import only holds one batch of rows
+    assert peak < 2 * 1024 * 1024
+
+
+async def test_import_header_only(session):
+    upload = UploadFile(io.BytesIO(b"id,quantity\r\n"))
+    result = await import_inventory(session, upload, ImportFormat.CSV)
+    assert (result.accepted, result.rejected) == (0, 0)
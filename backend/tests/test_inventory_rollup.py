@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from api.src.companies.models import Company
+from api.src.inventory.repository import InventoryRepository, InventoryRollupRepository
+from api.src.inventory.schemas import InventoryItemUpdate
+from api.src.products.repository import ProductRepository
+from api.src.products.schemas import ProductUpdate
+
+COMPANY_NIT = "900000007"
+
+
+@pytest.fixture
+async def company(session):
+    session.add(
+        Company(
+            nit=COMPANY_NIT,
+            name="Rollup",
+            address="Street 1",
+            phone="123",
+            email="rollup@example.com",
+        )
+    )
+    await session.commit()
+    yield COMPANY_NIT
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+async def create_product(client, code: str, prices: dict) -> int:
+    response = await client.post(
+        "/products",
+        json={
+            "code": code,
+            "name": code,
+            "characteristics": "Rollup",
+            "prices": prices,
+            "company_nit": COMPANY_NIT,
+        },
+    )
+    return response.json()["id"]
+
+
+async def assert_consistent(session):
+    session.expire_all()
+    assert await InventoryRollupRepository(session).diff() == []
+
+
+async def test_rollup_follows_every_write(admin_client, session, company):
+    first = await create_product(admin_client, "ROLLUP-1", {"USD": 2, "EUR": 1.5})
+    second = await create_product(admin_client, "ROLLUP-2", {"USD": 10})
+
+    items = []
+    for product_id, quantity in [(first, 4), (first, 6), (second, 1)]:
+        response = await admin_client.post(
+            "/inventory", json={"product_id": product_id, "quantity": quantity}
+        )
+        items.append(response.json()["id"])
+    await assert_consistent(session)
+
+    await admin_client.put(f"/inventory/{items[0]}", json={"quantity": 9})
+    await assert_consistent(session)
+
+    await admin_client.delete(f"/inventory/{items[1]}")
+    await assert_consistent(session)
+
+    await admin_client.post(
+        "/inventory/import",
+        files={"file": ("counts.csv", f"id,quantity\n{items[2]},3", "text/csv")},
+    )
+    await assert_consistent(session)
+
+    await admin_client.put(f"/products/{first}", json={"prices": {"COP": 100}})
+    await assert_consistent(session)
+
+    await admin_client.post(
+        "/products/bulk",
+        json={
+            "products": [
+                {
+                    "code": "ROLLUP-2",
+                    "name": "Repriced",
+                    "characteristics": "Rollup",
+                    "prices": {"USD": 20, "EUR": 18},
+                    "company_nit": COMPANY_NIT,
+                }
+            ],
+            "on_conflict": "update",
+        },
+    )
+    await assert_consistent(session)
+
+    response = await admin_client.get(
+        "/inventory/summary", params={"company_nit": COMPANY_NIT}
+    )
+    assert response.json()[0]["items"] == 2
+    assert response.json()[0]["total_quantity"] == 12
+    assert response.json()[0]["total_values"] == {
+        "COP": 900.0,
+        "EUR": 54.0,
+        "USD": 60.0,
+    }
+
+    await admin_client.delete(f"/products/{second}")
+    await assert_consistent(session)
+
+
+async def test_rollup_consistent_under_concurrent_writes(
+    admin_client, engine, session, company
+):
+    product_id = await create_product(admin_client, "ROLLUP-3", {"USD": 1})
+    response = await admin_client.post(
+        "/inventory", json={"product_id": product_id, "quantity": 0}
+    )
+    inventory_id = response.json()["id"]
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def set_quantity(quantity: int):
+        async with factory() as writer:
+            await InventoryRepository(writer).update(
+                inventory_id, InventoryItemUpdate(quantity=quantity)
+            )
+
+    async def set_price(price: float):
+        async with factory() as writer:
+            await ProductRepository(writer).update(
+                product_id, ProductUpdate(prices={"USD": price})
+            )
+
+    await asyncio.gather(
+        *[set_quantity(quantity) for quantity in range(1, 21)],
+        *[set_price(price) for price in range(1, 6)],
+    )
+
+    await assert_consistent(session)
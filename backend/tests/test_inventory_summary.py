@@ -0,0 +1,159 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete
+
+from api.src.companies.models import Company
+from api.src.exchange_rates.cache import exchange_rates
+from api.src.exchange_rates.provider import ExchangeRateProvider
+from api.src.inventory.models import InventoryItem
+from api.src.inventory.pdf_generator import get_inventory_data
+from api.src.inventory.repository import InventoryRollupRepository
+from api.src.products.models import Product
+from api.src.products.repository import ProductRepository
+
+COMPANY_NIT = "900000006"
+
+
+@pytest.fixture
+async def stock(session):
+    company = Company(
+        nit=COMPANY_NIT,
+        name="Summary",
+        address="Street 1",
+        phone="123",
+        email="summary@example.com",
+    )
+    dual = Product(
+        code="SUMMARY-1",
+        name="Dual",
+        characteristics="Summary",
+        prices={"USD": 2.5, "EUR": 2},
+        company=company,
+    )
+    single = Product(
+        code="SUMMARY-2",
+        name="Single",
+        characteristics="Summary",
+        prices={"USD": 10},
+        company=company,
+    )
+    session.add_all(
+        [
+            company,
+            InventoryItem(product=dual, quantity=4),
+            InventoryItem(product=dual, quantity=6),
+            InventoryItem(product=single, quantity=1),
+        ]
+    )
+    await session.flush()
+    await ProductRepository(session).sync_prices([dual.id, single.id])
+    await InventoryRollupRepository(session).rebuild()
+    await session.commit()
+    yield
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+class StaticRates(ExchangeRateProvider):
+    """Provider returning fixed rates, counting the fetches."""
+
+    def __init__(self, rates: dict[str, Decimal] | None):
+        self.rates = rates
+        self.fetches = 0
+
+    async def fetch(self) -> dict[str, Decimal]:
+        self.fetches += 1
+        if self.rates is None:
+            raise ConnectionError("provider down")
+        return self.rates
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    provider = StaticRates({"USD": Decimal(1), "EUR": Decimal("1.25")})
+    monkeypatch.setattr(exchange_rates, "provider", provider)
+    exchange_rates.clear()
+    yield provider
+    exchange_rates.clear()
+
+
+async def test_summary_by_company(admin_client, stock):
+    response = await admin_client.get(
+        "/inventory/summary", params={"company_nit": COMPANY_NIT}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "company_nit": COMPANY_NIT,
+            "company_name": "Summary",
+            "currency": None,
+            "items": 3,
+            "total_quantity": 11,
+            "total_values": {"EUR": 20.0, "USD": 35.0},
+            "converted_currency": None,
+            "converted_value": None,
+        }
+    ]
+
+
+async def test_summary_by_currency(admin_client, stock):
+    response = await admin_client.get(
+        "/inventory/summary",
+        params={"company_nit": COMPANY_NIT, "by_currency": True},
+    )
+
+    rows = {row["currency"]: row for row in response.json()}
+    assert (rows["EUR"]["items"], rows["EUR"]["total_quantity"]) == (2, 10)
+    assert rows["EUR"]["total_values"] == {"EUR": 20.0}
+    assert (rows["USD"]["items"], rows["USD"]["total_quantity"]) == (3, 11)
+    assert rows["USD"]["total_values"] == {"USD": 35.0}
+
+
+async def test_summary_converts_each_item_once(admin_client, stock, rates):
+    values = {}
+    for currency in ("USD", "EUR"):
+        response = await admin_client.get(
+            "/inventory/summary",
+            params={"company_nit": COMPANY_NIT, "convert_to": currency},
+        )
+        values[currency] = response.json()[0]["converted_value"]
+
+    # The dual priced product counts at its own price, the USD only product
+    # at 10 USD = 8 EUR
+    assert values == {"USD": 35.0, "EUR": 28.0}
+    assert rates.fetches == 1
+
+
+async def test_summary_rejects_unknown_currency(admin_client, stock, rates):
+    unknown = await admin_client.get("/inventory/summary", params={"convert_to": "JPY"})
+    grouped = await admin_client.get(
+        "/inventory/summary", params={"convert_to": "EUR", "by_currency": True}
+    )
+
+    assert unknown.status_code == 400
+    assert grouped.status_code == 400
+
+
+async def test_provider_failure_uses_stored_rates(session, stock, rates):
+    await exchange_rates.refresh()
+    rates.rates = None
+    exchange_rates.clear()
+
+    assert (await exchange_rates.get_rates())["EUR"] == Decimal("1.25")
+    await exchange_rates.get_rates()
+    assert rates.fetches == 3
+
+
+async def test_report_rows_are_valued_in_sql(session, stock, rates):
+    await exchange_rates.require("EUR")
+
+    rows = await get_inventory_data(session, COMPANY_NIT, "EUR")
+
+    values = [(row["product_code"], row["price"], row["total_value"]) for row in rows]
+    assert sorted(values) == [
+        ("SUMMARY-1", "EUR 2.00", "EUR 12.00"),
+        ("SUMMARY-1", "EUR 2.00", "EUR 8.00"),
+        ("SUMMARY-2", "EUR 8.00", "EUR 8.00"),
+    ]
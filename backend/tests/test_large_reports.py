@@ -0,0 +1,134 @@
+import tracemalloc
+
+import pytest
+from pypdf import PdfReader
+from sqlalchemy import delete, text
+
+from api.src.companies.models import Company
+from api.src.inventory.pdf_generator import (
+    REPORT_STYLESHEET,
+    REPORT_TEMPLATE,
+    stream_inventory_chunks,
+)
+from api.src.inventory.rendering import merge_pdfs, report_templates
+
+SMALL_NIT = "900000017"
+LARGE_NIT = "900000018"
+CHUNK_ROWS = 500
+
+SEED_SQL = text(
+    """
+    WITH products AS (
+        INSERT INTO products (code, name, characteristics, prices, company_nit)
+        SELECT 'LARGE-' || :nit || '-' || i, 'Product ' || i, 'Large report',
+               '{"USD": 10}', :nit
+        FROM generate_series(1, :count) AS i
+        RETURNING id
+    )
+    INSERT INTO inventory (product_id, quantity)
+    SELECT id, 1 FROM products
+    """
+)
+
+
+@pytest.fixture
+async def companies(session):
+    """A company with a few items and one with ten times as many."""
+    for nit, count in ((SMALL_NIT, 2000), (LARGE_NIT, 20000)):
+        session.add(Company(nit=nit, name="Large", address="Street 1", phone="123"))
+        await session.flush()
+        await session.execute(SEED_SQL, {"nit": nit, "count": count})
+    await session.commit()
+    yield
+    await session.execute(
+        delete(Company).where(Company.nit.in_([SMALL_NIT, LARGE_NIT]))
+    )
+    await session.commit()
+
+
+async def render_report(session, nit: str, directory) -> tuple[int, int]:
+    """Render a report chunk by chunk and merge the chunks, all in-process.
+
+    Returns:
+        tuple[int, int]: Number of rows and peak traced memory in bytes
+    """
+    tracemalloc.start()
+    try:
+        rows, page_offset, paths = 0, 0, []
+        async for chunk, last in stream_inventory_chunks(
+            session, nit, "USD", CHUNK_ROWS
+        ):
+            rows += len(chunk)
+            html_content = report_templates.render_html(
+                REPORT_TEMPLATE,
+                {
+                    "inventory_data": chunk,
+                    "first_chunk": not paths,
+                    "last_chunk": last,
+                    "page_offset": page_offset,
+                },
+            )
+            path = str(directory / f"{nit}-{len(paths)}.pdf")
+            page_offset += report_templates.write_pdf_chunk(
+                html_content, path, REPORT_STYLESHEET
+            )
+            paths.append(path)
+        merge_pdfs(paths, str(directory / f"{nit}.pdf"))
+        return rows, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def test_streamed_report_memory_does_not_grow_with_rows(
+    session, companies, tmp_path
+):
+    # Warm up the statement, template and stylesheet caches
+    await render_report(session, SMALL_NIT, tmp_path)
+    small_rows, small_peak = await render_report(session, SMALL_NIT, tmp_path)
+    large_rows, large_peak = await render_report(session, LARGE_NIT, tmp_path)
+
+    assert (small_rows, large_rows) == (2000, 20000)
+    assert len(PdfReader(tmp_path / f"{LARGE_NIT}.pdf").pages) > len(
+        PdfReader(tmp_path / f"{SMALL_NIT}.pdf").pages
+    )
+    assert large_peak < small_peak * 1.5
+
+
+async def test_only_the_last_chunk_is_marked_last(session, companies):
+    chunks = [
+        (len(rows), last)
+        async for rows, last in stream_inventory_chunks(session, SMALL_NIT, "USD", 800)
+    ]
+
+    assert chunks == [(800, False), (800, False), (400, True)]
+
+
+def test_merge_concatenates_rendered_chunks(tmp_path):
+    # Chunks rendered by WeasyPrint, as the render pool writes them
+    page_offset, paths = 0, []
+    for index, codes in enumerate((range(0, 60), range(60, 150))):
+        html_content = report_templates.render_html(
+            REPORT_TEMPLATE,
+            {
+                "title": "Inventory Report",
+                "inventory_data": [
+                    {"product_code": f"CODE-{code}", "quantity": 1} for code in codes
+                ],
+                "first_chunk": index == 0,
+                "last_chunk": index == 1,
+                "page_offset": page_offset,
+            },
+        )
+        path = str(tmp_path / f"{index}.pdf")
+        page_offset += report_templates.write_pdf_chunk(
+            html_content, path, REPORT_STYLESHEET
+        )
+        paths.append(path)
+
+    merge_pdfs(paths, str(tmp_path / "merged.pdf"))
+
+    merged = PdfReader(tmp_path / "merged.pdf")
+    assert len(merged.pages) == page_offset > 2
+    assert merged.metadata.title == "Inventory Report"
+    text = "".join(page.extract_text() for page in merged.pages)
+    assert text.index("CODE-0") < text.index("CODE-59") < text.index("CODE-149")
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import delete
+
+from api.src.companies.models import Company
+from api.src.inventory.alerts import low_stock_notifier
+from api.src.inventory.models import InventoryItem
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000012"
+
+
+@pytest.fixture
+async def items(session):
+    """Items with quantities 10, 3 and 8 and reorder thresholds 5, 5 and none."""
+    company = Company(
+        nit=COMPANY_NIT,
+        name="Low stock",
+        address="Street 1",
+        phone="123",
+        email="lowstock@example.com",
+    )
+    product = Product(
+        code="LOWSTOCK-1",
+        name="Product",
+        characteristics="Low stock",
+        prices={"USD": 1},
+        company=company,
+    )
+    items = [
+        InventoryItem(product=product, quantity=10, reorder_threshold=5),
+        InventoryItem(product=product, quantity=3, reorder_threshold=5),
+        InventoryItem(product=product, quantity=8),
+    ]
+    session.add_all([company, product, *items])
+    await session.commit()
+    yield [item.id for item in items]
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+@pytest.fixture
+def alerts():
+    received = []
+    low_stock_notifier.subscribe(received.append)
+    yield received
+    low_stock_notifier.unsubscribe(received.append)
+
+
+async def test_low_stock_lists_items_at_or_below_threshold(admin_client, items):
+    response = await admin_client.get(
+        "/inventory/low-stock",
+        params={"company_nit": COMPANY_NIT, "expand": "product"},
+    )
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [items[1]]
+    assert response.json()[0]["product"]["code"] == "LOWSTOCK-1"
+
+
+async def test_update_crossing_threshold_notifies_once(admin_client, items, alerts):
+    first, low, untracked = items
+
+    await admin_client.put(f"/inventory/{first}", json={"quantity": 6})
+    await admin_client.put(f"/inventory/{first}", json={"quantity": 5})
+    await admin_client.put(f"/inventory/{first}", json={"quantity": 2})
+    await admin_client.put(f"/inventory/{low}", json={"quantity": 1})
+    await admin_client.put(f"/inventory/{untracked}", json={"quantity": 0})
+
+    assert [(a.inventory_id, a.quantity, a.reorder_threshold) for a in alerts] == [
+        (first, 5, 5)
+    ]
+
+
+async def test_raising_threshold_above_quantity_notifies(admin_client, items, alerts):
+    response = await admin_client.put(
+        f"/inventory/{items[2]}", json={"reorder_threshold": 8}
+    )
+
+    assert response.json()["reorder_threshold"] == 8
+    assert [alert.inventory_id for alert in alerts] == [items[2]]
+
+
+async def test_adjustments_crossing_threshold_notify(admin_client, items, alerts):
+    first, low, _ = items
+
+    await admin_client.post(f"/inventory/{first}/adjust", json={"delta": -4})
+    await admin_client.post(
+        "/inventory/adjust",
+        json={"adjustments": [{"id": first, "delta": -1}, {"id": low, "delta": 5}]},
+    )
+    await admin_client.post(f"/inventory/{low}/adjust", json={"delta": -3})
+
+    assert [(a.inventory_id, a.quantity) for a in alerts] == [(first, 5), (low, 5)]
+
+
+async def test_failing_handler_does_not_break_writes(admin_client, items, alerts):
+    def broken(alert):
+        raise RuntimeError("boom")
+
+    low_stock_notifier.subscribe(broken)
+    try:
+        response = await admin_client.post(
+            f"/inventory/{items[0]}/adjust", json={"delta": -5}
+        )
+    finally:
+        low_stock_notifier.unsubscribe(broken)
+
+    assert response.status_code == 200
+    assert len(alerts) == 1
@@ -1,6 +1,8 @@
 from fastapi.testclient import TestClient
 
+from api.core.security import require_admin
 from api.main import app
+from api.src.users.models import User, UserRole
 
 client = TestClient(app)
 
@@ -9,3 +11,19 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_metrics_require_authentication():
+    response = client.get("/metrics")
+    assert response.status_code == 401
+
+
+def test_metrics():
+    admin = User(id=1, email="admin@example.com", role=UserRole.ADMIN)
+    app.dependency_overrides[require_admin] = lambda: admin
+    try:
+        response = client.get("/metrics")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert "primary" in response.json()["database"]
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import delete
+
+from api.core.exceptions import BadRequestException
+from api.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from api.src.companies.models import Company
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000001"
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+    assert decode_cursor(encode_cursor("900000001"), str) == "900000001"
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("42")])
+def test_invalid_cursor(cursor):
+    with pytest.raises(BadRequestException):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+async def products(session):
+    session.add(
+        Company(
+            nit=COMPANY_NIT,
+            name="Paging",
+            address="Street 1",
+            phone="123",
+            email="paging@example.com",
+        )
+    )
+    products = [
+        Product(
+            code=f"PAGING-{index}",
+            name=f"Product {index}",
+            characteristics="Paging",
+            prices={"USD": index},
+            company_nit=COMPANY_NIT,
+        )
+        for index in range(5)
+    ]
+    session.add_all(products)
+    await session.commit()
+
+    yield [product.id for product in products]
+
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+async def test_walk_pages_with_cursor(admin_client, products):
+    seen, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await admin_client.get(
+            f"/products/company/{COMPANY_NIT}", params=params
+        )
+        assert response.status_code == 200
+        seen.extend(product["id"] for product in response.json())
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert seen == sorted(products)
+
+
+async def test_invalid_cursor_is_bad_request(admin_client):
+    response = await admin_client.get("/products", params={"cursor": "garbage"})
+    assert response.status_code == 400
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import delete
+
+from api.src.companies.models import Company
+
+COMPANY_NIT = "900000013"
+
+
+@pytest.fixture
+async def company(session):
+    session.add(
+        Company(
+            nit=COMPANY_NIT,
+            name="Prices",
+            address="Street 1",
+            phone="123",
+            email="prices@example.com",
+        )
+    )
+    await session.commit()
+    yield COMPANY_NIT
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+def product(code: str, prices: dict) -> dict:
+    return {
+        "code": code,
+        "name": code,
+        "characteristics": "Prices",
+        "prices": prices,
+        "company_nit": COMPANY_NIT,
+    }
+
+
+async def by_price(client, **params) -> list[str]:
+    response = await client.get(
+        "/products/by-price", params={"company_nit": COMPANY_NIT, **params}
+    )
+    assert response.status_code == 200
+    return [row["code"] for row in response.json()]
+
+
+async def test_filters_and_sorts_by_price(admin_client, company):
+    await admin_client.post("/products", json=product("PRICE-A", {"USD": 40}))
+    await admin_client.post(
+        "/products/bulk",
+        json={
+            "products": [
+                product("PRICE-B", {"USD": 60, "EUR": 55}),
+                product("PRICE-C", {"EUR": 20}),
+                product("PRICE-D", {"USD": 10.5}),
+            ]
+        },
+    )
+
+    assert await by_price(admin_client, currency="USD", max_price=50) == [
+        "PRICE-D",
+        "PRICE-A",
+    ]
+    assert await by_price(admin_client, currency="EUR", order="desc") == [
+        "PRICE-B",
+        "PRICE-C",
+    ]
+    assert await by_price(admin_client, currency="COP") == []
+
+
+async def test_price_changes_are_reflected(admin_client, company):
+    created = await admin_client.post("/products", json=product("PRICE-E", {"USD": 5}))
+    await admin_client.post("/products", json=product("PRICE-F", {"USD": 7}))
+
+    await admin_client.put(
+        f"/products/{created.json()['id']}", json={"prices": {"EUR": 1}}
+    )
+    await admin_client.post(
+        "/products/bulk",
+        json={
+            "products": [product("PRICE-F", {"USD": 100})],
+            "on_conflict": "update",
+        },
+    )
+
+    assert await by_price(admin_client, currency="USD", min_price=50) == ["PRICE-F"]
+    assert await by_price(admin_client, currency="EUR") == ["PRICE-E"]
+    assert await by_price(admin_client, currency="USD", max_price=10) == []
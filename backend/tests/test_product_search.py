@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import delete, insert, text
+
+from api.src.companies.models import Company
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000014"
+# (name, characteristics)
+CATALOG = [
+    ("Wireless Mouse", "Ergonomic optical sensor"),
+    ("Mechanical Keyboard", "Wireless, hot swappable switches"),
+    ("Mouse Pad", "Cloth surface"),
+    ("Monitor Stand", "Adjustable aluminium arm"),
+]
+
+
+@pytest.fixture
+async def catalog(session):
+    session.add(
+        Company(
+            nit=COMPANY_NIT,
+            name="Search",
+            address="Street 1",
+            phone="123",
+            email="search@example.com",
+        )
+    )
+    await session.flush()
+    await session.execute(
+        insert(Product),
+        [
+            {
+                "code": f"SEARCH-{index}",
+                "name": name,
+                "characteristics": characteristics,
+                "prices": {"USD": 1},
+                "company_nit": COMPANY_NIT,
+            }
+            for index, (name, characteristics) in enumerate(CATALOG)
+        ],
+    )
+    await session.commit()
+    yield
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+async def search(client, q: str, **params) -> list[str]:
+    response = await client.get(
+        "/products/search", params={"q": q, "company_nit": COMPANY_NIT, **params}
+    )
+    assert response.status_code == 200
+    return [product["name"] for product in response.json()]
+
+
+async def test_prefix_words_match(admin_client, catalog):
+    assert sorted(await search(admin_client, "mou")) == ["Mouse Pad", "Wireless Mouse"]
+    assert await search(admin_client, "mouse ergo") == ["Wireless Mouse"]
+    assert await search(admin_client, "keyboard !&|") == ["Mechanical Keyboard"]
+
+
+async def test_name_matches_rank_above_characteristics(admin_client, catalog):
+    assert await search(admin_client, "wireless") == [
+        "Wireless Mouse",
+        "Mechanical Keyboard",
+    ]
+
+
+async def test_results_are_paginated(admin_client, catalog):
+    first = await search(admin_client, "wireless", limit=1)
+    second = await search(admin_client, "wireless", limit=1, skip=1)
+
+    assert first + second == ["Wireless Mouse", "Mechanical Keyboard"]
+
+
+async def test_short_words_match_whole_words(admin_client, catalog):
+    assert await search(admin_client, "mo") == []
+    assert await search(admin_client, "mouse pad") == ["Mouse Pad"]
+
+
+async def test_every_match_is_ranked_and_reachable(admin_client, session, catalog):
+    # Many more matches than a page, with the best one inserted last
+    await session.execute(
+        insert(Product),
+        [
+            {
+                "code": f"SEARCH-BULK-{index}",
+                "name": f"Cable {index}",
+                "characteristics": "Gadget accessory",
+                "prices": {"USD": 1},
+                "company_nit": COMPANY_NIT,
+            }
+            for index in range(1500)
+        ]
+        + [
+            {
+                "code": "SEARCH-BEST",
+                "name": "Gadget",
+                "characteristics": "Gadget",
+                "prices": {"USD": 1},
+                "company_nit": COMPANY_NIT,
+            }
+        ],
+    )
+    await session.commit()
+
+    assert (await search(admin_client, "gadget", limit=1)) == ["Gadget"]
+    assert len(await search(admin_client, "gadget", skip=1480, limit=100)) == 21
+
+
+async def test_typos_match_with_trigrams(admin_client, session, catalog):
+    installed = await session.scalar(
+        text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+    )
+    if not installed:
+        pytest.skip("pg_trgm is not installed")
+
+    assert "Mechanical Keyboard" in await search(admin_client, "keybaord")
+
+
+async def test_blank_query_is_rejected(admin_client):
+    response = await admin_client.get("/products/search", params={"q": ""})
+
+    assert response.status_code == 422
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import delete, select
+
+from api.src.companies.models import Company
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000002"
+
+
+@pytest.fixture
+async def company(session):
+    session.add(
+        Company(
+            nit=COMPANY_NIT,
+            name="Bulk",
+            address="Street 1",
+            phone="123",
+            email="bulk@example.com",
+        )
+    )
+    await session.commit()
+    yield COMPANY_NIT
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+def product(code: str, name: str = "Product", company_nit: str = COMPANY_NIT):
+    return {
+        "code": code,
+        "name": name,
+        "characteristics": "Bulk",
+        "prices": {"USD": 1.5},
+        "company_nit": company_nit,
+    }
+
+
+async def test_bulk_create_reports_each_row(admin_client, company):
+    response = await admin_client.post(
+        "/products/bulk",
+        json={
+            "products": [
+                product("BULK-1"),
+                product("BULK-2"),
+                product("BULK-1"),
+                product("BULK-3", company_nit="000000000"),
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["rejected"]) == (2, 2)
+    assert [row["status"] for row in body["results"]] == [
+        "created",
+        "created",
+        "rejected",
+        "rejected",
+    ]
+
+
+@pytest.mark.parametrize(
+    "on_conflict, status, name",
+    [("skip", "skipped", "Original"), ("update", "updated", "Renamed")],
+)
+async def test_bulk_conflict_strategies(
+    admin_client, session, company, on_conflict, status, name
+):
+    await admin_client.post(
+        "/products/bulk", json={"products": [product("BULK-1", "Original")]}
+    )
+
+    response = await admin_client.post(
+        "/products/bulk",
+        json={
+            "products": [product("BULK-1", "Renamed"), product("BULK-2")],
+            "on_conflict": on_conflict,
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [row["status"] for row in results] == [status, "created"]
+    stored = await session.scalar(select(Product.name).where(Product.code == "BULK-1"))
+    assert stored == name
+
+
+async def test_bulk_conflict_error_rolls_back(admin_client, session, company):
+    await admin_client.post("/products/bulk", json={"products": [product("BULK-1")]})
+
+    response = await admin_client.post(
+        "/products/bulk",
+        json={"products": [product("BULK-2"), product("BULK-1")]},
+    )
+
+    assert response.status_code == 409
+    assert "BULK-1" in response.json()["detail"]
+    created = await session.scalar(select(Product.id).where(Product.code == "BULK-2"))
+    assert created is None
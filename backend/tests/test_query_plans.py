@@ -0,0 +1,222 @@
+"""Query plan regression suite.
+
+Every repository query runs against a seeded dataset and is EXPLAINed; a query
+that falls back to a sequential scan fails the test. Seeding and the captured
+queries run inside a transaction that is rolled back at the end.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.exceptions import NotFoundException
+from api.src.companies.models import Company
+from api.src.companies.repository import CompanyRepository
+from api.src.exchange_rates.repository import ExchangeRateRepository
+from api.src.inventory.models import InventoryItem
+from api.src.inventory.pdf_generator import get_inventory_data
+from api.src.inventory.repository import (
+    InventoryRepository,
+    InventoryRollupRepository,
+    StockLedgerRepository,
+)
+from api.src.inventory.schemas import InventorySort
+from api.src.products.models import Product
+from api.src.products.repository import ProductRepository
+
+COMPANIES = 2000
+PRODUCTS_PER_COMPANY = 10
+NIT_OFFSET = 800000000
+# Tables (and catalogs) of a few rows, which are always cheapest to scan
+LOOKUP_TABLES = {"exchange_rates", "pg_extension"}
+
+# Repository calls to check, given the id of a product in the middle of the data
+REPOSITORY_QUERIES = {
+    "companies.get_by_nit": lambda s, nit, pid: CompanyRepository(s).get_by_nit(nit),
+    "companies.get_all": lambda s, nit, pid: CompanyRepository(s).get_all(),
+    "companies.get_all.after": lambda s, nit, pid: CompanyRepository(s).get_all(
+        after=nit
+    ),
+    "companies.delete": lambda s, nit, pid: CompanyRepository(s).delete(nit),
+    "companies.get_data_version": lambda s, nit, pid: CompanyRepository(
+        s
+    ).get_data_version(nit),
+    "companies.touch_products": lambda s, nit, pid: CompanyRepository(s).touch_products(
+        [pid, pid + 1]
+    ),
+    "products.get_by_id": lambda s, nit, pid: ProductRepository(s).get_by_id(pid),
+    "products.get_by_code": lambda s, nit, pid: ProductRepository(s).get_by_code(
+        f"PLAN-{nit}-0"
+    ),
+    "products.get_all": lambda s, nit, pid: ProductRepository(s).get_all(),
+    "products.get_all.after": lambda s, nit, pid: ProductRepository(s).get_all(
+        after=pid
+    ),
+    "products.get_by_company_nit": lambda s, nit, pid: ProductRepository(
+        s
+    ).get_by_company_nit(nit, after=pid),
+    "inventory.get_by_id": lambda s, nit, pid: InventoryRepository(s).get_by_id(pid),
+    "inventory.get_all": lambda s, nit, pid: InventoryRepository(s).get_all(after=pid),
+    "inventory.get_by_product_id": lambda s, nit, pid: InventoryRepository(
+        s
+    ).get_by_product_id(pid),
+    "inventory.get_by_company_nit": lambda s, nit, pid: InventoryRepository(
+        s
+    ).get_by_company_nit(nit, sort=InventorySort.VALUE, currency="USD"),
+    "inventory.get_low_stock": lambda s, nit, pid: InventoryRepository(
+        s
+    ).get_low_stock(),
+    "inventory.get_low_stock.company": lambda s, nit, pid: InventoryRepository(
+        s
+    ).get_low_stock(nit, after=pid),
+    "inventory.set_quantities": lambda s, nit, pid: InventoryRepository(
+        s
+    ).set_quantities({pid: 5, pid + 1: 6}),
+    "inventory.adjust": lambda s, nit, pid: InventoryRepository(s).adjust(pid, 1),
+    "inventory.adjust_many": lambda s, nit, pid: InventoryRepository(s).adjust_many(
+        {pid: 1, pid + 1: -1}
+    ),
+    "products.get_by_price": lambda s, nit, pid: ProductRepository(s).get_by_price(
+        "USD", min_price=3, max_price=4
+    ),
+    "products.search": lambda s, nit, pid: ProductRepository(s).search("missing words"),
+    "products.stream_all": lambda s, nit, pid: ProductRepository(s).stream_all(nit),
+    "inventory.stream_all": lambda s, nit, pid: InventoryRepository(s).stream_all(nit),
+    "inventory.get_summary": lambda s, nit, pid: InventoryRepository(s).get_summary(
+        nit
+    ),
+    "ledger.get_movements": lambda s, nit, pid: StockLedgerRepository(s).get_movements(
+        pid, after=pid
+    ),
+    "ledger.get_quantity_as_of": lambda s, nit, pid: StockLedgerRepository(
+        s
+    ).get_quantity_as_of(pid, datetime.now(timezone.utc)),
+    "inventory.get_converted_totals": lambda s, nit, pid: InventoryRepository(
+        s
+    ).get_converted_totals("EUR", nit),
+    "inventory.report": lambda s, nit, pid: get_inventory_data(s, nit, "EUR"),
+}
+
+
+def sequential_scans(plan: dict) -> list[str]:
+    """Return the relations read with a sequential scan anywhere in a plan."""
+    scans = []
+    if plan.get("Node Type") == "Seq Scan" and (
+        plan["Relation Name"] not in LOOKUP_TABLES
+    ):
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans.extend(sequential_scans(child))
+    return scans
+
+
+@pytest.fixture
+async def seeded_connection(engine):
+    """Connection inside a rolled back transaction with a seeded dataset.
+
+    Yields the connection with a company NIT and product id from the middle of
+    the data.
+    """
+    if engine.dialect.name != "postgresql":
+        pytest.skip("Query plan checks require PostgreSQL")
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        nits = [str(NIT_OFFSET + index) for index in range(COMPANIES)]
+        await connection.execute(
+            insert(Company),
+            [
+                {"nit": nit, "name": nit, "address": "Street", "phone": "123"}
+                for nit in nits
+            ],
+        )
+        product_ids = (
+            (
+                await connection.execute(
+                    insert(Product).returning(Product.id),
+                    [
+                        {
+                            "code": f"PLAN-{nit}-{index}",
+                            "name": "Product",
+                            "characteristics": "Seeded",
+                            "prices": {"USD": index},
+                            "company_nit": nit,
+                        }
+                        for nit in nits
+                        for index in range(PRODUCTS_PER_COMPANY)
+                    ],
+                )
+            )
+            .scalars()
+            .all()
+        )
+        await connection.execute(
+            insert(InventoryItem),
+            [
+                # A few items sit below their reorder threshold
+                {
+                    "product_id": product_id,
+                    "quantity": 1,
+                    "reorder_threshold": 5 if index % 100 == 0 else None,
+                }
+                for index, product_id in enumerate(product_ids)
+            ],
+        )
+        seeder = AsyncSession(bind=connection, join_transaction_mode="create_savepoint")
+        await ExchangeRateRepository(seeder).upsert({"USD": 1, "EUR": 1.08})
+        await InventoryRollupRepository(seeder).rebuild()
+        await ProductRepository(seeder).sync_prices(product_ids)
+        await seeder.commit()
+        # A compacted day of stock for every item
+        await connection.execute(
+            text(
+                "INSERT INTO stock_snapshots (inventory_id, day, quantity) "
+                "SELECT id, current_date - 1, quantity FROM inventory"
+            )
+        )
+        await connection.execute(
+            text(
+                "ANALYZE companies, products, product_prices, inventory, "
+                "inventory_rollups, stock_snapshots"
+            )
+        )
+
+        yield connection, nits[COMPANIES // 2], product_ids[len(product_ids) // 2]
+        await transaction.rollback()
+
+
+@pytest.mark.parametrize("name", REPOSITORY_QUERIES)
+async def test_repository_query_uses_indexes(seeded_connection, name):
+    connection, nit, product_id = seeded_connection
+    session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint")
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            if executemany:
+                parameters = parameters[0]
+            statements.append((statement, parameters))
+
+    sync_connection = connection.sync_connection
+    event.listen(sync_connection, "before_cursor_execute", capture)
+    try:
+        await REPOSITORY_QUERIES[name](session, nit, product_id)
+    except NotFoundException:
+        # Ids need not exist, only the emitted queries matter
+        pass
+    finally:
+        event.remove(sync_connection, "before_cursor_execute", capture)
+        await session.close()
+
+    assert statements, f"{name} did not run any query"
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar()[0]["Plan"]
+        assert not sequential_scans(
+            plan
+        ), f"{name} uses a sequential scan:\n{statement}"
@@ -0,0 +1,119 @@
+import json
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from api.core import database
+from api.core.database import (
+    READ_PRIMARY_COOKIE,
+    READ_PRIMARY_HEADER,
+    Base,
+    create_engine_from_url,
+)
+from api.core.security import get_current_user, require_admin
+from api.main import app
+from api.src.companies.models import Company
+from api.src.users.models import User, UserRole
+
+
+@pytest.fixture
+async def primary_and_replica(tmp_path, monkeypatch):
+    """Two SQLite databases standing in for the primary and its replica."""
+    engines = {
+        name: create_engine_from_url(f"sqlite+aiosqlite:///{tmp_path}/{name}.db")
+        for name in ("primary", "replica")
+    }
+    factories = {}
+    for nit, (name, engine) in zip(("100000001", "200000002"), engines.items()):
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        factories[name] = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with factories[name]() as session:
+            session.add(
+                Company(
+                    nit=nit,
+                    name=name,
+                    address="Street 1",
+                    phone="123",
+                    email=f"{name}@example.com",
+                )
+            )
+            await session.commit()
+
+    monkeypatch.setattr(database, "async_session", factories["primary"])
+    monkeypatch.setattr(database, "async_read_session", factories["replica"])
+    admin = User(id=1, email="admin@example.com", role=UserRole.ADMIN)
+    app.dependency_overrides[get_current_user] = lambda: admin
+    app.dependency_overrides[require_admin] = lambda: admin
+    yield
+    app.dependency_overrides.clear()
+    for engine in engines.values():
+        await engine.dispose()
+
+
+@pytest.fixture
+async def client(primary_and_replica):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+def company_names(response) -> list[str]:
+    assert response.status_code == 200
+    return [company["name"] for company in response.json()]
+
+
+async def test_get_routes_read_from_replica(client: AsyncClient):
+    response = await client.get("/companies")
+    assert company_names(response) == ["replica"]
+
+
+async def test_header_forces_primary(client: AsyncClient):
+    response = await client.get("/companies", headers={READ_PRIMARY_HEADER: "1"})
+    assert company_names(response) == ["primary"]
+
+
+async def test_reads_follow_writes_to_primary(client: AsyncClient):
+    response = await client.post(
+        "/companies",
+        json={
+            "nit": "123456789",
+            "name": "new",
+            "address": "Street 2",
+            "phone": "456",
+            "email": "new@example.com",
+        },
+    )
+    assert response.status_code == 201
+    assert READ_PRIMARY_COOKIE in response.cookies
+
+    # The client now carries the cookie, so it reads its own write
+    response = await client.get("/companies")
+    assert sorted(company_names(response)) == ["new", "primary"]
+
+    client.cookies.clear()
+    response = await client.get("/companies")
+    assert company_names(response) == ["replica"]
+
+
+def exported_names(response) -> list[str]:
+    assert response.status_code == 200
+    return [json.loads(line)["name"] for line in response.text.splitlines()]
+
+
+async def test_exports_follow_read_routing(client: AsyncClient):
+    response = await client.get("/companies/export")
+    assert exported_names(response) == ["replica"]
+
+    response = await client.get("/companies/export", headers={READ_PRIMARY_HEADER: "1"})
+    assert exported_names(response) == ["primary"]
+
+    client.cookies.set(READ_PRIMARY_COOKIE, str(time.time() + 60))
+    response = await client.get("/companies/export")
+    assert exported_names(response) == ["primary"]
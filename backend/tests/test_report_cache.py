@@ -0,0 +1,131 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete
+
+from api.src.companies.models import Company
+from api.src.exchange_rates.cache import exchange_rates
+from api.src.inventory import pdf_generator
+from api.src.inventory.models import InventoryItem
+from api.src.inventory.report_cache import ReportCache
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000016"
+
+
+@pytest.fixture
+async def item(session):
+    company = Company(
+        nit=COMPANY_NIT,
+        name="Cached",
+        address="Street 1",
+        phone="123",
+        email="cached@example.com",
+    )
+    product = Product(
+        code="CACHED-1",
+        name="Cached",
+        characteristics="Report cache",
+        prices={"USD": 3},
+        company=company,
+    )
+    item = InventoryItem(product=product, quantity=2)
+    session.add_all([company, item])
+    await session.commit()
+    yield item
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Fresh report cache, counting the reports generated."""
+    monkeypatch.setattr(pdf_generator, "report_cache", ReportCache(1024 * 1024))
+
+    async def fetch_rates():
+        return {"USD": Decimal(1)}
+
+    monkeypatch.setattr(exchange_rates, "get_rates", fetch_rates)
+
+    generated = []
+    generate = pdf_generator.generate_inventory_pdf
+
+    async def counting_generate(*args):
+        generated.append(args)
+        return await generate(*args)
+
+    monkeypatch.setattr(pdf_generator, "generate_inventory_pdf", counting_generate)
+    return generated
+
+
+async def download(client, etag: str | None = None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return await client.get(
+        "/inventory/report/download",
+        params={"company_nit": COMPANY_NIT},
+        headers=headers,
+    )
+
+
+async def test_unchanged_report_is_not_modified(admin_client, item, renders):
+    first = await download(admin_client)
+    again = await download(admin_client)
+    conditional = await download(admin_client, first.headers["ETag"])
+
+    assert first.status_code == 200
+    assert first.content.startswith(b"%PDF")
+    assert again.content == first.content
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert conditional.status_code == 304
+    assert conditional.content == b""
+    assert len(renders) == 1
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("POST", "/inventory/{item_id}/adjust", {"delta": 1}),
+        ("PUT", "/products/{product_id}", {"name": "Renamed"}),
+        (
+            "PUT",
+            f"/companies/{COMPANY_NIT}",
+            {"name": "Renamed", "email": "cached@example.com"},
+        ),
+    ],
+)
+async def test_writes_change_the_report_etag(
+    admin_client, item, renders, method, path, body
+):
+    first = await download(admin_client)
+
+    path = path.format(item_id=item.id, product_id=item.product_id)
+    response = await admin_client.request(method, path, json=body)
+    assert response.status_code == 200
+    changed = await download(admin_client, first.headers["ETag"])
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != first.headers["ETag"]
+    assert len(renders) == 2
+
+
+async def test_missing_company_report_is_not_found(admin_client, renders):
+    response = await admin_client.get(
+        "/inventory/report/download", params={"company_nit": "000000000"}
+    )
+
+    assert response.status_code == 404
+
+
+def test_cache_evicts_least_recently_used_beyond_its_size():
+    cache = ReportCache(max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"1234")
+    cache.set("huge", b"12345678901")
+
+    assert cache.get("a") == b"1234"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"1234"
+    assert cache.get("huge") is None
+    assert cache.stats()["bytes"] == 8
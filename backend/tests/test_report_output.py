@@ -0,0 +1,174 @@
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete
+
+from api.core.config import settings
+from api.src.companies.models import Company
+from api.src.exchange_rates.cache import exchange_rates
+from api.src.inventory import pdf_generator
+from api.src.inventory.models import InventoryItem
+from api.src.inventory.report_cache import ReportCache
+from api.src.inventory.report_output import ReportOutput, ReportSpool
+from api.src.inventory.repository import InventoryRollupRepository
+from api.src.products.models import Product
+from api.src.products.repository import ProductRepository
+
+COMPANY_NIT = "900000019"
+SPILLED_PDF = b"%PDF-1.7\n" + b"x" * 100_000 + b"\n%%EOF\n"
+
+
+@pytest.fixture
+async def stock(session):
+    company = Company(
+        nit=COMPANY_NIT,
+        name="Spooled",
+        address="Street 1",
+        phone="123",
+        email="spooled@example.com",
+    )
+    product = Product(
+        code="SPOOLED-1",
+        name="Spooled",
+        characteristics="Report output",
+        prices={"USD": 3},
+        company=company,
+    )
+    session.add_all([company, InventoryItem(product=product, quantity=2)])
+    await session.commit()
+    # Written around the repositories, so index the prices and totals here
+    await ProductRepository(session).sync_prices([product.id])
+    await InventoryRollupRepository(session).apply_products([product.id], 1)
+    await session.commit()
+    yield
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+@pytest.fixture
+async def spool(tmp_path, monkeypatch):
+    """Empty report spool and cache, with fixed exchange rates."""
+    spool = ReportSpool(tmp_path / "reports", max_age=60)
+    monkeypatch.setattr(pdf_generator, "report_spool", spool)
+    monkeypatch.setattr(pdf_generator, "report_cache", ReportCache(1024 * 1024))
+
+    async def fetch_rates():
+        return {"USD": Decimal(1)}
+
+    monkeypatch.setattr(exchange_rates, "get_rates", fetch_rates)
+    yield spool
+    await spool.stop()
+
+
+@pytest.fixture
+def spilled(spool, monkeypatch):
+    """Make every report a large one, spilled to a file of the spool."""
+
+    async def generate(*args):
+        output = ReportOutput(path=spool.create())
+        with open(output.path, "wb") as pdf:
+            pdf.write(SPILLED_PDF)
+        return output
+
+    monkeypatch.setattr(pdf_generator, "generate_inventory_pdf", generate)
+
+
+def spooled_files(spool) -> list[str]:
+    return os.listdir(spool.directory) if spool.directory.exists() else []
+
+
+async def download(client):
+    return await client.get(
+        "/inventory/report/download", params={"company_nit": COMPANY_NIT}
+    )
+
+
+async def test_small_report_is_rendered_in_memory(admin_client, stock, spool):
+    response = await download(admin_client)
+
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+    assert spooled_files(spool) == []
+
+
+async def test_report_output_is_held_in_memory(session, stock, spool):
+    output = await pdf_generator.generate_inventory_pdf(session, COMPANY_NIT)
+
+    assert output.in_memory
+    assert output.read().startswith(b"%PDF")
+    assert spooled_files(spool) == []
+    output.release()
+    assert output.content is None
+
+
+async def test_chunked_report_output_is_spooled_until_released(
+    session, stock, spool, monkeypatch
+):
+    monkeypatch.setattr(settings, "REPORT_CHUNK_ROWS", 0)
+
+    output = await pdf_generator.generate_inventory_pdf(session, COMPANY_NIT)
+
+    assert not output.in_memory
+    assert spooled_files(spool) == [os.path.basename(output.path)]
+    assert output.read().startswith(b"%PDF")
+    output.release()
+    output.release()
+    assert output.path is None
+    assert spooled_files(spool) == []
+
+
+async def test_spilled_report_is_streamed_then_deleted(
+    admin_client, stock, spool, spilled
+):
+    response = await download(admin_client)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["etag"].startswith('"')
+    assert response.content == SPILLED_PDF
+    assert spooled_files(spool) == []
+    # Spilled reports are not copied into the cache
+    assert pdf_generator.report_cache.stats()["reports"] == 0
+
+
+async def test_spilled_report_is_deleted_when_email_fails(
+    session, stock, spool, spilled, monkeypatch
+):
+    async def send_email(*args):
+        raise RuntimeError("Mail server down")
+
+    monkeypatch.setattr(pdf_generator.email_manager, "send_email", send_email)
+
+    with pytest.raises(Exception):
+        await pdf_generator.send_pdf_by_email(
+            session, "spooled@example.com", COMPANY_NIT
+        )
+
+    assert spooled_files(spool) == []
+
+
+async def test_cleanup_removes_only_leftover_files(spool):
+    leftover = spool.create()
+    with spool.workspace() as fresh_directory:
+        pass
+    stale_directory = spool.directory / "chunks-stale"
+    stale_directory.mkdir()
+    (stale_directory / "0.pdf").write_bytes(b"%PDF")
+    fresh = spool.create()
+    # Unrelated data sharing the directory
+    unrelated = spool.directory / "backup.pdf"
+    unrelated.write_bytes(b"%PDF")
+    unrelated_directory = spool.directory / "cache"
+    unrelated_directory.mkdir()
+    an_hour_ago = time.time() - 3600
+    for path in (leftover, stale_directory, unrelated, unrelated_directory):
+        os.utime(path, (an_hour_ago, an_hour_ago))
+
+    assert spool.cleanup() == 2
+    assert sorted(spooled_files(spool)) == sorted(
+        [os.path.basename(fresh), "backup.pdf", "cache"]
+    )
+    assert not os.path.exists(fresh_directory)
+    assert spool.stats()["removed"] == 2
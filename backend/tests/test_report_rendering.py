@@ -0,0 +1,146 @@
+import asyncio
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete
+
+from api.core.exceptions import ServiceUnavailableException
+from api.src.companies.models import Company
+from api.src.exchange_rates.cache import exchange_rates
+from api.src.inventory import pdf_generator
+from api.src.inventory.models import InventoryItem
+from api.src.inventory.rendering import ReportRenderPool, ReportTemplates
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000015"
+
+
+@pytest.fixture
+async def stock(session):
+    company = Company(
+        nit=COMPANY_NIT,
+        name="Rendering",
+        address="Street 1",
+        phone="123",
+        email="rendering@example.com",
+    )
+    product = Product(
+        code="RENDERING-1",
+        name="Rendered",
+        characteristics="Rendering",
+        prices={"USD": 3},
+        company=company,
+    )
+    session.add_all([company, InventoryItem(product=product, quantity=2)])
+    await session.commit()
+    yield
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+@pytest.fixture
+def pool():
+    pool = ReportRenderPool(workers=1, queue_size=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    async def fetch_rates():
+        return {"USD": Decimal(1)}
+
+    monkeypatch.setattr(exchange_rates, "get_rates", fetch_rates)
+
+
+@pytest.fixture
+def template_files(tmp_path):
+    (tmp_path / "report.html").write_text("<h1>{{ title }}</h1>")
+    (tmp_path / "report.css").write_text("h1 { color: red; }")
+    return tmp_path
+
+
+def touch(path, text: str) -> None:
+    """Rewrite a file with a modification time later than its current one."""
+    modified = path.stat().st_mtime
+    path.write_text(text)
+    os.utime(path, (modified + 1, modified + 1))
+
+
+def test_templates_and_stylesheets_are_compiled_once(template_files):
+    templates = ReportTemplates(template_files)
+
+    template = templates.environment.get_template("report.html")
+    stylesheet = templates.stylesheet("report.css")
+    touch(template_files / "report.html", "<h2>{{ title }}</h2>")
+    touch(template_files / "report.css", "h1 { color: blue; }")
+
+    assert templates.environment.get_template("report.html") is template
+    assert templates.render_html("report.html", {"title": "A"}) == "<h1>A</h1>"
+    assert templates.stylesheet("report.css") is stylesheet
+
+
+def test_changed_files_are_reloaded_when_enabled(template_files):
+    templates = ReportTemplates(template_files, reload=True)
+
+    templates.render_html("report.html", {"title": "A"})
+    stylesheet = templates.stylesheet("report.css")
+    assert templates.stylesheet("report.css") is stylesheet
+    touch(template_files / "report.html", "<h2>{{ title }}</h2>")
+    touch(template_files / "report.css", "h1 { color: blue; }")
+
+    assert templates.render_html("report.html", {"title": "A"}) == "<h2>A</h2>"
+    assert templates.stylesheet("report.css") is not stylesheet
+
+
+async def test_pool_rejects_renders_beyond_its_queue(pool):
+    running = [asyncio.create_task(pool.run(time.sleep, 1)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceUnavailableException) as error:
+        await pool.run(time.sleep, 0)
+
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"]
+    assert pool.stats() == {
+        "workers": 1,
+        "queue_size": 1,
+        "rendering": 1,
+        "queued": 1,
+        "rejected": 1,
+    }
+    await asyncio.gather(*running)
+    await asyncio.sleep(0)
+    assert pool.stats()["rendering"] == 0
+
+
+async def test_report_download_renders_in_pool(
+    admin_client, stock, rates, pool, monkeypatch
+):
+    monkeypatch.setattr(pdf_generator, "report_renderer", pool)
+
+    response = await admin_client.get(
+        "/inventory/report/download", params={"company_nit": COMPANY_NIT}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+
+
+async def test_report_download_rejected_when_saturated(
+    admin_client, stock, rates, pool, monkeypatch
+):
+    monkeypatch.setattr(pdf_generator, "report_renderer", pool)
+    running = [asyncio.create_task(pool.run(time.sleep, 1)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    response = await admin_client.get(
+        "/inventory/report/download", params={"company_nit": COMPANY_NIT}
+    )
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    await asyncio.gather(*running)
@@ -0,0 +1,99 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from api.core.security import create_access_token, principal_cache
+from api.main import app
+from api.src.users.models import User, UserRole
+
+
+@pytest.fixture
+def checkouts(engine) -> list:
+    """Record every connection checkout from the engine pool."""
+    checkouts = []
+    event.listen(engine.sync_engine.pool, "checkout", lambda *_: checkouts.append(1))
+    return checkouts
+
+
+@pytest.fixture
+async def auth_headers(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        user = User(
+            email="checkouts@example.com",
+            hashed_password="not-used",
+            role=UserRole.ADMIN,
+        )
+        session.add(user)
+        await session.commit()
+        token = create_access_token({"sub": str(user.id)})
+
+    yield {"Authorization": f"Bearer {token}"}
+
+    async with factory() as session:
+        await session.execute(delete(User).where(User.id == user.id))
+        await session.commit()
+
+
+@pytest.mark.parametrize("path", ["/auth/me", "/companies", "/products"])
+async def test_one_connection_checkout_per_request(
+    engine, checkouts, auth_headers, path
+):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        checkouts.clear()
+        response = await client.get(path, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(checkouts) == 1
+    assert engine.pool.checkedout() == 0
+
+
+async def test_unknown_user_is_unauthorized(engine):
+    token = create_access_token({"sub": "0"})
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == 401
+
+
+async def test_principal_cache_skips_user_query(engine, checkouts, auth_headers):
+    principal_cache.clear()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        first = await client.get("/auth/me", headers=auth_headers)
+        checkouts.clear()
+        hits = principal_cache.hits
+        second = await client.get("/auth/me", headers=auth_headers)
+
+    assert first.json() == second.json()
+    assert principal_cache.hits == hits + 1
+    assert checkouts == []
+
+
+async def test_role_change_invalidates_principal(engine, auth_headers):
+    principal_cache.clear()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/auth/me", headers=auth_headers)
+        user_id = response.json()["id"]
+        assert principal_cache.get(user_id) is not None
+
+        factory = sessionmaker(engine, class_=AsyncSession)
+        async with factory() as session:
+            user = await session.get(User, user_id)
+            user.role = UserRole.EXTERNAL
+            await session.commit()
+        assert principal_cache.get(user_id) is None
+
+        response = await client.get("/auth/me", headers=auth_headers)
+        assert response.json()["role"] == UserRole.EXTERNAL
@@ -0,0 +1,197 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core import database
+from api.core.security import current_user_id
+from api.src.companies.models import Company
+from api.src.inventory.ledger import StockMovementWriter, movement_writer
+from api.src.inventory.models import MovementReason, StockMovement, StockSnapshot
+from api.src.inventory.repository import InventoryRepository, StockLedgerRepository
+from api.src.inventory.schemas import InventoryItemCreate, InventoryItemUpdate
+from api.src.products.models import Product
+
+COMPANY_NIT = "900000009"
+# Ledger rows are not tied to inventory rows, so tests use IDs that never exist
+LEDGER_ID = -1001
+
+
+@pytest.fixture
+async def product_id(session):
+    company = Company(
+        nit=COMPANY_NIT,
+        name="Ledger",
+        address="Street 1",
+        phone="123",
+        email="ledger@example.com",
+    )
+    product = Product(
+        code="LEDGER-1",
+        name="Product",
+        characteristics="Ledger",
+        prices={"USD": 1},
+        company=company,
+    )
+    session.add_all([company, product])
+    await session.commit()
+    yield product.id
+    await session.execute(delete(Company).where(Company.nit == COMPANY_NIT))
+    await session.commit()
+
+
+@pytest.fixture
+async def ledger(session):
+    yield StockLedgerRepository(session)
+    for model in (StockMovement, StockSnapshot):
+        await session.execute(delete(model).where(model.inventory_id == LEDGER_ID))
+    await session.commit()
+
+
+async def movements_of(session, inventory_id: int) -> list[StockMovement]:
+    query = select(StockMovement).where(StockMovement.inventory_id == inventory_id)
+    return list(await session.scalars(query.order_by(StockMovement.id)))
+
+
+async def test_write_paths_record_movements(admin_client, session, product_id):
+    response = await admin_client.post(
+        "/inventory", json={"product_id": product_id, "quantity": 5}
+    )
+    inventory_id = response.json()["id"]
+    await admin_client.put(f"/inventory/{inventory_id}", json={"quantity": 8})
+    await admin_client.post(f"/inventory/{inventory_id}/adjust", json={"delta": -3})
+    await admin_client.delete(f"/inventory/{inventory_id}")
+    await movement_writer.flush()
+
+    response = await admin_client.get(f"/inventory/{inventory_id}/movements")
+
+    assert [
+        (row["reason"], row["delta"], row["quantity"]) for row in response.json()
+    ] == [
+        ("delete", -5, 0),
+        ("adjust", -3, 5),
+        ("update", 3, 8),
+        ("create", 5, 5),
+    ]
+
+
+async def test_write_paths_record_movements_after_expiring_commit(
+    engine, session, product_id
+):
+    # Sessions expiring on commit must not lazy load the recorded values
+    async with AsyncSession(engine, expire_on_commit=True) as expiring:
+        repository = InventoryRepository(expiring)
+        item = await repository.create(
+            InventoryItemCreate(product_id=product_id, quantity=5)
+        )
+        inventory_id = item.id
+        await repository.update(inventory_id, InventoryItemUpdate(quantity=8))
+        await repository.adjust(inventory_id, -3)
+        await repository.adjust_many({inventory_id: 2})
+        await repository.delete(inventory_id)
+    await movement_writer.flush()
+
+    movements = await movements_of(session, inventory_id)
+    assert [(movement.reason, movement.delta) for movement in movements] == [
+        (MovementReason.CREATE, 5),
+        (MovementReason.UPDATE, 3),
+        (MovementReason.ADJUST, -3),
+        (MovementReason.ADJUST, 2),
+        (MovementReason.DELETE, -7),
+    ]
+
+
+async def test_writer_flushes_on_row_count(session, ledger):
+    writer = StockMovementWriter(flush_interval=60, max_rows=3, max_buffered=100)
+    token = current_user_id.set(42)
+    try:
+        for delta in (1, 2, 3):
+            writer.record(MovementReason.ADJUST, LEDGER_ID, 0, delta, delta)
+    finally:
+        current_user_id.reset(token)
+    await asyncio.sleep(0.1)
+
+    movements = await movements_of(session, LEDGER_ID)
+    assert [movement.delta for movement in movements] == [1, 2, 3]
+    assert {movement.user_id for movement in movements} == {42}
+    await writer.stop()
+
+
+async def test_writer_flushes_on_interval(session, ledger):
+    writer = StockMovementWriter(flush_interval=0.05, max_rows=1000, max_buffered=1000)
+    writer.record(MovementReason.ADJUST, LEDGER_ID, 0, 1, 1)
+    assert await movements_of(session, LEDGER_ID) == []
+
+    await asyncio.sleep(0.2)
+
+    assert len(await movements_of(session, LEDGER_ID)) == 1
+    await writer.stop()
+
+
+async def test_writer_bounds_buffer_while_database_is_down(monkeypatch):
+    writer = StockMovementWriter(flush_interval=60, max_rows=1000, max_buffered=3)
+
+    class Unavailable:
+        async def __aenter__(self):
+            raise ConnectionError("Database is down")
+
+        async def __aexit__(self, *args):
+            pass
+
+    monkeypatch.setattr(database, "async_session", Unavailable)
+    for delta in range(1, 6):
+        writer.record(MovementReason.ADJUST, LEDGER_ID, 0, delta, delta)
+        await writer.flush()
+
+    assert [movement["delta"] for movement in writer._buffer] == [3, 4, 5]
+    assert writer.dropped == 2
+    writer._buffer.clear()
+    await writer.stop()
+
+
+async def test_quantity_as_of_survives_compaction(session, ledger):
+    today = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0)
+    history = [
+        (today - timedelta(days=3), 10),
+        (today - timedelta(days=3, hours=-1), -2),
+        (today - timedelta(days=2), 5),
+        (today - timedelta(hours=1), -4),
+    ]
+    await session.execute(
+        insert(StockMovement),
+        [
+            {
+                "inventory_id": LEDGER_ID,
+                "product_id": 0,
+                "delta": delta,
+                "quantity": 0,
+                "reason": MovementReason.ADJUST,
+                "created_at": created_at,
+            }
+            for created_at, delta in history
+        ],
+    )
+    await session.commit()
+
+    checkpoints = [
+        today - timedelta(days=4),
+        today - timedelta(days=2, hours=-6),
+        today - timedelta(days=1),
+        today,
+    ]
+    expected = [0, 13, 13, 9]
+    assert [await ledger.get_quantity_as_of(LEDGER_ID, at) for at in checkpoints] == (
+        expected
+    )
+
+    written = await ledger.compact(today.date() - timedelta(days=1))
+
+    assert written == 2
+    assert [movement.delta for movement in await movements_of(session, LEDGER_ID)] == [
+        -4
+    ]
+    assert [await ledger.get_quantity_as_of(LEDGER_ID, at) for at in checkpoints] == (
+        expected
+    )